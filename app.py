@@ -6,9 +6,12 @@ from flask_login import LoginManager
 from sqlalchemy.orm import DeclarativeBase
 from werkzeug.middleware.proxy_fix import ProxyFix
 from backend.environment_config import EnvironmentConfig
+from backend.db_pool import engine_options
+from backend.read_routing import RoutingSession
+from backend.structured_logging import configure_logging
 
-# Configure logging
-logging.basicConfig(level=logging.DEBUG)
+# Configure logging (LOG_LEVEL, LOG_FORMAT, LOG_DEBUG_SAMPLE_RATE, LOG_SAMPLE_ROUTES)
+configure_logging()
 
 # Validate environment on startup
 try:
@@ -21,20 +24,26 @@ except EnvironmentError as e:
 class Base(DeclarativeBase):
     pass
 
-db = SQLAlchemy(model_class=Base)
+db = SQLAlchemy(model_class=Base, session_options={'class_': RoutingSession})
 login_manager = LoginManager()
 
 # Create the app
 app = Flask(__name__)
 app.secret_key = EnvironmentConfig.get_session_secret()
-app.wsgi_app = ProxyFix(app.wsgi_app, x_proto=1, x_host=1)
+# Trust exactly as many X-Forwarded-* hops as there are proxies, so remote_addr
+# is the real client and cannot be set by the client itself
+_proxy_count = EnvironmentConfig.get_proxy_count()
+if _proxy_count:
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=_proxy_count, x_proto=_proxy_count, x_host=_proxy_count)
 
 # Configure the database with validation
 app.config["SQLALCHEMY_DATABASE_URI"] = EnvironmentConfig.get_database_url()
-app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
-    "pool_recycle": 300,
-    "pool_pre_ping": True,
-}
+app.config["SQLALCHEMY_ENGINE_OPTIONS"] = engine_options(app.config["SQLALCHEMY_DATABASE_URI"])
+
+# Optional read replica for analytics queries (see backend/read_routing.py)
+_replica_url = EnvironmentConfig.get_replica_database_url()
+if _replica_url:
+    app.config["SQLALCHEMY_BINDS"] = {"replica": {"url": _replica_url, **engine_options(_replica_url)}}
 
 # Initialize extensions
 db.init_app(app)
@@ -44,8 +53,8 @@ login_manager.login_message = 'Please log in to access this page.'
 
 @login_manager.user_loader
 def load_user(user_id):
-    from backend.models import User
-    return User.query.get(int(user_id))
+    from backend.identity import Identity
+    return Identity.load(int(user_id))
 
 # Custom Jinja2 filters
 @app.template_filter('average')
@@ -62,9 +71,28 @@ def average_filter(values):
         return 0
 
 with app.app_context():
-    # Import models to ensure tables are created
+    # Schema changes are applied by `python -m scripts.migrate upgrade`; startup only checks the version
     import backend.models
-    db.create_all()
+    from backend.migrations import check_schema, upgrade
+    if not check_schema() and EnvironmentConfig.get_auto_migrate():
+        upgrade()
+
+# Request latency/status metrics (served at /metrics) and per-route SQL accounting
+from backend.metrics import RequestMetrics
+from backend.query_budget import QueryBudget
+RequestMetrics.init_app(app)
+QueryBudget.init_app(app)
+
+# Opt-in sampled/slow request profiles for /admin/profiles (PROFILER_ENABLED)
+from backend.request_profiler import RequestProfiler
+RequestProfiler.init_app(app)
+
+# Optional in-process retention schedule (each worker schedules it; a PostgreSQL advisory
+# lock lets only one run at a time); otherwise run scripts/run_retention.py from cron
+_retention_interval = EnvironmentConfig.get_retention_settings()['interval_hours']
+if _retention_interval:
+    from backend.retention import RetentionJob
+    RetentionJob.start_scheduler(app, _retention_interval)
 
 # Import routes
 from routes import *
@@ -0,0 +1,66 @@
+"""
+Speculative prefetch of the next adaptive set while the learner answers the
+current one
+"""
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from flask import current_app
+from .performance_cache import cache
+
+
+class AdaptivePrefetcher:
+    """
+    The next set can only be one step up, the same, or one step down, so all
+    three candidates are built on a worker thread as soon as a set is served.
+    Payloads carry a pre-issued quiz_id and write nothing; the Quiz row is
+    created when the set is submitted.
+    """
+
+    MAX_WORKERS = 2
+    SLOT_TTL = 1800  # Abandoned sessions' slots expire after 30 minutes
+
+    def __init__(self, engine, max_workers=None):
+        self.engine = engine
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers or self.MAX_WORKERS,
+            thread_name_prefix='adaptive-prefetch'
+        )
+
+    @staticmethod
+    def _slot_key(session_id, set_number):
+        return f"adaptive_prefetch:{session_id}:{set_number}"
+
+    def candidate_difficulties(self, current_difficulty):
+        """Every difficulty _calculate_next_difficulty can return from here"""
+        progression = self.engine.DIFFICULTY_PROGRESSION[current_difficulty]
+        return [level for level in (current_difficulty, progression['up'], progression['down']) if level]
+
+    def schedule(self, session_id, topic_id, current_difficulty, set_number):
+        """Start building the candidates for set_number in the background"""
+        app = current_app._get_current_object()
+        self.executor.submit(
+            self._fill_slot, app, session_id, topic_id,
+            self.candidate_difficulties(current_difficulty), set_number
+        )
+
+    def _fill_slot(self, app, session_id, topic_id, difficulties, set_number):
+        try:
+            with app.app_context():
+                slot = {}
+                for difficulty_level in difficulties:
+                    payload = self.engine._build_set_payload(topic_id, difficulty_level)
+                    if payload:
+                        payload['set_number'] = set_number
+                        payload['session_id'] = session_id
+                        slot[difficulty_level] = payload
+                cache.set(self._slot_key(session_id, set_number), slot, ttl=self.SLOT_TTL)
+        except Exception as e:
+            logging.warning(f"Adaptive prefetch failed for session {session_id}: {e}")
+
+    def take(self, session_id, set_number, difficulty_level):
+        """Claim a prefetched set, or None if it isn't ready so the caller builds it inline"""
+        slot = cache.pop(self._slot_key(session_id, set_number))
+        if not slot:
+            return None
+        return slot.get(difficulty_level)
@@ -0,0 +1,130 @@
+"""
+Computerized adaptive testing (CAT): per-item selection from an in-memory
+item bank ordered by calibrated difficulty
+"""
+
+import math
+from bisect import bisect_left
+import numpy as np
+from app import db
+from .models import Question, QuestionSet
+from .irt_calibration import item_parameters, DIFFICULTY_PRIORS
+from .performance_cache import cache
+
+
+class ItemBank:
+    """
+    Questions for one topic sorted by IRT difficulty. Selection bisects to the
+    learner's ability and only scores a small window of neighbours, so picking
+    the next item stays well under a millisecond for thousands of questions.
+    """
+
+    CACHE_TTL = 600  # Rebuild banks every 10 minutes to pick up recalibration
+    SEARCH_WINDOW = 8  # Unused items examined on each side of the ability estimate
+
+    def __init__(self, items):
+        self.items = sorted(items, key=lambda item: item['difficulty'])
+        self.difficulties = [item['difficulty'] for item in self.items]
+        self.by_id = {item['question_id']: item for item in self.items}
+
+    @classmethod
+    def for_topic(cls, topic_id):
+        """Cached bank for a topic, loaded with a single query on a miss"""
+        key = f"item_bank:{topic_id}"
+        bank = cache.get(key)
+        if bank is None:
+            rows = db.session.query(Question, QuestionSet.difficulty_level)\
+                .join(QuestionSet, Question.set_id == QuestionSet.question_set_id)\
+                .filter(QuestionSet.topic_id == topic_id).all()
+            bank = cls([cls._to_item(question, difficulty_level) for question, difficulty_level in rows])
+            cache.set(key, bank, ttl=cls.CACHE_TTL)
+        return bank
+
+    @staticmethod
+    def invalidate(topic_id):
+        """Drop a cached bank after its questions change"""
+        cache.delete(f"item_bank:{topic_id}")
+
+    @staticmethod
+    def _to_item(question, difficulty_level):
+        """Plain dict snapshot so the bank never touches the ORM session again"""
+        discrimination, difficulty = item_parameters(question, difficulty_level)
+        return {
+            'question_id': question.question_id,
+            'question_set_id': question.set_id,
+            'description': question.description,
+            'options': question.options,
+            'correct_option': question.correct_option,
+            'marks_worth': question.marks_worth,
+            'image_url': question.image_url,
+            'discrimination': discrimination,
+            'difficulty': difficulty
+        }
+
+    def __len__(self):
+        return len(self.items)
+
+    def get(self, question_id):
+        return self.by_id.get(question_id)
+
+    def select_next(self, theta, administered=()):
+        """Most informative unused item near the current ability estimate"""
+        position = bisect_left(self.difficulties, theta)
+        best_item, best_information = None, -1.0
+
+        # Walk outward from the bisect point until each side has yielded enough candidates
+        for step in (-1, 1):
+            index = position if step == 1 else position - 1
+            examined = 0
+            while 0 <= index < len(self.items) and examined < self.SEARCH_WINDOW:
+                item = self.items[index]
+                if item['question_id'] not in administered:
+                    information = fisher_information(theta, item['discrimination'], item['difficulty'])
+                    if information > best_information:
+                        best_item, best_information = item, information
+                    examined += 1
+                index += step
+
+        return best_item
+
+
+def fisher_information(theta, discrimination, difficulty):
+    """Item information of a 2PL item at ability theta"""
+    p = 1.0 / (1.0 + math.exp(-discrimination * (theta - difficulty)))
+    return discrimination * discrimination * p * (1.0 - p)
+
+
+class AbilityEstimator:
+    """Expected a posteriori ability estimate over a fixed quadrature grid"""
+
+    GRID = np.linspace(-4.0, 4.0, 81)
+
+    @staticmethod
+    def estimate(responses, prior_mean=0.0, prior_sd=1.0):
+        """Return (theta, standard_error) from (discrimination, difficulty, is_correct) triples"""
+        grid = AbilityEstimator.GRID
+        log_posterior = -0.5 * ((grid - prior_mean) / prior_sd) ** 2
+
+        if responses:
+            a = np.array([r[0] for r in responses])[:, None]
+            b = np.array([r[1] for r in responses])[:, None]
+            correct = np.array([1.0 if r[2] else 0.0 for r in responses])[:, None]
+            p = 1.0 / (1.0 + np.exp(-a * (grid[None, :] - b)))
+            p = np.clip(p, 1e-9, 1 - 1e-9)
+            log_posterior = log_posterior + (correct * np.log(p) + (1 - correct) * np.log(1 - p)).sum(axis=0)
+
+        weights = np.exp(log_posterior - log_posterior.max())
+        weights /= weights.sum()
+        theta = float(np.dot(weights, grid))
+        standard_error = float(math.sqrt(np.dot(weights, (grid - theta) ** 2)))
+        return theta, standard_error
+
+
+def difficulty_label(theta):
+    """Nearest hand-set difficulty label for an ability estimate"""
+    return min(DIFFICULTY_PRIORS, key=lambda label: abs(DIFFICULTY_PRIORS[label] - theta))
+
+
+def ability_to_proficiency(theta):
+    """Map an ability estimate onto the 0-100 proficiency scale used elsewhere"""
+    return round(100.0 / (1.0 + math.exp(-theta)), 2)
@@ -1,11 +1,14 @@
 import os
 import json
 import logging
+import time
 from google import genai
 from google.genai import types
 from .models import Student, Quiz, QuizResponse, PerformanceTrend, Topic, Subject
 from .topic_prediction_service import topic_prediction_service
 from .performance_cache import cached, cache
+from .metrics import AI_LATENCY
+from .trend_store import TrendStore
 
 class NuraAI:
     def __init__(self):
@@ -20,6 +23,17 @@ class NuraAI:
             self.api_available = False
             logging.warning("GEMINI_API_KEY not found, using fallback responses")
     
+    def _generate_content(self, operation, **request):
+        """Call Gemini and record the call's latency under operation"""
+        started = time.perf_counter()
+        outcome = 'error'
+        try:
+            response = self.client.models.generate_content(**request)
+            outcome = 'ok'
+            return response
+        finally:
+            AI_LATENCY.observe(operation, outcome, value=time.perf_counter() - started)
+    
     @cached(ttl=600)  # Cache for 10 minutes
     def generate_learner_feedback(self, student_id):
         """Generate personalized feedback for a learner using AI with caching"""
@@ -52,7 +66,8 @@ class NuraAI:
             {{"assessment": "one sentence", "recommendations": ["item1", "item2"], "motivation": "one sentence"}}
             """
             
-            response = self.client.models.generate_content(
+            response = self._generate_content(
+                'learner_feedback',
                 model=self.model,
                 contents=prompt,
                 config=types.GenerateContentConfig(
@@ -107,7 +122,8 @@ class NuraAI:
             }}
             """
             
-            response = self.client.models.generate_content(
+            response = self._generate_content(
+                'quiz_feedback',
                 model=self.model,
                 contents=prompt,
                 config=types.GenerateContentConfig(
@@ -176,7 +192,8 @@ class NuraAI:
             }}
             """
             
-            response = self.client.models.generate_content(
+            response = self._generate_content(
+                'difficulty_adjustment',
                 model=self.model,
                 contents=prompt,
                 config=types.GenerateContentConfig(
@@ -242,7 +259,8 @@ class NuraAI:
             }}
             """
             
-            response = self.client.models.generate_content(
+            response = self._generate_content(
+                'educator_insights',
                 model=self.model,
                 contents=prompt,
                 config=types.GenerateContentConfig(
@@ -297,7 +315,7 @@ class NuraAI:
                 'topic': trend.topic.name,
                 'subject': trend.topic.subject.name,
                 'proficiency_score': trend.proficiency_score,
-                'trend_data': trend.trend_graph_data
+                'trend_data': TrendStore.recent_scores(trend)
             })
         
         return {
@@ -334,7 +352,8 @@ class NuraAI:
                 """
                 
                 try:
-                    response = self.client.models.generate_content(
+                    response = self._generate_content(
+                        'topic_prediction',
                         model=self.model,
                         contents=prompt,
                         config=types.GenerateContentConfig(
@@ -0,0 +1,88 @@
+"""
+Lightweight store for quiz attempts that have been handed out but not yet
+submitted, so abandoned quizzes never reach the database
+"""
+
+import logging
+import threading
+import time
+
+
+class AttemptStore:
+    """
+    In-process map of quiz_id -> attempt metadata with a TTL. Submission
+    turns an attempt into a Quiz row in the same transaction as its responses.
+    Each worker process has its own store, so submission also accepts the
+    quiz payload itself when the attempt was issued elsewhere or has expired.
+    """
+
+    ATTEMPT_TTL = 7200  # Two hours to finish a quiz
+    SWEEP_INTERVAL = 300  # Seconds between purges of expired attempts
+
+    def __init__(self, ttl=None):
+        self.ttl = ttl or self.ATTEMPT_TTL
+        self._attempts = {}
+        self._lock = threading.Lock()
+        self._sweeper = None
+
+    def open(self, student_id, quiz_data):
+        """Register a newly generated quiz as an open attempt"""
+        attempt = {
+            'quiz_id': quiz_data['quiz_id'],
+            'student_id': student_id,
+            'topic_id': quiz_data['topic_id'],
+            'question_set_id': quiz_data['question_set_id'],
+            'total_marks': quiz_data['total_marks'],
+            'question_ids': [q['question_id'] for q in quiz_data['questions']],
+            'expires': time.time() + self.ttl
+        }
+        with self._lock:
+            self._attempts[attempt['quiz_id']] = attempt
+        return attempt
+
+    def get(self, quiz_id):
+        """Open attempt for quiz_id, or None if unknown or expired"""
+        with self._lock:
+            attempt = self._attempts.get(quiz_id)
+            if attempt and attempt['expires'] < time.time():
+                del self._attempts[quiz_id]
+                return None
+            return attempt
+
+    def close(self, quiz_id):
+        """Forget an attempt once its submission has committed"""
+        with self._lock:
+            self._attempts.pop(quiz_id, None)
+
+    def sweep(self):
+        """Drop expired attempts; returns how many were purged"""
+        now = time.time()
+        with self._lock:
+            expired = [quiz_id for quiz_id, attempt in self._attempts.items() if attempt['expires'] < now]
+            for quiz_id in expired:
+                del self._attempts[quiz_id]
+        return len(expired)
+
+    def start_sweeper(self, interval=None):
+        """Purge expired attempts periodically on a daemon thread (idempotent)"""
+        if self._sweeper and self._sweeper.is_alive():
+            return
+        interval = interval or self.SWEEP_INTERVAL
+
+        def run():
+            while True:
+                time.sleep(interval)
+                purged = self.sweep()
+                if purged:
+                    logging.info(f"Purged {purged} expired quiz attempts")
+
+        self._sweeper = threading.Thread(target=run, name='attempt-sweeper', daemon=True)
+        self._sweeper.start()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._attempts)
+
+
+# Global attempt store instance
+attempt_store = AttemptStore()
@@ -0,0 +1,343 @@
+"""
+Bulk content packages: validated up front, written in one transaction,
+images processed afterwards on a worker pool
+
+A package is one subject with its topics and questions. Every question is
+checked (through the question importer's row validation), and every image's
+type, size and leading bytes, before anything is written; every problem is
+reported at once. Subjects, topics and sets are added through the ORM and
+the questions with a single executemany, all committed together. Uploaded
+images are staged to disk inside the request, then stored under a
+content-addressed name and attached to their questions by background
+workers; the returned job id reports that progress.
+"""
+
+import hashlib
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import insert, update
+from app import db
+from .environment_config import EnvironmentConfig
+from .models import Subject, Topic, QuestionSet, Question
+from .question_import import ImportRowError, OPTION_FIELDS, OPTION_LETTERS, parse_row
+
+logger = logging.getLogger(__name__)
+
+# Leading bytes of each accepted image type
+IMAGE_SIGNATURES = {
+    'png': b'\x89PNG\r\n\x1a\n',
+    'jpg': b'\xff\xd8\xff',
+    'jpeg': b'\xff\xd8\xff'
+}
+
+
+class ContentPackageError(ValueError):
+    """Package rejected by validation; errors lists every problem found"""
+
+    def __init__(self, errors):
+        super().__init__(f"{len(errors)} validation errors")
+        self.errors = errors
+
+
+def _file_size(file):
+    stream = file.stream
+    position = stream.tell()
+    stream.seek(0, os.SEEK_END)
+    size = stream.tell()
+    stream.seek(position)
+    return size
+
+
+def _has_signature(file, extension):
+    """Whether the upload starts with the magic bytes of its extension's image type"""
+    signature = IMAGE_SIGNATURES.get(extension)
+    if signature is None:
+        return False
+    stream = file.stream
+    position = stream.tell()
+    stream.seek(0)
+    head = stream.read(len(signature))
+    stream.seek(position)
+    return head == signature
+
+
+def parse_package(payload, files, allowed_extensions, max_file_size, max_questions):
+    """
+    Validate a package and return it normalised:
+    {'subject': {...}, 'topics': [{'name', 'difficulty_level', 'questions': [record, ...]}]}
+    where each record is a question_import.parse_row() record plus 'image_key'.
+    Raises ContentPackageError listing every problem.
+    """
+    errors = []
+    if not isinstance(payload, dict):
+        raise ContentPackageError(["package must be a JSON object"])
+
+    subject = payload.get('subject') or {}
+    subject_name = str(subject.get('name') or '').strip() if isinstance(subject, dict) else ''
+    if not subject_name:
+        errors.append("subject.name is required")
+    topics = payload.get('topics')
+    if not isinstance(topics, list) or not topics:
+        errors.append("topics must be a non-empty list")
+        raise ContentPackageError(errors)
+
+    parsed_topics, question_count, image_keys = [], 0, set()
+    for t, topic in enumerate(topics):
+        where = f"topics[{t}]"
+        topic = topic if isinstance(topic, dict) else {}
+        topic_name = str(topic.get('name') or '').strip()
+        questions = topic.get('questions')
+        if not topic_name:
+            errors.append(f"{where}.name is required")
+        if not isinstance(questions, list) or not questions:
+            errors.append(f"{where}.questions must be a non-empty list")
+            continue
+
+        records = []
+        for q, question in enumerate(questions):
+            where = f"topics[{t}].questions[{q}]"
+            question = question if isinstance(question, dict) else {}
+            options = question.get('options')
+            if not isinstance(options, list):
+                # The single-question form's optionA..optionD fields
+                options = [question.get(f"option{letter}") for letter in OPTION_LETTERS]
+            row = {field: option for field, option in zip(OPTION_FIELDS, options)}
+            row.update({
+                'question': question.get('text'),
+                'correct_answer': question.get('correctAnswer'),
+                'difficulty': topic.get('difficulty'),
+                'marks': question.get('marks'),
+                'explanation': question.get('explanation'),
+                'subject': subject_name or '-',
+                'topic': topic_name or '-'
+            })
+            try:
+                record = parse_row(row)
+            except ImportRowError as e:
+                errors.append(f"{where}: {e}")
+                continue
+
+            image_key = question.get('imageKey')
+            if image_key:
+                image = files.get(image_key)
+                extension = image.filename.rsplit('.', 1)[-1].lower() if image and '.' in image.filename else ''
+                if image is None:
+                    errors.append(f"{where}: image '{image_key}' was not uploaded")
+                elif extension not in allowed_extensions:
+                    errors.append(f"{where}: image '{image_key}' must be one of {', '.join(sorted(allowed_extensions))}")
+                elif _file_size(image) > max_file_size:
+                    errors.append(f"{where}: image '{image_key}' is larger than {max_file_size // (1024 * 1024)}MB")
+                elif not _has_signature(image, extension):
+                    errors.append(f"{where}: image '{image_key}' is not a valid .{extension} file")
+                elif image_key in image_keys:
+                    errors.append(f"{where}: image '{image_key}' is used by more than one question")
+                image_keys.add(image_key)
+            record['image_key'] = image_key or None
+            records.append(record)
+
+        question_count += len(questions)
+        difficulty = records[0]['difficulty_level'] if records else None
+        parsed_topics.append({'name': topic_name, 'difficulty_level': difficulty, 'questions': records})
+
+    if question_count > max_questions:
+        errors.append(f"package has {question_count} questions; the limit is {max_questions}")
+    if errors:
+        raise ContentPackageError(errors)
+
+    return {
+        'subject': {'name': subject_name, 'description': str(subject.get('description') or '')},
+        'topics': parsed_topics
+    }
+
+
+class ContentJobStore:
+    """
+    In-process map of job_id -> progress with a TTL, like the attempt store:
+    each worker process tracks the jobs it started, so poll the worker that
+    accepted the package (sticky sessions) when running several.
+    """
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def create(self, **fields):
+        now = datetime.utcnow().isoformat(timespec='seconds')
+        job = {'job_id': uuid.uuid4().hex, 'created_at': now, 'images_total': 0, 'images_done': 0,
+               'images_failed': 0, 'errors': [], 'finished_at': None if fields.get('images_total') else now}
+        job.update(fields)
+        with self._lock:
+            self._sweep()
+            self._jobs[job['job_id']] = {'job': job, 'expires': time.time() + self.ttl}
+        return dict(job)
+
+    def get(self, job_id):
+        """Copy of the job with its progress percentage, or None if unknown or expired"""
+        with self._lock:
+            entry = self._jobs.get(job_id)
+            if not entry or entry['expires'] < time.time():
+                return None
+            job = dict(entry['job'], errors=list(entry['job']['errors']))
+        total = job['images_total']
+        job['progress'] = 100 if not total else round((job['images_done'] + job['images_failed']) * 100 / total)
+        return job
+
+    def image_finished(self, job_id, error=None):
+        """Count one processed image and complete the job after the last one"""
+        with self._lock:
+            entry = self._jobs.get(job_id)
+            if not entry:
+                return
+            job = entry['job']
+            if error:
+                job['images_failed'] += 1
+                job['errors'].append(error)
+            else:
+                job['images_done'] += 1
+            if job['images_done'] + job['images_failed'] >= job['images_total']:
+                job['status'] = 'completed_with_errors' if job['images_failed'] else 'completed'
+                job['finished_at'] = datetime.utcnow().isoformat(timespec='seconds')
+
+    def _sweep(self):
+        now = time.time()
+        for job_id in [job_id for job_id, entry in self._jobs.items() if entry['expires'] < now]:
+            del self._jobs[job_id]
+
+
+class BulkContentService:
+    """Writes validated packages and runs their image processing in the background"""
+
+    def __init__(self, upload_folder, upload_url, settings=None):
+        settings = settings or EnvironmentConfig.get_content_job_settings()
+        self.upload_folder = upload_folder
+        self.upload_url = upload_url.rstrip('/')
+        self.max_questions = settings['max_questions']
+        self.staging_folder = os.path.join(tempfile.gettempdir(), 'nura-content-staging')
+        self.jobs = ContentJobStore(settings['job_ttl'])
+        self.executor = ThreadPoolExecutor(max_workers=settings['image_workers'], thread_name_prefix='content-images')
+
+    def submit(self, package, files, user_id):
+        """Stage images, commit the package in one transaction and queue the images; returns the job"""
+        staged = self._stage_images(package, files)
+        try:
+            subject_id, images, counts = self._write(package, staged)
+        except Exception:
+            for path, _ in staged.values():
+                os.remove(path)
+            raise
+
+        job = self.jobs.create(
+            created_by=user_id, subject_id=subject_id,
+            status='processing_images' if images else 'completed',
+            images_total=len(images), **counts
+        )
+        app = current_app._get_current_object()
+        for question_id, (path, extension) in images.items():
+            self.executor.submit(self._process_image, app, job['job_id'], question_id, path, extension)
+        return self.jobs.get(job['job_id'])
+
+    def _stage_images(self, package, files):
+        """Copy uploads to disk before the request (and its file streams) ends: {image_key: (path, ext)}"""
+        os.makedirs(self.staging_folder, exist_ok=True)
+        staged, path = {}, None
+        try:
+            for topic in package['topics']:
+                for record in topic['questions']:
+                    key = record['image_key']
+                    if key:
+                        image = files[key]
+                        handle, path = tempfile.mkstemp(dir=self.staging_folder)
+                        with os.fdopen(handle, 'wb') as target:
+                            image.stream.seek(0)
+                            shutil.copyfileobj(image.stream, target)
+                        staged[key] = (path, image.filename.rsplit('.', 1)[-1].lower())
+                        path = None
+        except Exception:
+            # A failed copy (disk full, broken stream) leaves nothing behind in the staging folder
+            for staged_path in [path] + [staged_path for staged_path, _ in staged.values()]:
+                if staged_path and os.path.exists(staged_path):
+                    os.remove(staged_path)
+            raise
+        return staged
+
+    @staticmethod
+    def _write(package, staged):
+        """Insert the whole package; returns (subject_id, {question_id: staged image}, counts)"""
+        subject = Subject.query.filter_by(name=package['subject']['name']).first()
+        if not subject:
+            subject = Subject(name=package['subject']['name'], description=package['subject']['description'])
+            db.session.add(subject)
+            db.session.flush()
+
+        sets = []
+        for topic_data in package['topics']:
+            records = topic_data['questions']
+            for record in records:
+                record['question_id'] = str(uuid.uuid4())
+            topic = Topic(subject_id=subject.subject_id, name=topic_data['name'], difficulty_level=topic_data['difficulty_level'])
+            question_set = QuestionSet(
+                topic=topic, subject_id=subject.subject_id, difficulty_level=topic_data['difficulty_level'],
+                question_ids=[record['question_id'] for record in records],
+                min_questions=len(records), max_questions=len(records), success_threshold=80.0,
+                total_marks=sum(record['marks_worth'] for record in records)
+            )
+            db.session.add_all([topic, question_set])
+            sets.append((question_set, records))
+        db.session.flush()
+
+        rows, images = [], {}
+        for question_set, records in sets:
+            for record in records:
+                rows.append({
+                    'question_id': record['question_id'], 'set_id': question_set.question_set_id,
+                    'set_ref': question_set.id, 'description': record['description'],
+                    'options': record['options'], 'correct_option': record['correct_option'],
+                    'marks_worth': record['marks_worth'], 'explanation': record['explanation'] or '',
+                    'content_hash': record['content_hash'], 'irt_response_count': 0
+                })
+                if record['image_key']:
+                    images[record['question_id']] = staged[record['image_key']]
+        db.session.execute(insert(Question), rows)
+        db.session.commit()
+
+        return subject.subject_id, images, {'topics': len(sets), 'questions': len(rows)}
+
+    def _process_image(self, app, job_id, question_id, path, extension):
+        """Re-check the staged file, store it once per content and point the question at it"""
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            if not data.startswith(IMAGE_SIGNATURES[extension]):
+                raise ValueError(f"content is not a valid .{extension} image")
+
+            filename = f"{hashlib.sha256(data).hexdigest()[:32]}.{'jpg' if extension == 'jpeg' else extension}"
+            os.makedirs(self.upload_folder, exist_ok=True)
+            target = os.path.join(self.upload_folder, filename)
+            if os.path.exists(target):
+                os.remove(path)  # Same image already stored
+            else:
+                shutil.move(path, target)
+
+            with app.app_context():
+                db.session.execute(
+                    update(Question).where(Question.question_id == question_id)
+                    .values(image_url=f"{self.upload_url}/{filename}")
+                )
+                db.session.commit()
+            self.jobs.image_finished(job_id)
+
+        except Exception as e:
+            logger.warning("Content image processing failed",
+                           extra={'fields': {'job_id': job_id, 'question_id': question_id, 'error': str(e)}})
+            if os.path.exists(path):
+                os.remove(path)
+            self.jobs.image_finished(job_id, f"question {question_id}: {e}")
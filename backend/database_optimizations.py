@@ -5,12 +5,16 @@ Database optimization utilities for improved query performance
 from sqlalchemy import func, desc, and_
 from datetime import datetime, timedelta
 from .models import Quiz, Student, User, Subject, Topic, PerformanceTrend
+from .topic_progress import TopicProgressService
+from .trend_store import TrendStore
+from .read_routing import read_replica
 
 
 class DatabaseOptimizer:
     """Optimized database queries to reduce load and improve performance"""
     
     @staticmethod
+    @read_replica
     def get_dashboard_metrics_optimized():
         """Get dashboard metrics with optimized single queries"""
         from app import db
@@ -30,7 +34,7 @@ class DatabaseOptimizer:
             func.avg(Quiz.score).label('avg_score'),
             func.count(Quiz.id).label('quiz_count')
         ).join(User, Student.user_id == User.id)\
-         .join(Quiz, Student.student_id == Quiz.student_id)\
+         .join(Quiz, Student.id == Quiz.student_ref)\
          .group_by(Student.student_id, User.full_name)\
          .order_by(desc('avg_score'))\
          .limit(10).all()
@@ -42,7 +46,7 @@ class DatabaseOptimizer:
             func.avg(Quiz.score).label('avg_score'),
             func.count(Quiz.id).label('quiz_count')
         ).join(User, Student.user_id == User.id)\
-         .join(Quiz, Student.student_id == Quiz.student_id)\
+         .join(Quiz, Student.id == Quiz.student_ref)\
          .group_by(Student.student_id, User.full_name)\
          .having(func.avg(Quiz.score) < 60)\
          .order_by('avg_score')\
@@ -53,8 +57,8 @@ class DatabaseOptimizer:
             Subject.name,
             func.avg(Quiz.score).label('avg_score'),
             func.count(Quiz.id).label('quiz_count')
-        ).join(Topic, Subject.subject_id == Topic.subject_id)\
-         .join(Quiz, Topic.topic_id == Quiz.topic_id)\
+        ).join(Topic, Subject.id == Topic.subject_ref)\
+         .join(Quiz, Topic.id == Quiz.topic_ref)\
          .group_by(Subject.name)\
          .order_by(desc('avg_score')).all()
         
@@ -63,7 +67,7 @@ class DatabaseOptimizer:
             Topic.name,
             func.count(Quiz.id).label('attempt_count'),
             func.avg(Quiz.score).label('avg_score')
-        ).join(Quiz, Topic.topic_id == Quiz.topic_id)\
+        ).join(Quiz, Topic.id == Quiz.topic_ref)\
          .filter(Quiz.date_taken >= seven_days_ago)\
          .group_by(Topic.name)\
          .order_by(desc('attempt_count'))\
@@ -78,6 +82,7 @@ class DatabaseOptimizer:
         }
     
     @staticmethod
+    @read_replica
     def get_student_performance_optimized(student_id):
         """Get student performance data with optimized queries"""
         from app import db
@@ -89,8 +94,8 @@ class DatabaseOptimizer:
             Quiz.date_taken,
             Topic.name.label('topic_name'),
             Subject.name.label('subject_name')
-        ).join(Topic, Quiz.topic_id == Topic.topic_id)\
-         .join(Subject, Topic.subject_id == Subject.subject_id)\
+        ).join(Topic, Quiz.topic_ref == Topic.id)\
+         .join(Subject, Topic.subject_ref == Subject.id)\
          .filter(Quiz.student_id == student_id)\
          .order_by(desc(Quiz.date_taken))\
          .limit(10).all()
@@ -100,17 +105,8 @@ class DatabaseOptimizer:
             student_id=student_id
         ).all()
         
-        # Subject-wise performance (aggregated query)
-        subject_performance = db.session.query(
-            Subject.name,
-            func.avg(Quiz.score).label('avg_score'),
-            func.count(Quiz.id).label('quiz_count'),
-            func.max(Quiz.date_taken).label('last_attempt')
-        ).join(Topic, Subject.subject_id == Topic.subject_id)\
-         .join(Quiz, Topic.topic_id == Quiz.topic_id)\
-         .filter(Quiz.student_id == student_id)\
-         .group_by(Subject.name)\
-         .order_by(desc('avg_score')).all()
+        # Subject-wise performance from the progress read model
+        subject_performance = TopicProgressService.get_subject_averages(student_id)
         
         # Convert to format expected by templates
         recent_quizzes_formatted = [
@@ -132,12 +128,12 @@ class DatabaseOptimizer:
             {
                 'topic': t.topic.name,
                 'score': t.proficiency_score,
-                'data': t.trend_graph_data
+                'data': TrendStore.recent_scores(t)
             }
             for t in performance_trends
         ]
         
-        # Calculate completed topics (topics with scores >= 70)
+        # Calculate completed topics (average >= 70 over the recent quizzes)
         completed_topics = 0
         topic_scores = {}
         for q in recent_quizzes:
@@ -158,6 +154,7 @@ class DatabaseOptimizer:
         }
     
     @staticmethod
+    @read_replica
     def get_available_subjects_cached():
         """Get available subjects with caching considerations"""
         from app import db
@@ -200,15 +197,9 @@ class DatabaseOptimizer:
     
     @staticmethod
     def cleanup_old_sessions(days_old=7):
-        """Clean up old adaptive quiz sessions"""
-        from app import db
-        from .models import AdaptiveQuizSession
-        
-        cutoff_date = datetime.utcnow() - timedelta(days=days_old)
+        """Clean up unfinished adaptive quiz sessions in bounded batches"""
+        from .retention import RetentionJob, RetentionPolicy
         
-        deleted_count = db.session.query(AdaptiveQuizSession).filter(
-            AdaptiveQuizSession.created_at < cutoff_date
-        ).delete()
-        
-        db.session.commit()
-        return deleted_count
\ No newline at end of file
+        policy = RetentionPolicy.from_environment()
+        policy.session_days = days_old
+        return RetentionJob(policy).purge_sessions()['rows']
@@ -0,0 +1,112 @@
+"""
+Connection pool configuration and instrumentation
+
+Pools are sized per process from EnvironmentConfig.get_pool_settings() and
+hand out the most recently returned connection first (LIFO), so idle
+connections beyond the working set age out through pool_recycle instead of
+staying warm. Pre-ping and the 300s recycle stay on by default; deployments
+that know their idle timeouts can opt out with DB_POOL_PRE_PING=false and a
+longer DB_POOL_RECYCLE to save the extra round trip per checkout.
+"""
+
+import threading
+import time
+from sqlalchemy import exc, event
+from sqlalchemy.pool import QueuePool
+from .environment_config import EnvironmentConfig
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how long checkouts wait and how often they time out"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self.checkouts = 0
+        self.checkins = 0
+        self.connects = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        event.listen(self, 'checkin', self._on_checkin)
+        event.listen(self, 'connect', self._on_connect)
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            with self._stats_lock:
+                self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            with self._stats_lock:
+                self.checkouts += 1
+                self.total_wait += waited
+                self.max_wait = max(self.max_wait, waited)
+
+    def _on_checkin(self, dbapi_connection, connection_record):
+        with self._stats_lock:
+            self.checkins += 1
+
+    def _on_connect(self, dbapi_connection, connection_record):
+        with self._stats_lock:
+            self.connects += 1
+
+    def stats(self):
+        with self._stats_lock:
+            return {
+                'pool_size': self.size(),
+                'checked_out': self.checkedout(),
+                'checked_in': self.checkedin(),
+                'overflow': max(0, self.overflow()),
+                'max_overflow': self._max_overflow,
+                'checkouts': self.checkouts,
+                'checkins': self.checkins,
+                'connections_opened': self.connects,
+                'timeouts': self.timeouts,
+                'avg_wait_ms': round(self.total_wait / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                'max_wait_ms': round(self.max_wait * 1000, 3)
+            }
+
+
+def engine_options(database_url):
+    """SQLALCHEMY_ENGINE_OPTIONS for the primary database and any binds"""
+    settings = EnvironmentConfig.get_pool_settings()
+    options = {
+        'pool_recycle': settings['pool_recycle'],
+        'pool_pre_ping': settings['pool_pre_ping']
+    }
+    # In-memory SQLite is a single connection per thread; there is nothing to size
+    if database_url.startswith('sqlite') and ':memory:' in database_url:
+        return options
+
+    options.update({
+        'poolclass': InstrumentedQueuePool,
+        'pool_size': settings['pool_size'],
+        'max_overflow': settings['max_overflow'],
+        'pool_timeout': settings['pool_timeout'],
+        'pool_use_lifo': True
+    })
+    return options
+
+
+def pool_stats(engines):
+    """Snapshot of every engine's pool, keyed by bind name ('primary' for the default)"""
+    snapshot = {}
+    for bind, engine in engines.items():
+        pool = engine.pool
+        if isinstance(pool, InstrumentedQueuePool):
+            stats = pool.stats()
+        else:
+            stats = {'status': pool.status()}
+        stats['pool_class'] = type(pool).__name__
+        stats['dialect'] = engine.dialect.name
+        snapshot[bind or 'primary'] = stats
+
+    settings = EnvironmentConfig.get_pool_settings()
+    snapshot['config'] = {key: settings[key] for key in (
+        'workers', 'threads', 'pool_size', 'max_overflow', 'pool_timeout', 'pool_recycle', 'pool_pre_ping'
+    )}
+    return snapshot
@@ -21,7 +21,8 @@ class EnvironmentConfig:
         # Validate URL format
         try:
             parsed = urlparse(database_url)
-            if not parsed.scheme or not parsed.netloc:
+            # SQLite URLs carry a path instead of a host (local development and replica testing)
+            if not parsed.scheme or not (parsed.netloc or parsed.scheme.startswith('sqlite')):
                 raise ValueError("Invalid DATABASE_URL format")
         except Exception as e:
             logging.error(f"Invalid DATABASE_URL: {e}")
@@ -46,6 +47,139 @@ class EnvironmentConfig:
         """Get Gemini API key if available"""
         return os.environ.get('GEMINI_API_KEY')
     
+    @staticmethod
+    def get_proficiency_settings():
+        """Get proficiency model selection and tuning parameters"""
+        half_life = os.environ.get('PROFICIENCY_HALF_LIFE_DAYS')
+        return {
+            'model': os.environ.get('PROFICIENCY_MODEL', 'ewma').lower(),
+            'alpha': float(os.environ.get('PROFICIENCY_ALPHA', '0.3')),
+            'half_life_days': float(half_life) if half_life else None
+        }
+    
+    @staticmethod
+    def get_retention_settings():
+        """Get data retention windows (days), batching and schedule"""
+        interval = os.environ.get('RETENTION_INTERVAL_HOURS')
+        return {
+            'session_days': int(os.environ.get('RETENTION_SESSION_DAYS', '7')),
+            'orphan_quiz_days': int(os.environ.get('RETENTION_ORPHAN_QUIZ_DAYS', '1')),
+            'trend_event_days': int(os.environ.get('RETENTION_TREND_EVENT_DAYS', '365')),
+            'receipt_days': int(os.environ.get('RETENTION_RECEIPT_DAYS', '2')),
+            'batch_size': int(os.environ.get('RETENTION_BATCH_SIZE', '1000')),
+            'pause_seconds': float(os.environ.get('RETENTION_PAUSE_SECONDS', '0.2')),
+            'interval_hours': float(interval) if interval else None
+        }
+    
+    @staticmethod
+    def get_pool_settings():
+        """Get per-process connection pool sizing, derived from the gunicorn worker model"""
+        workers = int(os.environ.get('WEB_CONCURRENCY') or os.environ.get('GUNICORN_WORKERS') or '1')
+        threads = int(os.environ.get('GUNICORN_THREADS', '1'))
+        # One connection per request thread plus one for background work (retention, sweeps);
+        # overflow covers the adaptive prefetch workers
+        pool_size = int(os.environ.get('DB_POOL_SIZE', str(threads + 1)))
+        max_overflow = int(os.environ.get('DB_MAX_OVERFLOW', '2'))
+        
+        # Keep workers * (pool_size + max_overflow) within the server's connection budget
+        max_connections = os.environ.get('DB_MAX_CONNECTIONS')
+        if max_connections:
+            per_worker = max(1, int(max_connections) // workers)
+            pool_size = min(pool_size, per_worker)
+            max_overflow = max(0, min(max_overflow, per_worker - pool_size))
+        
+        return {
+            'workers': workers,
+            'threads': threads,
+            'pool_size': pool_size,
+            'max_overflow': max_overflow,
+            'pool_timeout': float(os.environ.get('DB_POOL_TIMEOUT', '10')),
+            # Baseline safety defaults; raise recycle or disable pre-ping only where idle
+            # connections are known not to be cut (no proxy or server idle timeout below it)
+            'pool_recycle': int(os.environ.get('DB_POOL_RECYCLE', '300')),
+            'pool_pre_ping': os.environ.get('DB_POOL_PRE_PING', 'true').lower() in ['true', '1', 'yes']
+        }
+    
+    @staticmethod
+    def get_replica_database_url():
+        """Get the optional read-replica URL used for analytics queries"""
+        return os.environ.get('DATABASE_REPLICA_URL') or None
+    
+    @staticmethod
+    def get_replica_sticky_seconds():
+        """Get how long a user reads from the primary after writing (covers replica lag)"""
+        return float(os.environ.get('REPLICA_STICKY_SECONDS', '30'))
+    
+    @staticmethod
+    def get_query_budget_settings():
+        """Get per-request SQL statement budget and N+1 detection threshold"""
+        return {
+            'enabled': os.environ.get('QUERY_TRACKING', 'true').lower() in ['true', '1', 'yes'],
+            'budget': int(os.environ.get('QUERY_BUDGET', '30')),
+            'nplus1_threshold': int(os.environ.get('QUERY_NPLUS1_THRESHOLD', '5'))
+        }
+    
+    @staticmethod
+    def get_metrics_settings():
+        """
+        Get request metrics switches. With METRICS_TOKEN set, /metrics requires
+        "Authorization: Bearer <token>"; otherwise it answers loopback callers
+        unless remote is allowed.
+        """
+        return {
+            'enabled': os.environ.get('METRICS_ENABLED', 'true').lower() in ['true', '1', 'yes'],
+            'token': os.environ.get('METRICS_TOKEN') or None,
+            'allow_remote': os.environ.get('METRICS_ALLOW_REMOTE', 'false').lower() in ['true', '1', 'yes']
+        }
+    
+    @staticmethod
+    def get_proxy_count():
+        """Get how many reverse proxies sit in front of the app (0 when clients connect directly)"""
+        return int(os.environ.get('PROXY_COUNT', '1'))
+    
+    @staticmethod
+    def get_logging_settings():
+        """Get log level, output format and DEBUG sampling (LOG_SAMPLE_ROUTES="submit_quiz=1.0,...")"""
+        production = EnvironmentConfig.is_production()
+        route_rates = {}
+        for pair in os.environ.get('LOG_SAMPLE_ROUTES', '').split(','):
+            if '=' in pair:
+                endpoint, rate = pair.split('=', 1)
+                route_rates[endpoint.strip()] = float(rate)
+        
+        return {
+            'level': os.environ.get('LOG_LEVEL', 'INFO').upper(),
+            'format': os.environ.get('LOG_FORMAT', 'json' if production else 'text').lower(),
+            'debug_sample_rate': float(os.environ.get('LOG_DEBUG_SAMPLE_RATE', '0.01' if production else '1.0')),
+            'route_sample_rates': route_rates
+        }
+    
+    @staticmethod
+    def get_profiler_settings():
+        """Get the opt-in request profiler: sample rate, slow threshold and trace buffer"""
+        return {
+            'enabled': os.environ.get('PROFILER_ENABLED', 'false').lower() in ['true', '1', 'yes'],
+            'mode': os.environ.get('PROFILER_MODE', 'sampling').lower(),
+            'sample_rate': float(os.environ.get('PROFILER_SAMPLE_RATE', '0.01')),
+            'slow_ms': float(os.environ.get('PROFILER_SLOW_MS', '1000')),
+            'interval_ms': float(os.environ.get('PROFILER_INTERVAL_MS', '5')),
+            'buffer_size': int(os.environ.get('PROFILER_BUFFER_SIZE', '50'))
+        }
+    
+    @staticmethod
+    def get_content_job_settings():
+        """Get bulk content package limits and the background image worker pool size"""
+        return {
+            'image_workers': int(os.environ.get('CONTENT_IMAGE_WORKERS', '4')),
+            'job_ttl': int(os.environ.get('CONTENT_JOB_TTL', '3600')),
+            'max_questions': int(os.environ.get('CONTENT_MAX_QUESTIONS', '5000'))
+        }
+    
+    @staticmethod
+    def get_auto_migrate():
+        """Apply pending schema migrations at startup (development convenience)"""
+        return os.environ.get('AUTO_MIGRATE', 'false').lower() in ['true', '1', 'yes']
+    
     @staticmethod
     def is_production():
         """Check if running in production environment"""
@@ -77,6 +211,7 @@ class EnvironmentConfig:
         logging.info("Environment validation successful")
         logging.info(f"Database URL configured: {'Yes' if os.environ.get('DATABASE_URL') else 'No'}")
         logging.info(f"Session secret configured: {'Yes' if os.environ.get('SESSION_SECRET') else 'No (using fallback)'}")
+        logging.info(f"Read replica configured: {'Yes' if os.environ.get('DATABASE_REPLICA_URL') else 'No'}")
         logging.info(f"Gemini API configured: {'Yes' if os.environ.get('GEMINI_API_KEY') else 'No'}")
         logging.info(f"Production mode: {EnvironmentConfig.is_production()}")
         
@@ -0,0 +1,78 @@
+"""
+Idempotent quiz submissions: each submission carries a key, and its result is
+stored once so retried or double-clicked POSTs replay it instead of writing again
+"""
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm.exc import StaleDataError
+from app import db
+from .models import SubmissionReceipt
+from .performance_cache import cache
+
+
+# Raised on commit when a concurrent request already wrote the same submission
+CONFLICT_ERRORS = (IntegrityError, StaleDataError)
+
+
+class IdempotencyStore:
+    """
+    Receipts live in the submission_receipts table; the in-process cache in
+    front of it means a retry is normally answered without touching the database.
+    """
+
+    CACHE_TTL = 3600  # Retries arrive within seconds; an hour is generous
+
+    @staticmethod
+    def quiz_key(quiz_id):
+        return f"quiz:{quiz_id}"
+
+    @staticmethod
+    def adaptive_key(session_id, set_number):
+        return f"adaptive:{session_id}:{set_number}"
+
+    @staticmethod
+    def lookup(key, student_id):
+        """
+        Stored response for a key, or None if it has not been processed. Only
+        the learner who made the submission gets it back: keys embed quiz ids,
+        which are visible elsewhere (e.g. quiz history), so they are not secrets.
+        """
+        if not key or not student_id:
+            return None
+
+        entry = cache.get(f"receipt:{key}")
+        if entry is None:
+            receipt = db.session.get(SubmissionReceipt, key)
+            if receipt is None:
+                return None
+            entry = {'student_id': receipt.student_id, 'response': receipt.response}
+            cache.set(f"receipt:{key}", entry, ttl=IdempotencyStore.CACHE_TTL)
+        if entry['student_id'] != student_id:
+            return None
+        return entry['response']
+
+    @staticmethod
+    def record(key, student_id, response, quiz_id=None):
+        """Add a receipt to the current transaction. The caller owns the commit."""
+        db.session.add(SubmissionReceipt(
+            idempotency_key=key,
+            student_id=student_id,
+            quiz_id=quiz_id,
+            response=response
+        ))
+
+    @staticmethod
+    def amend(key, **fields):
+        """Merge extra fields (e.g. generated feedback) into a committed receipt"""
+        receipt = db.session.get(SubmissionReceipt, key)
+        if receipt is None:
+            return
+        receipt.response = {**(receipt.response or {}), **fields}
+        db.session.commit()
+        cache.delete(f"receipt:{key}")
+
+    @staticmethod
+    def resolve_conflict(key, student_id):
+        """Roll back a losing concurrent write and return the winner's response, if it was this learner's"""
+        db.session.rollback()
+        return IdempotencyStore.lookup(key, student_id)
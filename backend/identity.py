@@ -0,0 +1,97 @@
+"""
+Request identity for Flask-Login
+
+load_user used to fetch the User row on every request, and routes then
+queried the role profile again. Identity is a detached snapshot of the user
+and their profile ids, built with one joined query and cached briefly, so
+most requests resolve current_user.student_id / teacher_id without touching
+the database. Full profile rows are still available, loaded on first use and
+kept on flask.g for the rest of the request.
+"""
+
+from flask import g, has_app_context
+from flask_login import UserMixin
+from sqlalchemy.orm import joinedload
+from app import db
+from .models import User, Student, Teacher, Admin
+from .performance_cache import cache
+
+IDENTITY_TTL = 60  # Seconds a role or profile change may take to show up
+
+
+class Identity(UserMixin):
+    """The logged-in user as current_user sees it"""
+
+    def __init__(self, id, user_id, email, full_name, role,
+                 student_id=None, teacher_id=None, admin_id=None,
+                 student_pk=None, teacher_pk=None, admin_pk=None):
+        self.id = id
+        self.user_id = user_id
+        self.email = email
+        self.full_name = full_name
+        self.role = role
+        self.student_id = student_id
+        self.teacher_id = teacher_id
+        self.admin_id = admin_id
+        self._profile_pks = {Student: student_pk, Teacher: teacher_pk, Admin: admin_pk}
+
+    @classmethod
+    def load(cls, user_pk):
+        """Identity for users.id, from the cache or one joined query"""
+        key = cls.cache_key(user_pk)
+        identity = cache.get(key)
+        if identity is not None:
+            return identity
+
+        row = db.session.query(
+            User.id, User.user_id, User.email, User.full_name, User.role,
+            Student.student_id, Teacher.teacher_id, Admin.admin_id,
+            Student.id.label('student_pk'), Teacher.id.label('teacher_pk'), Admin.id.label('admin_pk')
+        ).outerjoin(Student, Student.user_id == User.id)\
+         .outerjoin(Teacher, Teacher.user_id == User.id)\
+         .outerjoin(Admin, Admin.user_id == User.id)\
+         .filter(User.id == user_pk).first()
+        if row is None:
+            return None
+
+        identity = cls(**row._asdict())
+        cache.set(key, identity, ttl=IDENTITY_TTL)
+        return identity
+
+    @staticmethod
+    def cache_key(user_pk):
+        return f"identity:{user_pk}"
+
+    @classmethod
+    def invalidate(cls, user_pk):
+        """Drop the cached snapshot after changing a user's role or profile"""
+        cache.delete(cls.cache_key(user_pk))
+
+    def _profile(self, model):
+        """Profile row, queried once per request (the snapshot itself is shared across requests)"""
+        pk = self._profile_pks[model]
+        if pk is None:
+            return None
+        if not has_app_context():
+            return self._query_profile(model, pk)
+
+        profiles = g.setdefault('identity_profiles', {})
+        if (model, pk) not in profiles:
+            profiles[(model, pk)] = self._query_profile(model, pk)
+        return profiles[(model, pk)]
+
+    @staticmethod
+    def _query_profile(model, pk):
+        return model.query.options(joinedload(model.user)).filter(model.id == pk).first()
+
+    @property
+    def student_profile(self):
+        return self._profile(Student)
+
+    @property
+    def teacher_profile(self):
+        return self._profile(Teacher)
+
+    @property
+    def admin_profile(self):
+        return self._profile(Admin)
@@ -0,0 +1,189 @@
+"""
+Offline item response theory (2PL) calibration of question difficulty and
+discrimination from recorded quiz responses
+"""
+
+import logging
+from array import array
+from datetime import datetime
+import numpy as np
+from sqlalchemy import select, update, bindparam
+from app import db
+from .models import Question, QuestionSet, Quiz, QuizResponse
+
+
+# Starting difficulty for each hand-set label, on the ability (logit) scale
+DIFFICULTY_PRIORS = {
+    'Very Easy': -2.0,
+    'Easy': -1.0,
+    'Medium': 0.0,
+    'Hard': 1.0,
+    'Very Hard': 2.0
+}
+
+
+def difficulty_prior(difficulty_level):
+    """Map a QuestionSet difficulty label onto the IRT difficulty scale"""
+    if not difficulty_level:
+        return 0.0
+    for label, value in DIFFICULTY_PRIORS.items():
+        if label.lower() == difficulty_level.lower():
+            return value
+    return 0.0
+
+
+def item_parameters(question, difficulty_level=None):
+    """Calibrated (discrimination, difficulty) for a question, falling back to the label prior"""
+    if question.irt_difficulty is not None and question.irt_discrimination is not None:
+        return question.irt_discrimination, question.irt_difficulty
+    return 1.0, difficulty_prior(difficulty_level)
+
+
+class IRTCalibrator:
+    """
+    Joint maximum a posteriori estimation of a two-parameter logistic model.
+    Responses are streamed from the database in chunks into compact integer
+    arrays, then every iteration is a handful of vectorized NumPy passes.
+    """
+
+    MAX_STEP = 0.5  # Damping for each Newton step on the logit scale
+
+    def __init__(self, chunk_size=10000, max_iterations=100, tolerance=1e-3,
+                 min_responses=20, discrimination_bounds=(0.2, 4.0)):
+        self.chunk_size = chunk_size
+        self.max_iterations = max_iterations
+        self.tolerance = tolerance
+        self.min_responses = min_responses
+        self.discrimination_bounds = discrimination_bounds
+
+    def load_responses(self):
+        """Stream (learner, question, correct) triples into index-encoded arrays"""
+        person_index = {}
+        item_index = {}
+        persons = array('i')
+        items = array('i')
+        correct = array('b')
+
+        result = db.session.execute(
+            select(Quiz.student_id, QuizResponse.question_id, QuizResponse.is_correct)
+            .join(Quiz, QuizResponse.quiz_ref == Quiz.id)
+            .execution_options(yield_per=self.chunk_size)
+        )
+
+        for chunk in result.partitions():
+            for student_id, question_id, is_correct in chunk:
+                persons.append(person_index.setdefault(student_id, len(person_index)))
+                items.append(item_index.setdefault(question_id, len(item_index)))
+                correct.append(1 if is_correct else 0)
+
+        return (
+            np.frombuffer(persons, dtype=np.int32),
+            np.frombuffer(items, dtype=np.int32),
+            np.frombuffer(correct, dtype=np.int8).astype(np.float64),
+            person_index,
+            item_index
+        )
+
+    def load_item_priors(self, item_index):
+        """Prior difficulty for each encoded item from its question set label"""
+        priors = np.zeros(len(item_index))
+        question_ids = list(item_index.keys())
+        for start in range(0, len(question_ids), self.chunk_size):
+            batch = question_ids[start:start + self.chunk_size]
+            rows = db.session.query(
+                Question.question_id,
+                QuestionSet.difficulty_level
+            ).join(QuestionSet, Question.set_id == QuestionSet.question_set_id)\
+             .filter(Question.question_id.in_(batch)).all()
+            for question_id, difficulty_level in rows:
+                priors[item_index[question_id]] = difficulty_prior(difficulty_level)
+        return priors
+
+    def fit(self, persons, items, correct, n_persons, n_items, difficulty_priors=None):
+        """Return (ability, discrimination, difficulty) arrays"""
+        theta = np.zeros(n_persons)
+        a = np.ones(n_items)
+        b_prior = np.zeros(n_items) if difficulty_priors is None else np.asarray(difficulty_priors, dtype=float)
+        b = b_prior.copy()
+        low, high = self.discrimination_bounds
+
+        for iteration in range(self.max_iterations):
+            # Ability step, standard normal prior
+            a_i = a[items]
+            p = 1.0 / (1.0 + np.exp(-a_i * (theta[persons] - b[items])))
+            residual = correct - p
+            info = p * (1.0 - p)
+            gradient = np.bincount(persons, a_i * residual, n_persons) - theta
+            hessian = np.bincount(persons, a_i * a_i * info, n_persons) + 1.0
+            theta_step = np.clip(gradient / hessian, -self.MAX_STEP, self.MAX_STEP)
+            theta += theta_step
+            # Pin the scale so difficulty and discrimination stay identifiable
+            theta = (theta - theta.mean()) / (theta.std() or 1.0)
+
+            # Item steps, normal prior on difficulty around the label and on discrimination around 1
+            distance = theta[persons] - b[items]
+            p = 1.0 / (1.0 + np.exp(-a_i * distance))
+            residual = correct - p
+            info = p * (1.0 - p)
+
+            gradient = -np.bincount(items, a_i * residual, n_items) - (b - b_prior)
+            hessian = np.bincount(items, a_i * a_i * info, n_items) + 1.0
+            b_step = np.clip(gradient / hessian, -self.MAX_STEP, self.MAX_STEP)
+            b += b_step
+
+            gradient = np.bincount(items, residual * distance, n_items) - (a - 1.0) / 0.25
+            hessian = np.bincount(items, info * distance * distance, n_items) + 1.0 / 0.25
+            a_step = np.clip(gradient / hessian, -self.MAX_STEP, self.MAX_STEP)
+            a = np.clip(a + a_step, low, high)
+
+            change = max(np.abs(theta_step).max(initial=0.0), np.abs(b_step).max(initial=0.0),
+                         np.abs(a_step).max(initial=0.0))
+            if change < self.tolerance:
+                logging.info(f"IRT calibration converged after {iteration + 1} iterations")
+                break
+
+        return theta, a, b
+
+    def calibrate(self, dry_run=False):
+        """Fit the model on all responses and store parameters on the questions"""
+        persons, items, correct, person_index, item_index = self.load_responses()
+        if persons.size == 0:
+            return {'responses': 0, 'learners': 0, 'items_calibrated': 0, 'items_skipped': 0}
+
+        priors = self.load_item_priors(item_index)
+        _, a, b = self.fit(persons, items, correct, len(person_index), len(item_index), priors)
+        counts = np.bincount(items, minlength=len(item_index))
+
+        calibrated_at = datetime.utcnow()
+        updates = [
+            {
+                'target_question_id': question_id,
+                'difficulty': float(b[index]),
+                'discrimination': float(a[index]),
+                'response_count': int(counts[index]),
+                'calibrated_at': calibrated_at
+            }
+            for question_id, index in item_index.items()
+            if counts[index] >= self.min_responses
+        ]
+
+        if not dry_run:
+            questions = Question.__table__
+            statement = update(questions)\
+                .where(questions.c.question_id == bindparam('target_question_id'))\
+                .values(
+                    irt_difficulty=bindparam('difficulty'),
+                    irt_discrimination=bindparam('discrimination'),
+                    irt_response_count=bindparam('response_count'),
+                    irt_calibrated_at=bindparam('calibrated_at')
+                )
+            for start in range(0, len(updates), self.chunk_size):
+                db.session.execute(statement, updates[start:start + self.chunk_size])
+                db.session.commit()
+
+        return {
+            'responses': int(persons.size),
+            'learners': len(person_index),
+            'items_calibrated': len(updates),
+            'items_skipped': len(item_index) - len(updates)
+        }
@@ -0,0 +1,280 @@
+"""
+In-process metrics in the Prometheus text exposition format
+
+Request middleware records latency histograms, status counts and in-flight
+requests per endpoint; other modules record into the shared registry (DB
+time from query_budget, AI latency from ai_service) and collectors sample
+the response cache and connection pools at scrape time.
+
+Counts are per process: with several gunicorn workers each worker serves
+its own /metrics, so scrape them individually or aggregate in Prometheus.
+"""
+
+import bisect
+import hmac
+import ipaddress
+import threading
+import time
+from flask import g, request, Response
+from .environment_config import EnvironmentConfig
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+AI_LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0)
+
+
+def _format_labels(labelnames, values, extra=()):
+    pairs = list(zip(labelnames, values)) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, v in pairs)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+
+def _format_value(value):
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}")
+        return tuple(str(value) for value in labels)
+
+    def header(self):
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def inc(self, *labels, amount=1):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        return self.header() + [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+                                for key, value in items]
+
+
+class Gauge(Counter):
+    kind = 'gauge'
+
+    def dec(self, *labels, amount=1):
+        self.inc(*labels, amount=-amount)
+
+    def set(self, *labels, value):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, *labels, value):
+        key = self._key(labels)
+        with self._lock:
+            series = self._values.get(key)
+            if series is None:
+                series = self._values[key] = {'buckets': [0] * len(self.buckets), 'sum': 0.0, 'count': 0}
+            index = bisect.bisect_left(self.buckets, value)
+            if index < len(self.buckets):
+                series['buckets'][index] += 1
+            series['sum'] += value
+            series['count'] += 1
+
+    def render(self):
+        with self._lock:
+            items = sorted((key, dict(series, buckets=list(series['buckets'])))
+                           for key, series in self._values.items())
+        lines = self.header()
+        for key, series in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, series['buckets']):
+                cumulative += count
+                labels = _format_labels(self.labelnames, key, [('le', _format_value(bound))])
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key, [('le', '+Inf')])
+            lines.append(f"{self.name}_bucket{labels} {series['count']}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {series['sum']:.6f}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {series['count']}")
+        return lines
+
+
+class MetricsRegistry:
+    """Named metrics plus collectors that produce samples when scraped"""
+
+    def __init__(self):
+        self._metrics = {}
+        self._collectors = []
+        self._lock = threading.Lock()
+
+    def _register(self, cls, name, *args, **kwargs):
+        with self._lock:
+            if name not in self._metrics:
+                self._metrics[name] = cls(name, *args, **kwargs)
+            return self._metrics[name]
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter, name, documentation, labelnames)
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self._register(Gauge, name, documentation, labelnames)
+
+    def histogram(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self._register(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def add_collector(self, collect):
+        """collect() returns [(name, type, help, [(labels dict, value)])], sampled per scrape"""
+        self._collectors.append(collect)
+
+    def render(self):
+        lines = []
+        for metric in list(self._metrics.values()):
+            lines.extend(metric.render())
+        for collect in self._collectors:
+            for name, kind, documentation, samples in collect():
+                lines.append(f"# HELP {name} {documentation}")
+                lines.append(f"# TYPE {name} {kind}")
+                for labels, value in samples:
+                    lines.append(f"{name}{_format_labels(labels.keys(), labels.values())} {_format_value(value)}")
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
+
+REQUEST_LATENCY = registry.histogram(
+    'nura_http_request_duration_seconds', 'Request latency by endpoint', ('endpoint', 'method'))
+REQUESTS = registry.counter(
+    'nura_http_requests_total', 'Requests by endpoint and status code', ('endpoint', 'method', 'status'))
+IN_FLIGHT = registry.gauge(
+    'nura_http_requests_in_flight', 'Requests currently being served')
+REQUEST_DB_TIME = registry.histogram(
+    'nura_http_request_db_seconds', 'Time spent in SQL per request', ('endpoint',))
+REQUEST_QUERIES = registry.counter(
+    'nura_http_request_queries_total', 'SQL statements executed by endpoint', ('endpoint',))
+AI_LATENCY = registry.histogram(
+    'nura_ai_request_duration_seconds', 'Gemini call latency by operation and outcome',
+    ('operation', 'outcome'), buckets=AI_LATENCY_BUCKETS)
+
+
+def _collect_cache():
+    from .performance_cache import cache
+    stats = cache.stats()
+    lookups = stats['hits'] + stats['misses']
+    return [
+        ('nura_cache_lookups_total', 'counter', 'Response cache lookups by result',
+         [({'result': 'hit'}, stats['hits']), ({'result': 'miss'}, stats['misses'])]),
+        ('nura_cache_hit_ratio', 'gauge', 'Response cache hits over lookups since startup',
+         [({}, round(stats['hits'] / lookups, 4) if lookups else 0)]),
+        ('nura_cache_entries', 'gauge', 'Entries currently held in the response cache',
+         [({}, stats['entries'])])
+    ]
+
+
+def _collect_retention():
+    from .retention import RetentionJob
+    report = RetentionJob.last_report
+    return [
+        ('nura_retention_rows_purged_total', 'counter', 'Rows reclaimed by the retention job by table',
+         [({'table': table}, rows) for table, rows in sorted(RetentionJob.totals.items())]),
+        ('nura_retention_last_run_seconds', 'gauge', 'Duration of the last retention run',
+         [({}, report['duration_seconds'])] if report else [])
+    ]
+
+
+class RequestMetrics:
+    """Flask hooks that time every request"""
+
+    _app = None
+
+    @classmethod
+    def init_app(cls, app):
+        settings = EnvironmentConfig.get_metrics_settings()
+        if not settings['enabled']:
+            return
+        cls._app = app
+        app.before_request(cls._start_request)
+        app.after_request(cls.record_status)
+        app.teardown_request(cls._finish_request)
+        registry.add_collector(_collect_cache)
+        registry.add_collector(_collect_retention)
+        registry.add_collector(cls._collect_pools)
+
+    @staticmethod
+    def _start_request():
+        g.metrics_started = time.perf_counter()
+        IN_FLIGHT.inc()
+
+    @staticmethod
+    def _finish_request(error=None):
+        started = g.pop('metrics_started', None)
+        if started is None:
+            return
+        IN_FLIGHT.dec()
+        endpoint = request.endpoint or 'unmatched'
+        status = 500 if error else g.get('metrics_status', 200)
+        REQUEST_LATENCY.observe(endpoint, request.method, value=time.perf_counter() - started)
+        REQUESTS.inc(endpoint, request.method, status)
+
+    @staticmethod
+    def record_status(response):
+        """after_request hook: teardown only sees the exception, not the response"""
+        g.metrics_status = response.status_code
+        return response
+
+    @classmethod
+    def _collect_pools(cls):
+        from .db_pool import pool_stats
+        with cls._app.app_context():
+            snapshot = pool_stats(cls._app.extensions['sqlalchemy'].engines)
+        snapshot.pop('config')
+        samples = {'checked_out': [], 'overflow': [], 'timeouts': []}
+        for bind, stats in snapshot.items():
+            for field in samples:
+                if field in stats:
+                    samples[field].append(({'bind': bind}, stats[field]))
+        return [
+            ('nura_db_pool_checked_out', 'gauge', 'Connections currently checked out', samples['checked_out']),
+            ('nura_db_pool_overflow', 'gauge', 'Connections open beyond pool_size', samples['overflow']),
+            ('nura_db_pool_timeouts_total', 'counter', 'Checkouts that timed out waiting', samples['timeouts'])
+        ]
+
+
+def scrape_allowed():
+    """
+    With METRICS_TOKEN set, only requests bearing it. Otherwise loopback
+    callers, or anyone when METRICS_ALLOW_REMOTE is set. The loopback check
+    relies on PROXY_COUNT matching the deployment: behind an uncounted proxy
+    every request arrives from the proxy's address.
+    """
+    settings = EnvironmentConfig.get_metrics_settings()
+    if settings['token']:
+        scheme, _, credentials = request.headers.get('Authorization', '').partition(' ')
+        return scheme.lower() == 'bearer' and hmac.compare_digest(credentials.encode(), settings['token'].encode())
+    if settings['allow_remote']:
+        return True
+    try:
+        return ipaddress.ip_address(request.remote_addr or '').is_loopback
+    except ValueError:
+        return False
+
+
+def metrics_response():
+    return Response(registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,108 @@
+"""
+Versioned schema migrations
+
+Each module in this package named mNNNN_<name>.py defines VERSION,
+DESCRIPTION and upgrade(connection), plus an optional data_upgrade() that
+runs through the ORM session once all pending DDL has committed. Applied
+versions are recorded in the schema_version table.
+"""
+
+import importlib
+import logging
+import pkgutil
+from datetime import datetime
+from sqlalchemy import Table, Column, Integer, String, DateTime, MetaData, select, func, insert
+from sqlalchemy.exc import OperationalError, ProgrammingError
+from app import db
+
+
+schema_version = Table(
+    'schema_version', MetaData(),
+    Column('version', Integer, primary_key=True),
+    Column('description', String(200)),
+    Column('applied_at', DateTime)
+)
+
+
+def load_migrations():
+    """All migration modules ordered by VERSION"""
+    modules = [
+        importlib.import_module(f"{__name__}.{name}")
+        for _, name, _ in pkgutil.iter_modules(__path__)
+        if name.startswith('m')
+    ]
+    return sorted(modules, key=lambda module: module.VERSION)
+
+
+def latest_version():
+    migrations = load_migrations()
+    return migrations[-1].VERSION if migrations else 0
+
+
+def current_version():
+    """Highest applied version; 0 for a database that predates migrations"""
+    try:
+        return db.session.execute(select(func.max(schema_version.c.version))).scalar() or 0
+    except (OperationalError, ProgrammingError):
+        db.session.rollback()
+        return 0
+
+
+def history():
+    """Applied migrations, oldest first"""
+    try:
+        return db.session.execute(select(schema_version).order_by(schema_version.c.version)).all()
+    except (OperationalError, ProgrammingError):
+        db.session.rollback()
+        return []
+
+
+def pending(target=None):
+    current = current_version()
+    return [
+        migration for migration in load_migrations()
+        if migration.VERSION > current and (target is None or migration.VERSION <= target)
+    ]
+
+
+def upgrade(target=None, progress=None):
+    """
+    Apply pending migrations in order. All DDL runs first, each migration in its
+    own transaction, so data steps can use the current models. A version is
+    recorded once its data step is done; every step is idempotent, so a failed
+    upgrade can simply be re-run. Returns the versions applied.
+    """
+    schema_version.create(db.engine, checkfirst=True)
+    migrations = pending(target)
+
+    for migration in migrations:
+        if progress:
+            progress(migration)
+        with db.engine.begin() as connection:
+            migration.upgrade(connection)
+
+    for migration in migrations:
+        if hasattr(migration, 'data_upgrade'):
+            migration.data_upgrade()
+            db.session.commit()
+
+        with db.engine.begin() as connection:
+            connection.execute(insert(schema_version).values(
+                version=migration.VERSION,
+                description=migration.DESCRIPTION,
+                applied_at=datetime.utcnow()
+            ))
+
+    return [migration.VERSION for migration in migrations]
+
+
+def check_schema():
+    """Startup check: one cheap query instead of catalog introspection. Returns True if current."""
+    current, latest = current_version(), latest_version()
+    if current < latest:
+        logging.warning(
+            f"Database schema is at version {current}, code expects {latest}. "
+            f"Run: python -m scripts.migrate upgrade"
+        )
+        return False
+    return True
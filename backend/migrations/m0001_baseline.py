@@ -0,0 +1,14 @@
+"""
+Create every table that does not exist yet. A fresh database gets the full
+current schema here and the later migrations find nothing to do.
+"""
+
+from app import db
+import backend.models  # noqa: F401  (registers every table on db.metadata)
+
+VERSION = 1
+DESCRIPTION = "Baseline: create missing tables"
+
+
+def upgrade(connection):
+    db.metadata.create_all(connection, checkfirst=True)
@@ -0,0 +1,22 @@
+"""
+Packed rolling window on performance_trends, and a first build of the
+student_topic_progress read model from quiz history
+"""
+
+from backend.models import PerformanceTrend, StudentTopicProgress, Quiz
+from .operations import add_column
+
+VERSION = 2
+DESCRIPTION = "Trend store window columns and topic progress read model"
+
+
+def upgrade(connection):
+    for column in ('window_scores', 'window_head', 'window_count', 'window_sum', 'event_count'):
+        add_column(connection, PerformanceTrend, column)
+
+
+def data_upgrade():
+    from backend.topic_progress import TopicProgressService
+
+    if not StudentTopicProgress.query.first() and Quiz.query.first():
+        TopicProgressService.rebuild()
@@ -0,0 +1,17 @@
+"""
+IRT item parameters on questions, CAT state and the optimistic lock
+version on adaptive sessions
+"""
+
+from backend.models import Question, AdaptiveQuizSession
+from .operations import add_column
+
+VERSION = 3
+DESCRIPTION = "IRT parameters, CAT session state and session version column"
+
+
+def upgrade(connection):
+    for column in ('irt_difficulty', 'irt_discrimination', 'irt_response_count', 'irt_calibrated_at'):
+        add_column(connection, Question, column)
+    for column in ('mode', 'ability_estimate', 'ability_se', 'version'):
+        add_column(connection, AdaptiveQuizSession, column)
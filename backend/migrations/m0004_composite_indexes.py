@@ -0,0 +1,23 @@
+"""
+Composite indexes for the hot query paths
+"""
+
+from backend.models import Student, Topic, Quiz, QuizResponse, Question, QuestionSet, PerformanceTrend
+from .operations import create_missing_indexes
+
+VERSION = 4
+DESCRIPTION = "Composite indexes for hot query paths"
+
+INDEXES = [
+    'ix_students_user', 'ix_topics_subject', 'ix_quizzes_student_date', 'ix_quizzes_student_topic',
+    'ix_quizzes_topic_date', 'ix_quiz_responses_quiz_question', 'ix_questions_set',
+    'ix_question_sets_topic_difficulty', 'ix_performance_trends_student_topic'
+]
+
+
+def upgrade(connection):
+    create_missing_indexes(
+        connection,
+        [Student, Topic, Quiz, QuizResponse, Question, QuestionSet, PerformanceTrend],
+        names=INDEXES
+    )
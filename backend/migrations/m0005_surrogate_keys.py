@@ -0,0 +1,28 @@
+"""
+Integer surrogate foreign keys (*_ref) with their indexes, backfilled from
+the UUID columns
+"""
+
+from backend.models import SURROGATE_KEYS
+from .operations import add_column, create_missing_indexes
+
+VERSION = 5
+DESCRIPTION = "Integer surrogate foreign keys"
+
+
+def upgrade(connection):
+    for model, references in SURROGATE_KEYS.items():
+        for ref, *_ in references:
+            # Nullable until backfilled; m0007 adds NOT NULL
+            add_column(connection, model, ref, nullable=True)
+    create_missing_indexes(
+        connection,
+        list(SURROGATE_KEYS),
+        names={index.name for model in SURROGATE_KEYS for index in model.__table__.indexes if index.name.endswith('_ref')}
+    )
+
+
+def data_upgrade():
+    from backend.surrogate_keys import backfill
+
+    backfill()
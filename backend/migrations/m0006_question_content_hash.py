@@ -0,0 +1,21 @@
+"""
+Content hash on questions for import deduplication, backfilled for
+existing rows
+"""
+
+from backend.models import Question
+from .operations import add_column, create_missing_indexes
+
+VERSION = 6
+DESCRIPTION = "Question content hash"
+
+
+def upgrade(connection):
+    add_column(connection, Question, 'content_hash')
+    create_missing_indexes(connection, [Question], names={'ix_questions_content_hash'})
+
+
+def data_upgrade():
+    from backend.question_import import backfill_content_hashes
+
+    backfill_content_hashes()
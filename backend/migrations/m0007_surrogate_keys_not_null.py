@@ -0,0 +1,38 @@
+"""
+NOT NULL on the integer surrogate foreign keys once every row is backfilled
+
+The constraint is added in the data step rather than upgrade(): all DDL runs
+before any data step, and m0005's backfill has to finish first. SQLite cannot
+alter a column in place, so existing SQLite databases keep nullable columns
+(fresh ones get NOT NULL from the baseline's create_all).
+"""
+
+import logging
+from app import db
+from backend.models import SURROGATE_KEYS
+from .operations import set_not_null
+
+VERSION = 7
+DESCRIPTION = "NOT NULL surrogate foreign keys"
+
+
+def upgrade(connection):
+    pass
+
+
+def data_upgrade():
+    from backend.surrogate_keys import backfill, missing_counts
+
+    # Rows written between the m0005 backfill and this upgrade by code without the insert hook
+    backfill()
+    remaining = {column: count for column, count in missing_counts().items() if count}
+    if remaining:
+        # Orphans whose parent UUID no longer exists; fix or delete them and re-run the upgrade
+        raise RuntimeError(f"Cannot add NOT NULL, surrogate keys still NULL: {remaining}")
+
+    connection = db.session.connection()
+    for model, references in SURROGATE_KEYS.items():
+        for ref, *_ in references:
+            if set_not_null(connection, model, ref) is None:
+                logging.warning(f"{connection.dialect.name} cannot alter {model.__tablename__}.{ref}; "
+                                f"it stays nullable on this database")
@@ -0,0 +1,13 @@
+"""
+Item a CAT session served last, so only that item's answer is accepted
+"""
+
+from backend.models import AdaptiveQuizSession
+from .operations import add_column
+
+VERSION = 8
+DESCRIPTION = "CAT session current item"
+
+
+def upgrade(connection):
+    add_column(connection, AdaptiveQuizSession, 'current_item_id')
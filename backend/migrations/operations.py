@@ -0,0 +1,72 @@
+"""
+Idempotent DDL helpers shared by the migration modules
+"""
+
+from sqlalchemy import inspect, literal
+
+
+def column_exists(connection, table_name, column_name):
+    return column_name in {column['name'] for column in inspect(connection).get_columns(table_name)}
+
+
+def add_column(connection, model, column_name, nullable=None):
+    """
+    ALTER TABLE ... ADD COLUMN from the model's declaration, unless it already
+    exists. nullable=True adds a NOT NULL column as nullable until it is backfilled.
+    """
+    table = model.__table__
+    if column_exists(connection, table.name, column_name):
+        return False
+
+    column = table.c[column_name]
+    dialect = connection.dialect
+    quote = dialect.identifier_preparer.quote
+    ddl = f"ALTER TABLE {quote(table.name)} ADD COLUMN {quote(column.name)} {column.type.compile(dialect)}"
+
+    # Scalar Python defaults become server defaults so existing rows get a value
+    if column.default is not None and column.default.is_scalar:
+        value = literal(column.default.arg).compile(dialect=dialect, compile_kwargs={'literal_binds': True})
+        ddl += f" DEFAULT {value}"
+    if not (column.nullable if nullable is None else nullable):
+        ddl += " NOT NULL"
+
+    connection.exec_driver_sql(ddl)
+    return True
+
+
+def set_not_null(connection, model, column_name):
+    """
+    Add NOT NULL to an existing column, unless it already has it. SQLite cannot
+    alter a column in place, so it is left unchanged there (returns None).
+    """
+    table = model.__table__
+    dialect = connection.dialect
+    live = {column['name']: column for column in inspect(connection).get_columns(table.name)}
+    if not live[column_name]['nullable']:
+        return False
+    if dialect.name == 'sqlite':
+        return None
+
+    quote = dialect.identifier_preparer.quote
+    if dialect.name == 'mysql':
+        column_type = table.c[column_name].type.compile(dialect)
+        connection.exec_driver_sql(
+            f"ALTER TABLE {quote(table.name)} MODIFY {quote(column_name)} {column_type} NOT NULL")
+    else:
+        connection.exec_driver_sql(f"ALTER TABLE {quote(table.name)} ALTER COLUMN {quote(column_name)} SET NOT NULL")
+    return True
+
+
+def create_missing_indexes(connection, models, names=None):
+    """Create declared indexes absent from the live schema, optionally only those named"""
+    inspector = inspect(connection)
+    created = []
+    for model in models:
+        table = model.__table__
+        existing = {index['name'] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name in existing or (names is not None and index.name not in names):
+                continue
+            index.create(bind=connection)
+            created.append(index.name)
+    return created
@@ -1,6 +1,9 @@
 from app import db
 from flask_login import UserMixin
 from datetime import datetime
+import hashlib
+import json
+from sqlalchemy import event, select
 from sqlalchemy.dialects.mysql import JSON
 import uuid
 
@@ -22,6 +25,9 @@ class User(UserMixin, db.Model):
 
 class Student(db.Model):
     __tablename__ = 'students'
+    __table_args__ = (
+        db.Index('ix_students_user', 'user_id'),  # current_user.student_profile on every request
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     student_id = db.Column(db.String(36), unique=True, nullable=False, default=lambda: str(uuid.uuid4()))
@@ -65,10 +71,15 @@ class Subject(db.Model):
 
 class Topic(db.Model):
     __tablename__ = 'topics'
+    __table_args__ = (
+        db.Index('ix_topics_subject', 'subject_id'),
+        db.Index('ix_topics_subject_ref', 'subject_ref'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     topic_id = db.Column(db.String(36), unique=True, nullable=False, default=lambda: str(uuid.uuid4()))
     subject_id = db.Column(db.String(36), db.ForeignKey('subjects.subject_id'), nullable=False)
+    subject_ref = db.Column(db.Integer, nullable=False)  # subjects.id, integer surrogate of subject_id
     name = db.Column(db.String(100), nullable=False)
     difficulty_level = db.Column(db.String(20), nullable=False)
     
@@ -77,6 +88,9 @@ class Topic(db.Model):
 
 class QuestionSet(db.Model):
     __tablename__ = 'question_sets'
+    __table_args__ = (
+        db.Index('ix_question_sets_topic_difficulty', 'topic_id', 'difficulty_level'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     question_set_id = db.Column(db.String(36), unique=True, nullable=False, default=lambda: str(uuid.uuid4()))
@@ -95,25 +109,46 @@ class QuestionSet(db.Model):
 
 class Question(db.Model):
     __tablename__ = 'questions'
+    __table_args__ = (
+        db.Index('ix_questions_set', 'set_id'),
+        db.Index('ix_questions_set_ref', 'set_ref'),
+        db.Index('ix_questions_content_hash', 'content_hash'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     question_id = db.Column(db.String(36), unique=True, nullable=False, default=lambda: str(uuid.uuid4()))
     set_id = db.Column(db.String(36), db.ForeignKey('question_sets.question_set_id'), nullable=False)
+    set_ref = db.Column(db.Integer, nullable=False)  # question_sets.id, integer surrogate of set_id
     description = db.Column(db.Text, nullable=False)
     options = db.Column(JSON)  # Array of options
     correct_option = db.Column(db.String(10), nullable=False)
     marks_worth = db.Column(db.Integer, default=1)
     explanation = db.Column(db.Text)
     image_url = db.Column(db.String(255))
+    irt_difficulty = db.Column(db.Float)  # Calibrated 2PL difficulty (b), null until calibrated
+    irt_discrimination = db.Column(db.Float)  # Calibrated 2PL discrimination (a)
+    irt_response_count = db.Column(db.Integer, default=0)  # Responses used in the last calibration
+    irt_calibrated_at = db.Column(db.DateTime)
+    content_hash = db.Column(db.String(64))  # question_content_hash() of text, options and answer; import dedup key
 
 class Quiz(db.Model):
     __tablename__ = 'quizzes'
+    __table_args__ = (
+        # score is carried in the date indexes so recent-activity lists and averages skip the table
+        db.Index('ix_quizzes_student_date', 'student_id', 'date_taken', 'score'),
+        db.Index('ix_quizzes_student_topic', 'student_id', 'topic_id'),
+        db.Index('ix_quizzes_topic_date', 'topic_id', 'date_taken', 'score'),
+        db.Index('ix_quizzes_student_ref', 'student_ref', 'date_taken', 'score'),
+        db.Index('ix_quizzes_topic_ref', 'topic_ref', 'date_taken', 'score'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     quiz_id = db.Column(db.String(36), unique=True, nullable=False, default=lambda: str(uuid.uuid4()))
     student_id = db.Column(db.String(36), db.ForeignKey('students.student_id'), nullable=False)
     topic_id = db.Column(db.String(36), db.ForeignKey('topics.topic_id'), nullable=False)
     question_set_id = db.Column(db.String(36), db.ForeignKey('question_sets.question_set_id'), nullable=False)
+    student_ref = db.Column(db.Integer, nullable=False)  # students.id, integer surrogate of student_id
+    topic_ref = db.Column(db.Integer, nullable=False)  # topics.id, integer surrogate of topic_id
     score = db.Column(db.Float, default=0.0)
     total_marks = db.Column(db.Integer, default=0)
     date_taken = db.Column(db.DateTime, default=datetime.utcnow)
@@ -126,11 +161,18 @@ class Quiz(db.Model):
 
 class QuizResponse(db.Model):
     __tablename__ = 'quiz_responses'
+    __table_args__ = (
+        # Covers per-quiz grading reads and the IRT calibration scan
+        db.Index('ix_quiz_responses_quiz_question', 'quiz_id', 'question_id', 'is_correct'),
+        db.Index('ix_quiz_responses_quiz_ref', 'quiz_ref', 'question_ref', 'is_correct'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     response_id = db.Column(db.String(36), unique=True, nullable=False, default=lambda: str(uuid.uuid4()))
     quiz_id = db.Column(db.String(36), db.ForeignKey('quizzes.quiz_id'), nullable=False)
     question_id = db.Column(db.String(36), db.ForeignKey('questions.question_id'), nullable=False)
+    quiz_ref = db.Column(db.Integer, nullable=False)  # quizzes.id, integer surrogate of quiz_id
+    question_ref = db.Column(db.Integer, nullable=False)  # questions.id, integer surrogate of question_id
     selected_option = db.Column(db.String(10))
     is_correct = db.Column(db.Boolean, default=False)
     time_taken = db.Column(db.Integer)  # in seconds
@@ -141,18 +183,38 @@ class QuizResponse(db.Model):
 
 class PerformanceTrend(db.Model):
     __tablename__ = 'performance_trends'
+    __table_args__ = (
+        db.Index('ix_performance_trends_student_topic', 'student_id', 'topic_id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     trend_id = db.Column(db.String(36), unique=True, nullable=False, default=lambda: str(uuid.uuid4()))
     student_id = db.Column(db.String(36), db.ForeignKey('students.student_id'), nullable=False)
     topic_id = db.Column(db.String(36), db.ForeignKey('topics.topic_id'), nullable=False)
     proficiency_score = db.Column(db.Float, default=0.0)
-    trend_graph_data = db.Column(JSON)
+    trend_graph_data = db.Column(JSON)  # Legacy score list, superseded by window_scores
+    window_scores = db.Column(db.LargeBinary)  # Packed ring buffer of the most recent scores
+    window_head = db.Column(db.Integer, default=0)  # Next ring slot to overwrite
+    window_count = db.Column(db.Integer, default=0)  # Filled ring slots
+    window_sum = db.Column(db.Float, default=0.0)  # Rolling sum of the filled slots
+    event_count = db.Column(db.Integer, default=0)  # Total scores recorded for this topic
     last_updated = db.Column(db.DateTime, default=datetime.utcnow)
     
     # Relationships
     topic = db.relationship('Topic', backref='performance_trends')
 
+class PerformanceTrendEvent(db.Model):
+    __tablename__ = 'performance_trend_events'
+    __table_args__ = (
+        db.Index('ix_trend_events_student_topic_time', 'student_id', 'topic_id', 'recorded_at'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    student_id = db.Column(db.String(36), db.ForeignKey('students.student_id'), nullable=False)
+    topic_id = db.Column(db.String(36), db.ForeignKey('topics.topic_id'), nullable=False)
+    score = db.Column(db.Float, nullable=False)
+    recorded_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
 class AdaptiveQuizSession(db.Model):
     __tablename__ = 'adaptive_quiz_sessions'
     
@@ -164,12 +226,125 @@ class AdaptiveQuizSession(db.Model):
     current_difficulty = db.Column(db.String(20), nullable=False)  # Current difficulty level
     total_sets = db.Column(db.Integer, default=5)  # Number of question sets to complete
     current_set = db.Column(db.Integer, default=1)  # Current set number
-    session_data = db.Column(JSON)  # Store per-set results and performance metrics
+    session_data = db.Column(JSON)  # Legacy per-set blob, superseded by adaptive_set_results
+    mode = db.Column(db.String(20), default='sets')  # 'sets' or 'cat' (one item at a time)
+    ability_estimate = db.Column(db.Float)  # CAT ability (theta) after the latest answer
+    ability_se = db.Column(db.Float)  # Standard error of ability_estimate
+    current_item_id = db.Column(db.String(36))  # CAT item served and awaiting its answer
     final_proficiency_score = db.Column(db.Float, default=0.0)
     is_completed = db.Column(db.Boolean, default=False)
     start_time = db.Column(db.DateTime, default=datetime.utcnow)
     end_time = db.Column(db.DateTime)
+    version = db.Column(db.Integer, nullable=False, default=1)  # Optimistic lock, bumped on every update
     
     # Relationships
     student = db.relationship('Student', backref='adaptive_quiz_sessions')
     topic = db.relationship('Topic', backref='adaptive_quiz_sessions')
+    
+    __mapper_args__ = {'version_id_col': version}
+
+class StudentTopicProgress(db.Model):
+    __tablename__ = 'student_topic_progress'
+    __table_args__ = (
+        db.UniqueConstraint('student_id', 'topic_id', name='uq_student_topic_progress'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    student_id = db.Column(db.String(36), db.ForeignKey('students.student_id'), nullable=False)
+    topic_id = db.Column(db.String(36), db.ForeignKey('topics.topic_id'), nullable=False)
+    attempts = db.Column(db.Integer, default=0, nullable=False)
+    score_sum = db.Column(db.Float, default=0.0, nullable=False)
+    best_score = db.Column(db.Float, default=0.0, nullable=False)
+    total_marks_sum = db.Column(db.Integer, default=0, nullable=False)
+    time_sum = db.Column(db.Integer, default=0, nullable=False)  # in seconds
+    recent_scores = db.Column(JSON)  # Ring buffer of the last N scores
+    recent_head = db.Column(db.Integer, default=0, nullable=False)  # Next ring slot to overwrite
+    is_mastered = db.Column(db.Boolean, default=False, nullable=False)
+    last_attempt_at = db.Column(db.DateTime)
+    
+    # Relationships
+    topic = db.relationship('Topic', backref='student_progress')
+
+class AdaptiveSetResult(db.Model):
+    __tablename__ = 'adaptive_set_results'
+    __table_args__ = (
+        db.UniqueConstraint('session_id', 'set_number', name='uq_adaptive_set_result'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    result_id = db.Column(db.String(36), unique=True, nullable=False, default=lambda: str(uuid.uuid4()))
+    session_id = db.Column(db.String(36), db.ForeignKey('adaptive_quiz_sessions.session_id'), nullable=False)
+    set_number = db.Column(db.Integer, nullable=False)
+    difficulty_level = db.Column(db.String(20), nullable=False)  # Difficulty this set was taken at
+    next_difficulty = db.Column(db.String(20), nullable=False)  # Difficulty chosen for the following set
+    adjustment_reason = db.Column(db.String(200))  # Set when next_difficulty differs
+    quiz_id = db.Column(db.String(36), db.ForeignKey('quizzes.quiz_id'))  # Set mode only
+    score = db.Column(db.Float, default=0.0)
+    correctness_percentage = db.Column(db.Float, default=0.0)
+    completion_time = db.Column(db.Integer)  # in seconds
+    average_time_per_question = db.Column(db.Float)
+    is_fast_completion = db.Column(db.Boolean, default=False)
+    total_questions = db.Column(db.Integer, default=0)
+    correct_answers = db.Column(db.Integer, default=0)
+    # CAT mode: the single item administered in this step and the estimate after it
+    question_id = db.Column(db.String(36), db.ForeignKey('questions.question_id'))
+    question_set_id = db.Column(db.String(36), db.ForeignKey('question_sets.question_set_id'))
+    selected_option = db.Column(db.String(10))
+    marks_worth = db.Column(db.Integer)
+    discrimination = db.Column(db.Float)
+    difficulty = db.Column(db.Float)
+    ability_estimate = db.Column(db.Float)
+    ability_se = db.Column(db.Float)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    # Relationships
+    session = db.relationship('AdaptiveQuizSession', backref=db.backref('set_results', lazy='dynamic'))
+
+class SubmissionReceipt(db.Model):
+    __tablename__ = 'submission_receipts'
+    
+    idempotency_key = db.Column(db.String(100), primary_key=True)  # e.g. quiz:<quiz_id>, adaptive:<session_id>:<set>
+    student_id = db.Column(db.String(36), db.ForeignKey('students.student_id'), nullable=False)
+    quiz_id = db.Column(db.String(36), db.ForeignKey('quizzes.quiz_id'))
+    response = db.Column(JSON)  # Result payload replayed to retried submissions
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+# Integer surrogates of the UUID foreign keys: (ref column, UUID column, parent id, parent UUID).
+# They carry no FK constraint so the existing UUID relationships stay unambiguous.
+SURROGATE_KEYS = {
+    Topic: [('subject_ref', 'subject_id', Subject.id, Subject.subject_id)],
+    Question: [('set_ref', 'set_id', QuestionSet.id, QuestionSet.question_set_id)],
+    Quiz: [
+        ('student_ref', 'student_id', Student.id, Student.student_id),
+        ('topic_ref', 'topic_id', Topic.id, Topic.topic_id)
+    ],
+    QuizResponse: [
+        ('quiz_ref', 'quiz_id', Quiz.id, Quiz.quiz_id),
+        ('question_ref', 'question_id', Question.id, Question.question_id)
+    ]
+}
+
+def _fill_surrogate_keys(mapper, connection, target):
+    """Resolve each surrogate with a scalar subquery inside the INSERT itself"""
+    for ref, uuid_attr, parent_id, parent_uuid in SURROGATE_KEYS[type(target)]:
+        uuid_value = getattr(target, uuid_attr)
+        if getattr(target, ref) is None and uuid_value is not None:
+            setattr(target, ref, select(parent_id).where(parent_uuid == uuid_value).scalar_subquery())
+
+for _model in SURROGATE_KEYS:
+    event.listen(_model, 'before_insert', _fill_surrogate_keys)
+
+def question_content_hash(description, options, correct_option):
+    """SHA-256 of the case- and whitespace-normalised question text, options and answer"""
+    def normalise(value):
+        return ' '.join(str(value or '').split()).lower()
+
+    payload = json.dumps([normalise(description), [normalise(option) for option in options or []],
+                          normalise(correct_option)])
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+def _fill_content_hash(mapper, connection, target):
+    if target.content_hash is None:
+        target.content_hash = question_content_hash(target.description, target.options, target.correct_option)
+
+event.listen(Question, 'before_insert', _fill_content_hash)
@@ -3,6 +3,7 @@ Performance caching utilities to reduce database queries and API calls
 """
 
 import json
+import threading
 import time
 from functools import wraps
 from typing import Any, Dict, Optional
@@ -12,38 +13,73 @@ class SimpleCache:
     
     def __init__(self):
         self._cache: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()  # Request threads and prefetch workers share the cache
+        self.hits = 0
+        self.misses = 0
     
     def get(self, key: str) -> Optional[Any]:
         """Get value from cache if not expired"""
-        if key in self._cache:
-            entry = self._cache[key]
-            if time.time() < entry['expires']:
-                return entry['value']
-            else:
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None:
+                if time.time() < entry['expires']:
+                    self.hits += 1
+                    return entry['value']
                 del self._cache[key]
-        return None
+            self.misses += 1
+            return None
     
     def set(self, key: str, value: Any, ttl: int = 300) -> None:  # 5 min default
         """Set value in cache with TTL in seconds"""
-        self._cache[key] = {
-            'value': value,
-            'expires': time.time() + ttl
-        }
+        with self._lock:
+            self._cache[key] = {
+                'value': value,
+                'expires': time.time() + ttl
+            }
+    
+    def pop(self, key: str) -> Optional[Any]:
+        """Remove and return an unexpired value, so only one caller can claim it"""
+        with self._lock:
+            entry = self._cache.pop(key, None)
+            if entry is not None and time.time() < entry['expires']:
+                self.hits += 1
+                return entry['value']
+            self.misses += 1
+            return None
+    
+    def delete(self, key: str) -> None:
+        """Remove a single entry if present"""
+        with self._lock:
+            self._cache.pop(key, None)
+    
+    def clear_prefix(self, prefix: str) -> None:
+        """Remove every entry whose key starts with prefix"""
+        with self._lock:
+            for key in [key for key in self._cache if key.startswith(prefix)]:
+                del self._cache[key]
     
     def clear(self) -> None:
         """Clear all cache entries"""
-        self._cache.clear()
+        with self._lock:
+            self._cache.clear()
+    
+    def stats(self) -> Dict[str, int]:
+        """Lookup counters since startup and current size"""
+        return {'hits': self.hits, 'misses': self.misses, 'entries': len(self._cache)}
 
 # Global cache instance
 cache = SimpleCache()
 
+def make_cache_key(name: str, args: tuple, kwargs: Dict[str, Any]) -> str:
+    """Cache key for a call: function name plus a hash of its arguments"""
+    return f"{name}:{hash(str(args) + str(sorted(kwargs.items())))}"
+
 def cached(ttl: int = 300):
     """Decorator to cache function results"""
     def decorator(func):
         @wraps(func)
         def wrapper(*args, **kwargs):
-            # Create cache key from function name and arguments
-            key = f"{func.__name__}:{hash(str(args) + str(sorted(kwargs.items())))}"
+            key = make_cache_key(func.__name__, args, kwargs)
             
             # Try to get from cache
             result = cache.get(key)
@@ -0,0 +1,116 @@
+"""
+Pluggable proficiency estimators, updated incrementally per quiz and
+vectorizable over a full score history for recalibration
+"""
+
+import numpy as np
+from .environment_config import EnvironmentConfig
+
+
+class ProficiencyModel:
+    """Base estimator: O(1) update from the previous state plus one new score"""
+
+    name = 'base'
+
+    def update(self, trend, score, elapsed_days=0.0):
+        """Return the new proficiency given the trend row before this score"""
+        raise NotImplementedError
+
+    def fit(self, scores, elapsed_days=None):
+        """Return the proficiency after replaying a whole history at once"""
+        raise NotImplementedError
+
+
+class RollingMeanModel(ProficiencyModel):
+    """Plain mean of the trend store's rolling window (the original behaviour)"""
+
+    name = 'rolling_mean'
+
+    def __init__(self, window=10):
+        self.window = window  # Matches TrendStore.WINDOW
+
+    def update(self, trend, score, elapsed_days=0.0):
+        # The trend store has already rolled the score into window_sum
+        return trend.window_sum / trend.window_count if trend.window_count else score
+
+    def fit(self, scores, elapsed_days=None):
+        scores = np.asarray(scores, dtype=float)
+        if scores.size == 0:
+            return 0.0
+        return float(scores[-self.window:].mean())
+
+
+class ExponentialDecayModel(ProficiencyModel):
+    """
+    Exponentially weighted moving average. With a half-life the previous
+    estimate also decays with the days elapsed since the last quiz, so old
+    results count for less after a break.
+    """
+
+    name = 'ewma'
+
+    def __init__(self, alpha=0.3, half_life_days=None):
+        if not 0 < alpha <= 1:
+            raise ValueError(f"alpha must be in (0, 1], got {alpha}")
+        self.alpha = alpha
+        self.half_life_days = half_life_days
+
+    def _retention(self, elapsed_days):
+        """Weight kept by the previous estimate"""
+        retention = 1 - self.alpha
+        if self.half_life_days and elapsed_days:
+            retention *= 0.5 ** (elapsed_days / self.half_life_days)
+        return retention
+
+    def update(self, trend, score, elapsed_days=0.0):
+        if not trend.event_count:
+            return float(score)
+        retention = self._retention(elapsed_days)
+        return retention * trend.proficiency_score + (1 - retention) * score
+
+    def fit(self, scores, elapsed_days=None):
+        scores = np.asarray(scores, dtype=float)
+        if scores.size == 0:
+            return 0.0
+
+        # Retention factor applied when each score after the first arrives
+        retention = np.full(scores.size - 1, 1 - self.alpha)
+        if self.half_life_days and elapsed_days is not None:
+            gaps = np.asarray(elapsed_days, dtype=float)[1:]
+            retention = retention * np.power(0.5, gaps / self.half_life_days)
+
+        # suffix[i] = product of retention factors applied after score i
+        log_retention = np.log(np.clip(retention, 1e-300, None))
+        suffix = np.exp(np.concatenate([np.cumsum(log_retention[::-1])[::-1], [0.0]]))
+
+        weights = suffix.copy()
+        weights[1:] *= 1 - retention
+        return float(np.dot(weights, scores))
+
+
+_model = None
+
+
+def get_proficiency_model():
+    """Shared estimator configured from the environment"""
+    global _model
+    if _model is None:
+        settings = EnvironmentConfig.get_proficiency_settings()
+        model_name = settings['model']
+        if model_name == RollingMeanModel.name:
+            _model = RollingMeanModel()
+        elif model_name == ExponentialDecayModel.name:
+            _model = ExponentialDecayModel(
+                alpha=settings['alpha'],
+                half_life_days=settings['half_life_days']
+            )
+        else:
+            raise ValueError(f"Unknown proficiency model: {model_name}")
+    return _model
+
+
+def elapsed_days_between(earlier, later):
+    """Fractional days between two datetimes, never negative"""
+    if not earlier or not later:
+        return 0.0
+    return max((later - earlier).total_seconds() / 86400.0, 0.0)
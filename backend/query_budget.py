@@ -0,0 +1,160 @@
+"""
+Per-request SQL accounting: statement counts and DB time per route, budget
+warnings, and N+1 detection by repeated statement shape
+
+Statements are parametrised, so a loop that lazy-loads one row per item
+shows up as the same SQL text executed many times in one request.
+"""
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from .environment_config import EnvironmentConfig
+from .metrics import REQUEST_DB_TIME, REQUEST_QUERIES
+
+logger = logging.getLogger(__name__)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_started', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get('query_started')
+    elapsed = time.perf_counter() - started.pop() if started else 0.0
+    if has_request_context() and 'query_log' in g:
+        g.query_log.append((statement, elapsed))
+    for listener in list(QueryBudget.listeners):
+        listener(statement, elapsed)
+
+
+def _handle_error(context):
+    # after_cursor_execute does not run for a failed statement; drop its start time
+    # so the next statement on this pooled connection isn't timed from it
+    if context.connection is not None and context.statement is not None:
+        context.connection.info.pop('query_started', None)
+
+
+def _install_listeners():
+    if not event.contains(Engine, 'after_cursor_execute', _after_cursor_execute):
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+        event.listen(Engine, 'handle_error', _handle_error)
+
+
+class QueryBudget:
+    """Collects per-route statement counts; installed once with init_app"""
+
+    # Callbacks (statement, seconds) for code that counts outside a request, e.g. assert_max_queries
+    listeners = []
+    settings = None
+    _routes = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def init_app(cls, app):
+        settings = EnvironmentConfig.get_query_budget_settings()
+        if not settings['enabled']:
+            return
+        cls.settings = settings
+        _install_listeners()
+        app.before_request(cls._start_request)
+        app.teardown_request(cls._finish_request)
+
+    @staticmethod
+    def _start_request():
+        g.query_log = []
+
+    @classmethod
+    def _finish_request(cls, error=None):
+        log = g.get('query_log')
+        if log is None or request.endpoint in (None, 'static'):
+            return
+
+        count = len(log)
+        db_ms = sum(elapsed for _, elapsed in log) * 1000
+        suspects = cls.repeated_statements(log, cls.settings['nplus1_threshold'])
+        cls._record(request.endpoint, count, db_ms, suspects)
+        REQUEST_DB_TIME.observe(request.endpoint, value=db_ms / 1000)
+        REQUEST_QUERIES.inc(request.endpoint, amount=count)
+
+        if count > cls.settings['budget']:
+            logger.warning(f"{request.method} {request.path} ran {count} queries ({db_ms:.1f} ms), "
+                           f"budget {cls.settings['budget']}")
+        for statement, repeats in suspects.items():
+            logger.warning(f"Possible N+1 in {request.endpoint}: {repeats}x {' '.join(statement.split())[:200]}")
+
+    @staticmethod
+    def repeated_statements(log, threshold):
+        """Statement shapes run at least threshold times: {statement: count}"""
+        counts = {}
+        for statement, _ in log:
+            counts[statement] = counts.get(statement, 0) + 1
+        return {statement: n for statement, n in counts.items() if n >= threshold}
+
+    @classmethod
+    def _record(cls, endpoint, count, db_ms, suspects):
+        with cls._lock:
+            stats = cls._routes.setdefault(endpoint, {
+                'requests': 0, 'queries': 0, 'max_queries': 0, 'db_ms': 0.0,
+                'over_budget': 0, 'nplus1': {}
+            })
+            stats['requests'] += 1
+            stats['queries'] += count
+            stats['max_queries'] = max(stats['max_queries'], count)
+            stats['db_ms'] += db_ms
+            if count > cls.settings['budget']:
+                stats['over_budget'] += 1
+            for statement, repeats in suspects.items():
+                stats['nplus1'][statement] = max(stats['nplus1'].get(statement, 0), repeats)
+
+    @classmethod
+    def route_stats(cls):
+        """Per-endpoint aggregates, heaviest average query count first"""
+        with cls._lock:
+            rows = [
+                {
+                    'endpoint': endpoint,
+                    'requests': stats['requests'],
+                    'avg_queries': round(stats['queries'] / stats['requests'], 1),
+                    'max_queries': stats['max_queries'],
+                    'avg_db_ms': round(stats['db_ms'] / stats['requests'], 2),
+                    'over_budget': stats['over_budget'],
+                    'nplus1': sorted(stats['nplus1'].items(), key=lambda item: -item[1])
+                }
+                for endpoint, stats in cls._routes.items()
+            ]
+        return sorted(rows, key=lambda row: -row['avg_queries'])
+
+    @classmethod
+    def reset(cls):
+        with cls._lock:
+            cls._routes.clear()
+
+
+@contextmanager
+def assert_max_queries(limit):
+    """
+    Fail if the block runs more than limit SQL statements, e.g.
+
+        with assert_max_queries(10):
+            client.get('/learning_roadmap')
+    """
+    _install_listeners()
+    statements = []
+    listener = lambda statement, elapsed: statements.append(statement)
+    QueryBudget.listeners.append(listener)
+    try:
+        yield statements
+    finally:
+        QueryBudget.listeners.remove(listener)
+
+    if len(statements) > limit:
+        shapes = QueryBudget.repeated_statements([(s, 0) for s in statements], 2)
+        detail = '\n'.join(f"  {n}x {' '.join(s.split())[:160]}" for s, n in shapes.items())
+        raise AssertionError(f"Expected at most {limit} queries, ran {len(statements)}"
+                             + (f"; repeated:\n{detail}" if detail else ""))
@@ -0,0 +1,346 @@
+"""
+Streaming question bank import
+
+Rows are read one at a time (csv.reader, or openpyxl in read-only mode for
+workbooks), validated, deduplicated by content hash against the batch and
+the database, and inserted in batches with one transaction per batch.
+Subjects, topics and question sets are created on first use. After every
+committed batch a checkpoint records how many source rows are done, so an
+interrupted import resumes where it stopped; re-running without the
+checkpoint is still safe because duplicates are skipped by hash. Each
+question set's question_ids list is appended once, when the import finishes.
+"""
+
+import csv
+import json
+import logging
+import os
+import uuid
+from datetime import datetime
+from sqlalchemy import insert, select, update
+from app import db
+from .models import Subject, Topic, QuestionSet, Question, question_content_hash
+
+logger = logging.getLogger(__name__)
+
+DIFFICULTY_LEVELS = ['Very Easy', 'Easy', 'Medium', 'Hard', 'Very Hard']
+OPTION_FIELDS = ['option_a', 'option_b', 'option_c', 'option_d', 'option_e', 'option_f']
+OPTION_LETTERS = 'ABCDEF'
+MAX_REPORTED_ERRORS = 50
+
+# Accepted header spellings, compared lowercase with spaces, underscores and dashes removed
+COLUMN_ALIASES = {
+    'subject': ['subject', 'subjectname'],
+    'topic': ['topic', 'topicname'],
+    'question': ['question', 'description', 'questiontext'],
+    'correct_answer': ['correctanswer', 'answer', 'correct', 'correctoption'],
+    'difficulty': ['difficulty', 'level', 'difficultylevel'],
+    'marks': ['marks', 'marksworth', 'points'],
+    'explanation': ['explanation', 'rationale'],
+    **{field: [f"option{letter}", letter, f"choice{letter}"]
+       for field, letter in zip(OPTION_FIELDS, OPTION_LETTERS.lower())}
+}
+
+
+class ImportRowError(ValueError):
+    """A source row that cannot become a question"""
+
+
+def _normalise_header(header):
+    return ''.join(ch for ch in str(header or '').lower() if ch not in ' _-')
+
+
+def map_headers(headers):
+    """{column index: field} for the headers that match a known field"""
+    lookup = {alias: field for field, aliases in COLUMN_ALIASES.items() for alias in aliases}
+    mapping = {}
+    for index, header in enumerate(headers):
+        field = lookup.get(_normalise_header(header))
+        if field and field not in mapping.values():
+            mapping[index] = field
+    return mapping
+
+
+def _text(value):
+    """Cell value as stripped text; whole floats from spreadsheets lose their '.0'"""
+    if value is None:
+        return ''
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip()
+
+
+def iter_source_rows(path):
+    """
+    Yield (location, {field: value}) for every data row of a .csv or .xlsx
+    file without loading it whole. Workbook rows carry their sheet name as
+    '_sheet', which serves as the subject when no subject is given.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.csv':
+        with open(path, newline='', encoding='utf-8-sig') as f:
+            reader = csv.reader(f)
+            mapping = map_headers(next(reader, []))
+            for line, values in enumerate(reader, start=2):
+                yield f"line {line}", {field: values[i] for i, field in mapping.items() if i < len(values)}
+
+    elif extension in ('.xlsx', '.xlsm'):
+        from openpyxl import load_workbook
+
+        workbook = load_workbook(path, read_only=True, data_only=True)
+        try:
+            for sheet in workbook.worksheets:
+                rows = sheet.iter_rows(values_only=True)
+                mapping = map_headers(next(rows, ()))
+                for line, values in enumerate(rows, start=2):
+                    if not any(value is not None for value in values):
+                        continue
+                    row = {field: values[i] for i, field in mapping.items() if i < len(values)}
+                    row['_sheet'] = sheet.title
+                    yield f"{sheet.title}!{line}", row
+        finally:
+            workbook.close()
+
+    else:
+        raise ValueError(f"Unsupported file type '{extension}' (expected .csv or .xlsx)")
+
+
+def parse_row(row, defaults=None):
+    """Validated question record from a source row; raises ImportRowError"""
+    defaults = defaults or {}
+    description = _text(row.get('question'))
+    if not description:
+        raise ImportRowError("missing question text")
+
+    options = [_text(row.get(field)) for field in OPTION_FIELDS]
+    options = [option for option in options if option]
+    if len(options) < 2:
+        raise ImportRowError("fewer than two options")
+
+    answer = _text(row.get('correct_answer'))
+    if len(answer) == 1 and answer.upper() in OPTION_LETTERS[:len(options)]:
+        correct_option = answer.upper()
+    else:
+        matches = [i for i, option in enumerate(options) if option.lower() == answer.lower()]
+        if not answer or not matches:
+            raise ImportRowError(f"correct answer '{answer}' is not an option letter or option text")
+        correct_option = OPTION_LETTERS[matches[0]]
+
+    difficulty = _text(row.get('difficulty')) or defaults.get('difficulty') or 'Medium'
+    level = next((level for level in DIFFICULTY_LEVELS
+                  if _normalise_header(level) == _normalise_header(difficulty)), None)
+    if not level:
+        raise ImportRowError(f"unknown difficulty '{difficulty}'")
+
+    marks = _text(row.get('marks')) or '1'
+    if not marks.isdigit() or int(marks) < 1:
+        raise ImportRowError(f"marks must be a positive integer, got '{marks}'")
+
+    subject = _text(row.get('subject')) or defaults.get('subject') or _text(row.get('_sheet'))
+    topic = _text(row.get('topic')) or defaults.get('topic')
+    if not subject or not topic:
+        raise ImportRowError("missing subject or topic")
+
+    return {
+        'subject': subject,
+        'topic': topic,
+        'difficulty_level': level,
+        'description': description,
+        'options': options,
+        'correct_option': correct_option,
+        'marks_worth': int(marks),
+        'explanation': _text(row.get('explanation')) or None,
+        'content_hash': question_content_hash(description, options, correct_option)
+    }
+
+
+class QuestionImporter:
+    """Batched, resumable import of one question bank file"""
+
+    def __init__(self, batch_size=1000, defaults=None, dry_run=False, checkpoint_path=None, progress=None):
+        self.batch_size = batch_size
+        self.defaults = defaults or {}
+        self.dry_run = dry_run
+        self.checkpoint_path = checkpoint_path
+        self.progress = progress
+        self.stats = {'rows': 0, 'inserted': 0, 'duplicates': 0, 'invalid': 0,
+                      'subjects_created': 0, 'topics_created': 0, 'sets_created': 0}
+        self.errors = []
+        self._subjects = {}
+        self._topics = {}
+        self._sets = {}
+        self._touched_sets = set()  # QuestionSet ids used by this import; their id lists are written at the end
+
+    def run(self, path, resume=False):
+        """Import path; returns the stats dict, with 'errors' holding the first invalid rows"""
+        checkpoint_path = self.checkpoint_path or f"{path}.import-checkpoint.json"
+        fingerprint = self._fingerprint(path)
+        skip = 0
+        if resume and os.path.exists(checkpoint_path):
+            with open(checkpoint_path) as f:
+                checkpoint = json.load(f)
+            if checkpoint.get('fingerprint') == fingerprint:
+                skip = checkpoint['rows_done']
+                self.stats.update(checkpoint['stats'])
+                self._touched_sets.update(checkpoint.get('touched_sets', []))
+            else:
+                logger.warning("Checkpoint does not match the file; importing from the start",
+                               extra={'fields': {'checkpoint': checkpoint_path}})
+
+        pending = []
+        try:
+            for position, (location, row) in enumerate(iter_source_rows(path), start=1):
+                if position <= skip:
+                    continue
+                self.stats['rows'] += 1
+                try:
+                    pending.append(parse_row(row, self.defaults))
+                except ImportRowError as e:
+                    self.stats['invalid'] += 1
+                    if len(self.errors) < MAX_REPORTED_ERRORS:
+                        self.errors.append(f"{location}: {e}")
+
+                if len(pending) >= self.batch_size:
+                    self._write_batch(pending)
+                    pending = []
+                    self._save_checkpoint(checkpoint_path, fingerprint, position)
+            self._write_batch(pending)
+            self._finish_sets()
+
+        except Exception:
+            db.session.rollback()
+            raise
+
+        if os.path.exists(checkpoint_path) and not self.dry_run:
+            os.remove(checkpoint_path)
+        return dict(self.stats, errors=self.errors)
+
+    def _write_batch(self, records):
+        """Insert one batch in its own transaction, skipping known hashes"""
+        if records:
+            unique = {}
+            for record in records:
+                unique.setdefault(record['content_hash'], record)
+            existing = set(db.session.execute(
+                select(Question.content_hash).where(Question.content_hash.in_(list(unique)))
+            ).scalars())
+            fresh = [record for content_hash, record in unique.items() if content_hash not in existing]
+            self.stats['duplicates'] += len(records) - len(fresh)
+
+            if self.dry_run:
+                self.stats['inserted'] += len(fresh)
+            elif fresh:
+                rows = []
+                for record in fresh:
+                    question_set = self._question_set(record['subject'], record['topic'], record['difficulty_level'])
+                    question_id = str(uuid.uuid4())
+                    rows.append({
+                        'question_id': question_id, 'set_id': question_set['question_set_id'],
+                        'set_ref': question_set['id'], 'description': record['description'],
+                        'options': record['options'], 'correct_option': record['correct_option'],
+                        'marks_worth': record['marks_worth'], 'explanation': record['explanation'],
+                        'content_hash': record['content_hash'], 'irt_response_count': 0
+                    })
+
+                db.session.execute(insert(Question), rows)
+                self.stats['inserted'] += len(rows)
+
+        if self.dry_run:
+            db.session.rollback()
+        else:
+            db.session.commit()
+        if self.progress and records:
+            self.progress(self.stats)
+
+    def _finish_sets(self):
+        """
+        Append each touched set's new question ids and marks in one write per set.
+        Rewriting the JSON list every batch would make large imports quadratic.
+        The ids come from the questions table, so rows committed before a crash
+        are included on resume.
+        """
+        if self.dry_run or not self._touched_sets:
+            return
+        for set_id in sorted(self._touched_sets):
+            question_set = db.session.get(QuestionSet, set_id)
+            listed = set(question_set.question_ids or [])
+            added = [row for row in db.session.execute(
+                select(Question.question_id, Question.marks_worth)
+                .where(Question.set_ref == set_id).order_by(Question.id)
+            ) if row.question_id not in listed]
+            if added:
+                question_set.question_ids = list(question_set.question_ids or []) + [row.question_id for row in added]
+                question_set.total_marks = (question_set.total_marks or 0) + sum(row.marks_worth for row in added)
+        db.session.commit()
+
+    def _question_set(self, subject_name, topic_name, difficulty_level):
+        """Cached {id, question_set_id}, creating the set and its parents if needed"""
+        key = (subject_name, topic_name, difficulty_level)
+        if key in self._sets:
+            return self._sets[key]
+
+        subject = self._subjects.get(subject_name)
+        if subject is None:
+            subject = Subject.query.filter_by(name=subject_name).first()
+            if subject is None:
+                subject = Subject(name=subject_name, description=f"Imported {subject_name} question bank")
+                db.session.add(subject)
+                db.session.flush()
+                self.stats['subjects_created'] += 1
+            subject = self._subjects[subject_name] = {'subject_id': subject.subject_id}
+
+        topic = self._topics.get((subject_name, topic_name))
+        if topic is None:
+            topic = Topic.query.filter_by(subject_id=subject['subject_id'], name=topic_name).first()
+            if topic is None:
+                topic = Topic(subject_id=subject['subject_id'], name=topic_name, difficulty_level=difficulty_level)
+                db.session.add(topic)
+                db.session.flush()
+                self.stats['topics_created'] += 1
+            topic = self._topics[(subject_name, topic_name)] = {'topic_id': topic.topic_id}
+
+        question_set = QuestionSet.query.filter_by(topic_id=topic['topic_id'], difficulty_level=difficulty_level)\
+            .order_by(QuestionSet.id).first()
+        if question_set is None:
+            question_set = QuestionSet(topic_id=topic['topic_id'], subject_id=subject['subject_id'],
+                                       difficulty_level=difficulty_level, question_ids=[], total_marks=0)
+            db.session.add(question_set)
+            db.session.flush()
+            self.stats['sets_created'] += 1
+
+        self._sets[key] = {'id': question_set.id, 'question_set_id': question_set.question_set_id}
+        self._touched_sets.add(question_set.id)
+        return self._sets[key]
+
+    @staticmethod
+    def _fingerprint(path):
+        stat = os.stat(path)
+        return {'path': os.path.abspath(path), 'size': stat.st_size, 'mtime': int(stat.st_mtime)}
+
+    def _save_checkpoint(self, checkpoint_path, fingerprint, rows_done):
+        if self.dry_run:
+            return
+        with open(checkpoint_path, 'w') as f:
+            json.dump({'fingerprint': fingerprint, 'rows_done': rows_done, 'stats': self.stats,
+                       'touched_sets': sorted(self._touched_sets),
+                       'updated_at': datetime.utcnow().isoformat(timespec='seconds')}, f)
+
+
+def backfill_content_hashes(batch_size=1000):
+    """Hash every question that has no content_hash yet, walking by id. Returns rows updated."""
+    updated, last_id = 0, 0
+    while True:
+        rows = db.session.execute(
+            select(Question.id, Question.description, Question.options, Question.correct_option)
+            .where(Question.id > last_id, Question.content_hash.is_(None))
+            .order_by(Question.id).limit(batch_size)
+        ).all()
+        if not rows:
+            return updated
+        db.session.execute(update(Question), [
+            {'id': row.id, 'content_hash': question_content_hash(row.description, row.options, row.correct_option)}
+            for row in rows
+        ])
+        db.session.commit()
+        updated += len(rows)
+        last_id = rows[-1].id
@@ -0,0 +1,80 @@
+"""
+Read/write routing between the primary database and the optional read replica
+
+Code wrapped in read_replica (decorator or context manager) sends its plain
+SELECTs to the 'replica' bind; flushes, DML and SELECT ... FOR UPDATE always
+go to the primary. After a request writes, the user's Flask session is
+pinned to the primary for REPLICA_STICKY_SECONDS so their next pages read
+their own submission even if the replica lags.
+
+Without DATABASE_REPLICA_URL every query goes to the primary.
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from flask import has_request_context, session as flask_session
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+from .environment_config import EnvironmentConfig
+
+REPLICA_BIND = 'replica'
+STICKY_SESSION_KEY = '_primary_until'
+
+_replica_reads = ContextVar('replica_reads', default=False)
+
+
+class RoutingSession(Session):
+    """db.session class that resolves reads to the replica inside read_replica blocks"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and _replica_reads.get() and not self._flushing and _is_plain_select(clause):
+            replica = self._db.engines.get(REPLICA_BIND)
+            if replica is not None:
+                return replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def _is_plain_select(clause):
+    return getattr(clause, 'is_select', False) and getattr(clause, '_for_update_arg', None) is None
+
+
+@event.listens_for(RoutingSession, 'after_flush')
+def _stick_to_primary(session, flush_context):
+    """Pin the current user to the primary after they write"""
+    if has_request_context():
+        flask_session[STICKY_SESSION_KEY] = time.time() + EnvironmentConfig.get_replica_sticky_seconds()
+
+
+def reading_own_writes():
+    """True while the current user's recent write may not have reached the replica"""
+    return has_request_context() and flask_session.get(STICKY_SESSION_KEY, 0) > time.time()
+
+
+@contextmanager
+def _replica_block():
+    if reading_own_writes():
+        yield
+        return
+
+    token = _replica_reads.set(True)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+def read_replica(func=None):
+    """
+    Route SELECTs to the replica: `with read_replica():` for a block, or
+    `@read_replica` on a function
+    """
+    if func is None:
+        return _replica_block()
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        with _replica_block():
+            return func(*args, **kwargs)
+    return wrapper
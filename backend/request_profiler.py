@@ -0,0 +1,216 @@
+"""
+Opt-in request profiler
+
+While enabled, every request thread is watched by a background stack
+sampler; a request keeps its trace when it was picked by the sample rate or
+ran past the slow threshold. In 'cprofile' mode, sampled requests are
+traced with cProfile instead, which is exact but too expensive to run on
+every request, so slow-but-unsampled requests still fall back to the stack
+samples. Only one cProfile capture runs at a time (Python 3.12+ allows a
+single active profiler per process); sampled requests that arrive meanwhile
+are stack sampled. Each trace keeps the SQL the request ran (from
+query_budget), and the last PROFILER_BUFFER_SIZE traces live in a ring
+buffer for the admin view.
+"""
+
+import cProfile
+import io
+import itertools
+import logging
+import os
+import pstats
+import random
+import sys
+import threading
+import time
+from collections import Counter, deque
+from datetime import datetime
+from flask import g, request
+from .environment_config import EnvironmentConfig
+
+logger = logging.getLogger(__name__)
+
+MAX_STACK_DEPTH = 40
+TOP_ENTRIES = 30
+
+
+class StackSampler:
+    """Daemon thread that periodically records the stacks of watched threads"""
+
+    def __init__(self, interval_ms):
+        self.interval = interval_ms / 1000
+        self._watched = {}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self._run, name='request-profiler', daemon=True)
+        self._thread.start()
+
+    def watch(self, thread_id):
+        with self._lock:
+            self._watched[thread_id] = Counter()
+
+    def unwatch(self, thread_id):
+        """Stop watching; returns {folded stack: samples}"""
+        with self._lock:
+            return self._watched.pop(thread_id, Counter())
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            with self._lock:
+                if not self._watched:
+                    continue
+                frames = sys._current_frames()
+                for thread_id, counts in self._watched.items():
+                    frame = frames.get(thread_id)
+                    if frame is not None:
+                        counts[self._fold(frame)] += 1
+
+    @staticmethod
+    def _fold(frame):
+        """Root-first 'file:function:line;...' for one stack"""
+        entries = []
+        while frame is not None and len(entries) < MAX_STACK_DEPTH:
+            code = frame.f_code
+            entries.append(f"{os.path.basename(code.co_filename)}:{code.co_name}:{frame.f_lineno}")
+            frame = frame.f_back
+        return ';'.join(reversed(entries))
+
+
+def _format_samples(samples, interval_ms):
+    """Hottest leaf functions, then the hottest full stacks"""
+    total = sum(samples.values())
+    if not total:
+        return "No stack samples (request finished within one sampling interval)"
+
+    leaves = Counter()
+    for stack, count in samples.items():
+        leaves[stack.rsplit(';', 1)[-1]] += count
+
+    lines = [f"{total} samples at {interval_ms} ms intervals", "", "Self time by frame:"]
+    for leaf, count in leaves.most_common(TOP_ENTRIES):
+        lines.append(f"  {count * 100 / total:5.1f}%  {leaf}")
+    lines += ["", "Hottest stacks (root first):"]
+    for stack, count in samples.most_common(10):
+        lines.append(f"  {count * 100 / total:5.1f}%  {stack}")
+    return '\n'.join(lines)
+
+
+def _format_cprofile(profiler):
+    output = io.StringIO()
+    pstats.Stats(profiler, stream=output).sort_stats('cumulative').print_stats(TOP_ENTRIES)
+    return output.getvalue()
+
+
+class RequestProfiler:
+    """Flask hooks that capture sampled or slow request traces into a ring buffer"""
+
+    settings = None
+    traces = deque(maxlen=50)
+    _sampler = None
+    _ids = itertools.count(1)
+    _cprofile_lock = threading.Lock()  # Held by the one request being traced with cProfile
+
+    @classmethod
+    def init_app(cls, app):
+        settings = EnvironmentConfig.get_profiler_settings()
+        cls.settings = settings
+        if not settings['enabled']:
+            return
+        cls.traces = deque(maxlen=settings['buffer_size'])
+        cls._sampler = StackSampler(settings['interval_ms'])
+        cls._sampler.start()
+        app.before_request(cls._start_request)
+        app.after_request(cls._record_status)
+        app.teardown_request(cls._finish_request)
+
+    @classmethod
+    def _start_request(cls):
+        # Profiling must never fail the request it is watching
+        try:
+            sampled = random.random() < cls.settings['sample_rate']
+            g.profile = {'started': time.perf_counter(), 'sampled': sampled, 'cprofile': None}
+            if sampled and cls.settings['mode'] == 'cprofile':
+                g.profile['cprofile'] = cls._start_cprofile()
+            if g.profile['cprofile'] is None:
+                cls._sampler.watch(threading.get_ident())
+        except Exception:
+            logger.exception("Request profiler failed to start")
+            g.pop('profile', None)
+
+    @classmethod
+    def _start_cprofile(cls):
+        """An enabled profiler, or None when another capture is running or enabling fails"""
+        if not cls._cprofile_lock.acquire(blocking=False):
+            return None
+        try:
+            profiler = cProfile.Profile()
+            profiler.enable()
+            return profiler
+        except Exception:
+            # e.g. ValueError on 3.12+ when a profiler outside this class is active
+            cls._cprofile_lock.release()
+            return None
+
+    @staticmethod
+    def _record_status(response):
+        if 'profile' in g:
+            g.profile['status'] = response.status_code
+        return response
+
+    @classmethod
+    def _finish_request(cls, error=None):
+        state = g.pop('profile', None)
+        if state is None:
+            return
+        profiler = state['cprofile']
+        try:
+            if profiler is not None:
+                try:
+                    profiler.disable()
+                finally:
+                    cls._cprofile_lock.release()
+            cls._record_trace(state, profiler, error)
+        except Exception:
+            logger.exception("Request profiler failed to record a trace")
+        finally:
+            if profiler is None:
+                cls._sampler.unwatch(threading.get_ident())
+
+    @classmethod
+    def _record_trace(cls, state, profiler, error):
+        duration_ms = (time.perf_counter() - state['started']) * 1000
+        samples = cls._sampler.unwatch(threading.get_ident()) if profiler is None else None
+
+        slow = duration_ms >= cls.settings['slow_ms']
+        if not (state['sampled'] or slow):
+            return
+
+        if profiler is not None:
+            profile, kind = _format_cprofile(profiler), 'cprofile'
+        else:
+            profile, kind = _format_samples(samples, cls.settings['interval_ms']), 'stack samples'
+
+        statements = g.get('query_log') or []
+        cls.traces.append({
+            'id': next(cls._ids),
+            'captured_at': datetime.utcnow().isoformat(timespec='seconds'),
+            'method': request.method,
+            'path': request.path,
+            'endpoint': request.endpoint,
+            'status': 500 if error else state.get('status'),
+            'duration_ms': round(duration_ms, 1),
+            'reason': 'slow' if slow else 'sampled',
+            'kind': kind,
+            'profile': profile,
+            'sql_ms': round(sum(elapsed for _, elapsed in statements) * 1000, 1),
+            'sql': [(' '.join(statement.split()), round(elapsed * 1000, 2)) for statement, elapsed in statements]
+        })
+
+    @classmethod
+    def get_trace(cls, trace_id):
+        return next((trace for trace in list(cls.traces) if trace['id'] == trace_id), None)
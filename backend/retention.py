@@ -0,0 +1,192 @@
+"""
+Data retention: purge abandoned adaptive sessions, orphan quizzes, old trend
+events and stale submission receipts in bounded batches
+"""
+
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import select, delete, func, exists, text
+from app import db
+from .models import (
+    Quiz, QuizResponse, AdaptiveQuizSession, AdaptiveSetResult,
+    PerformanceTrendEvent, SubmissionReceipt
+)
+from .environment_config import EnvironmentConfig
+
+# PostgreSQL advisory lock key held for the duration of a scheduled run
+SCHEDULER_LOCK_KEY = 7302414
+
+
+class RetentionPolicy:
+    """How long each kind of data is kept, and how hard the purge may push the database"""
+
+    def __init__(self, session_days=7, orphan_quiz_days=1, trend_event_days=365,
+                 receipt_days=2, batch_size=1000, pause_seconds=0.2):
+        self.session_days = session_days  # Unfinished adaptive sessions
+        self.orphan_quiz_days = orphan_quiz_days  # Quiz rows that never received a response
+        self.trend_event_days = trend_event_days  # Raw score events behind the trend aggregates
+        self.receipt_days = receipt_days  # Idempotency receipts; retries arrive within minutes
+        self.batch_size = batch_size
+        self.pause_seconds = pause_seconds  # Sleep between batches so writers can take the locks
+
+    @classmethod
+    def from_environment(cls):
+        settings = EnvironmentConfig.get_retention_settings()
+        settings.pop('interval_hours')
+        return cls(**settings)
+
+
+class RetentionJob:
+    """
+    Each purge selects a batch of primary keys, deletes by key, commits and
+    pauses, so no single statement holds locks on an unbounded range.
+    """
+
+    # Cumulative rows reclaimed per table since the process started
+    totals = {}
+    last_report = None
+    _scheduler = None
+
+    def __init__(self, policy=None):
+        self.policy = policy or RetentionPolicy.from_environment()
+
+    def run(self, dry_run=False):
+        """Apply every purge; returns a report of rows (to be) reclaimed per table"""
+        started = time.time()
+        report = {
+            'dry_run': dry_run,
+            'started_at': datetime.utcnow().isoformat(),
+            'tables': {}
+        }
+        report['tables']['adaptive_quiz_sessions'] = self.purge_sessions(dry_run)
+        report['tables']['quizzes'] = self.purge_orphan_quizzes(dry_run)
+        report['tables']['performance_trend_events'] = self.purge_trend_events(dry_run)
+        report['tables']['submission_receipts'] = self.purge_receipts(dry_run)
+        report['duration_seconds'] = round(time.time() - started, 3)
+
+        if not dry_run:
+            for table, stats in report['tables'].items():
+                RetentionJob.totals[table] = RetentionJob.totals.get(table, 0) + stats['rows']
+            RetentionJob.last_report = report
+        return report
+
+    def purge_sessions(self, dry_run=False):
+        """Unfinished adaptive sessions past the window, with their per-set rows and receipts"""
+        cutoff = datetime.utcnow() - timedelta(days=self.policy.session_days)
+        ids = select(AdaptiveQuizSession.session_id).where(
+            AdaptiveQuizSession.start_time < cutoff,
+            AdaptiveQuizSession.is_completed.is_not(True)
+        )
+
+        def delete_batch(session_ids):
+            # Receipt keys are adaptive:<session_id>:<set_number>
+            db.session.execute(delete(SubmissionReceipt).where(
+                SubmissionReceipt.idempotency_key.like('adaptive:%'),
+                func.substr(SubmissionReceipt.idempotency_key, 10, 36).in_(session_ids)
+            ))
+            db.session.execute(delete(AdaptiveSetResult).where(AdaptiveSetResult.session_id.in_(session_ids)))
+            db.session.execute(delete(AdaptiveQuizSession).where(AdaptiveQuizSession.session_id.in_(session_ids)))
+
+        return self._purge(ids, delete_batch, dry_run)
+
+    def purge_orphan_quizzes(self, dry_run=False):
+        """Quiz rows created at generation time that were never answered"""
+        cutoff = datetime.utcnow() - timedelta(days=self.policy.orphan_quiz_days)
+        ids = select(Quiz.id).where(
+            Quiz.date_taken < cutoff,
+            ~exists().where(QuizResponse.quiz_id == Quiz.quiz_id),
+            ~exists().where(AdaptiveSetResult.quiz_id == Quiz.quiz_id),
+            ~exists().where(SubmissionReceipt.quiz_id == Quiz.quiz_id)
+        )
+
+        def delete_batch(quiz_ids):
+            db.session.execute(delete(Quiz).where(Quiz.id.in_(quiz_ids)))
+
+        return self._purge(ids, delete_batch, dry_run)
+
+    def purge_trend_events(self, dry_run=False):
+        """Raw score events past the window; PerformanceTrend keeps the rolled-up state"""
+        cutoff = datetime.utcnow() - timedelta(days=self.policy.trend_event_days)
+        ids = select(PerformanceTrendEvent.id).where(PerformanceTrendEvent.recorded_at < cutoff)
+
+        def delete_batch(event_ids):
+            db.session.execute(delete(PerformanceTrendEvent).where(PerformanceTrendEvent.id.in_(event_ids)))
+
+        return self._purge(ids, delete_batch, dry_run)
+
+    def purge_receipts(self, dry_run=False):
+        """Idempotency receipts older than any plausible retry"""
+        cutoff = datetime.utcnow() - timedelta(days=self.policy.receipt_days)
+        ids = select(SubmissionReceipt.idempotency_key).where(SubmissionReceipt.created_at < cutoff)
+
+        def delete_batch(keys):
+            db.session.execute(delete(SubmissionReceipt).where(SubmissionReceipt.idempotency_key.in_(keys)))
+
+        return self._purge(ids, delete_batch, dry_run)
+
+    def _purge(self, ids, delete_batch, dry_run):
+        """Run delete_batch over the selected keys one bounded batch at a time"""
+        if dry_run:
+            count = db.session.execute(select(func.count()).select_from(ids.subquery())).scalar()
+            return {'rows': count or 0, 'batches': 0}
+
+        rows, batches = 0, 0
+        batch_size = self.policy.batch_size
+        while True:
+            batch = db.session.execute(ids.limit(batch_size)).scalars().all()
+            if not batch:
+                break
+            delete_batch(batch)
+            db.session.commit()
+            rows += len(batch)
+            batches += 1
+            if len(batch) < batch_size:
+                break
+            time.sleep(self.policy.pause_seconds)
+
+        return {'rows': rows, 'batches': batches}
+
+    @classmethod
+    def run_exclusive(cls):
+        """
+        Run the job unless another process is already running it; returns the
+        report, or None when the lock is held elsewhere. Every gunicorn worker
+        starts a scheduler, so on PostgreSQL the run is guarded by a session
+        advisory lock; other databases are single-process deployments.
+        """
+        if db.engine.dialect.name != 'postgresql':
+            return cls().run()
+
+        with db.engine.connect().execution_options(isolation_level='AUTOCOMMIT') as connection:
+            if not connection.execute(text('SELECT pg_try_advisory_lock(:key)'), {'key': SCHEDULER_LOCK_KEY}).scalar():
+                return None
+            try:
+                return cls().run()
+            finally:
+                connection.execute(text('SELECT pg_advisory_unlock(:key)'), {'key': SCHEDULER_LOCK_KEY})
+
+    @classmethod
+    def start_scheduler(cls, app, interval_hours):
+        """Run the job every interval_hours on a daemon thread (idempotent per process)"""
+        if cls._scheduler and cls._scheduler.is_alive():
+            return
+
+        def run():
+            while True:
+                time.sleep(interval_hours * 3600)
+                with app.app_context():
+                    try:
+                        report = cls.run_exclusive()
+                        if report is None:
+                            logging.info("Retention job skipped: another process is running it")
+                            continue
+                        reclaimed = sum(stats['rows'] for stats in report['tables'].values())
+                        logging.info(f"Retention job reclaimed {reclaimed} rows in {report['duration_seconds']}s")
+                    except Exception as e:
+                        db.session.rollback()
+                        logging.error(f"Retention job failed: {e}")
+
+        cls._scheduler = threading.Thread(target=run, name='retention-job', daemon=True)
+        cls._scheduler.start()
@@ -0,0 +1,176 @@
+"""
+Structured, non-blocking logging
+
+Request threads only enqueue records; a QueueListener thread formats and
+writes them, so a slow stdout never stalls a request. On the way into the
+queue each record is tagged with request context, debug records are sampled
+per request (with per-route overrides), and answer payloads and credentials
+are redacted.
+
+Attach structured data with `extra={'fields': {...}}`:
+
+    logger.debug("Quiz form received", extra={'fields': {'quiz_id': quiz_id, 'answers': answers}})
+"""
+
+import atexit
+import json
+import logging
+import queue
+import random
+import re
+import sys
+import uuid
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from flask import g, has_request_context, request
+from .environment_config import EnvironmentConfig
+
+# Field names whose values never reach the log: answer keys, chosen options and credentials
+SENSITIVE_FIELDS = re.compile(r'^(question_(?!id$).+|answers?|selected_option|correct_option|password.*|.*secret.*|.*token.*)$',
+                              re.IGNORECASE)
+# The same keys when a dict was interpolated into a message, e.g. "{'question_<id>': 'A'}"
+SENSITIVE_TEXT = re.compile(r"""(['"]?(?:question_(?!id\b)[\w-]+|selected_option|correct_option|password)['"]?\s*[:=]\s*)('[^']*'|"[^"]*"|\w+)""",
+                            re.IGNORECASE)
+REDACTED = '[redacted]'
+
+# Third-party loggers that are too chatty below WARNING
+QUIET_LOGGERS = ('sqlalchemy.engine', 'sqlalchemy.pool', 'backend.db_pool', 'urllib3', 'httpx', 'httpcore', 'google_genai')
+
+_listener = None
+
+
+def redact(value):
+    """Copy of value with sensitive dict entries masked (dicts become {key: '[redacted]'})"""
+    if isinstance(value, dict):
+        return {key: REDACTED if SENSITIVE_FIELDS.match(str(key)) else redact(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [redact(item) for item in value]
+    return value
+
+
+class RequestContextFilter(logging.Filter):
+    """Tag records with the request id, endpoint, method and path"""
+
+    def filter(self, record):
+        if has_request_context():
+            if 'request_id' not in g:
+                g.request_id = request.headers.get('X-Request-ID') or uuid.uuid4().hex[:16]
+            record.request_id = g.request_id
+            record.endpoint = request.endpoint
+            record.method = request.method
+            record.path = request.path
+        return True
+
+
+class DebugSampler(logging.Filter):
+    """
+    Keep DEBUG records for a sampled fraction of requests. The decision is made
+    once per request so a sampled request logs its whole story.
+    """
+
+    def __init__(self, default_rate, route_rates):
+        super().__init__()
+        self.default_rate = default_rate
+        self.route_rates = route_rates
+
+    def filter(self, record):
+        if record.levelno > logging.DEBUG or not has_request_context():
+            return True
+        if 'log_debug_sampled' not in g:
+            rate = self.route_rates.get(request.endpoint, self.default_rate)
+            g.log_debug_sampled = random.random() < rate
+        return g.log_debug_sampled
+
+
+class RedactionFilter(logging.Filter):
+    """Mask answers and credentials in structured fields and in the rendered message"""
+
+    def filter(self, record):
+        fields = getattr(record, 'fields', None)
+        if fields:
+            record.fields = redact(fields)
+        message = record.getMessage()
+        redacted = SENSITIVE_TEXT.sub(lambda m: m.group(1) + f"'{REDACTED}'", message)
+        if redacted != message:
+            record.msg, record.args = redacted, None
+        return True
+
+
+class StructuredQueueHandler(QueueHandler):
+    """QueueHandler that keeps the traceback separate from the message for the formatter"""
+
+    def prepare(self, record):
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line"""
+
+    CONTEXT = ('request_id', 'endpoint', 'method', 'path')
+
+    def format(self, record):
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage()
+        }
+        for key in self.CONTEXT:
+            value = getattr(record, key, None)
+            if value is not None:
+                entry[key] = value
+        fields = getattr(record, 'fields', None)
+        if fields:
+            entry.update(fields)
+        if record.exc_text:
+            entry['exc'] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """Human-readable lines for development, with fields appended as key=value"""
+
+    def __init__(self):
+        super().__init__('%(asctime)s %(levelname)s %(name)s: %(message)s')
+
+    def format(self, record):
+        line = super().format(record)
+        fields = getattr(record, 'fields', None)
+        if fields:
+            line += ' ' + ' '.join(f"{key}={value}" for key, value in fields.items())
+        if getattr(record, 'request_id', None):
+            line += f" request_id={record.request_id}"
+        return line
+
+
+def configure_logging():
+    """Install the queue handler on the root logger (idempotent)"""
+    global _listener
+    if _listener is not None:
+        return
+
+    settings = EnvironmentConfig.get_logging_settings()
+    output = logging.StreamHandler(sys.stderr)
+    output.setFormatter(JsonFormatter() if settings['format'] == 'json' else TextFormatter())
+
+    handler = StructuredQueueHandler(queue.SimpleQueue())
+    handler.addFilter(RequestContextFilter())
+    handler.addFilter(DebugSampler(settings['debug_sample_rate'], settings['route_sample_rates']))
+    handler.addFilter(RedactionFilter())
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(settings['level'])
+    for name in QUIET_LOGGERS:
+        logging.getLogger(name).setLevel(max(logging.WARNING, root.level))
+
+    _listener = QueueListener(handler.queue, output, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
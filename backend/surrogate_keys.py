@@ -0,0 +1,58 @@
+"""
+Backfill of the integer surrogate foreign keys (the *_ref columns)
+
+Migration path from UUID string joins to integer joins:
+  1. New rows get their *_ref columns from the before_insert hook in models.py.
+  2. backfill() fills existing rows in bounded id ranges.
+  3. Analytics joins use the *_ref columns; UUIDs remain the external ids in URLs and APIs.
+  4. Migration m0007 re-runs the backfill and makes the columns NOT NULL.
+"""
+
+import time
+from sqlalchemy import select, update, func
+from app import db
+from .models import SURROGATE_KEYS
+
+
+def backfill(batch_size=5000, pause_seconds=0.0, progress=None):
+    """
+    Fill every NULL surrogate with a correlated subquery, walking each table
+    by primary key range. Returns {table.column: rows updated}.
+    """
+    updated = {}
+    for model, references in SURROGATE_KEYS.items():
+        low, high = db.session.execute(select(func.min(model.id), func.max(model.id))).one()
+        for ref, uuid_attr, parent_id, parent_uuid in references:
+            column = getattr(model, ref)
+            resolved = select(parent_id).where(parent_uuid == getattr(model, uuid_attr)).scalar_subquery()
+            key = f"{model.__tablename__}.{ref}"
+            updated[key] = 0
+            if low is None:
+                continue
+
+            for start in range(low, high + 1, batch_size):
+                result = db.session.execute(
+                    update(model)
+                    .where(model.id.between(start, start + batch_size - 1), column.is_(None))
+                    .values({ref: resolved})
+                    .execution_options(synchronize_session=False)
+                )
+                db.session.commit()
+                updated[key] += result.rowcount or 0
+                if pause_seconds:
+                    time.sleep(pause_seconds)
+
+            if progress:
+                progress(key, updated[key])
+    return updated
+
+
+def missing_counts():
+    """Rows whose surrogate is still NULL, per table.column"""
+    counts = {}
+    for model, references in SURROGATE_KEYS.items():
+        for ref, *_ in references:
+            counts[f"{model.__tablename__}.{ref}"] = db.session.execute(
+                select(func.count()).select_from(model).where(getattr(model, ref).is_(None))
+            ).scalar()
+    return counts
@@ -0,0 +1,173 @@
+"""
+Per-student topic progress read model, maintained on quiz submission
+"""
+
+from datetime import datetime
+from sqlalchemy import func, desc, exists, or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import joinedload
+from app import db
+from .models import Quiz, QuizResponse, Topic, Subject, StudentTopicProgress, SubmissionReceipt
+
+
+class TopicProgressService:
+    """Keeps student_topic_progress in step with submitted quizzes"""
+
+    RECENT_WINDOW = 5  # Size of the last-N score ring buffer
+    MASTERY_THRESHOLD = 80.0  # Average score that marks a topic as mastered
+
+    @staticmethod
+    def record_attempt(student_id, topic_id, score, total_marks=0, time_taken=None, taken_at=None):
+        """Upsert progress for a submitted quiz. The caller owns the commit."""
+        progress = TopicProgressService._get_or_create(student_id, topic_id)
+        TopicProgressService._apply_attempt(progress, score, total_marks, time_taken, taken_at)
+        return progress
+
+    @staticmethod
+    def _get_or_create(student_id, topic_id):
+        """Fetch the progress row with a row lock, inserting it on first attempt"""
+        progress = StudentTopicProgress.query.filter_by(
+            student_id=student_id,
+            topic_id=topic_id
+        ).with_for_update().first()
+        if progress:
+            return progress
+
+        try:
+            # Savepoint so a concurrent first insert doesn't roll back the submission
+            with db.session.begin_nested():
+                progress = TopicProgressService._new_progress(student_id, topic_id)
+                db.session.add(progress)
+        except IntegrityError:
+            progress = StudentTopicProgress.query.filter_by(
+                student_id=student_id,
+                topic_id=topic_id
+            ).with_for_update().first()
+
+        return progress
+
+    @staticmethod
+    def _new_progress(student_id, topic_id):
+        """Empty progress row with explicit zeroed aggregates"""
+        return StudentTopicProgress(
+            student_id=student_id,
+            topic_id=topic_id,
+            attempts=0,
+            score_sum=0.0,
+            best_score=0.0,
+            total_marks_sum=0,
+            time_sum=0,
+            recent_scores=[],
+            recent_head=0,
+            is_mastered=False
+        )
+
+    @staticmethod
+    def _apply_attempt(progress, score, total_marks, time_taken, taken_at):
+        """Fold a single quiz result into the running aggregates"""
+        score = score or 0.0
+        progress.attempts += 1
+        progress.score_sum += score
+        progress.best_score = max(progress.best_score, score)
+        progress.total_marks_sum += total_marks or 0
+        progress.time_sum += time_taken or 0
+
+        # Reassign the list so the JSON column is flagged as dirty
+        recent = list(progress.recent_scores or [])
+        if len(recent) < TopicProgressService.RECENT_WINDOW:
+            recent.append(score)
+            progress.recent_head = len(recent) % TopicProgressService.RECENT_WINDOW
+        else:
+            recent[progress.recent_head] = score
+            progress.recent_head = (progress.recent_head + 1) % TopicProgressService.RECENT_WINDOW
+        progress.recent_scores = recent
+
+        progress.is_mastered = TopicProgressService.average_score(progress) >= TopicProgressService.MASTERY_THRESHOLD
+        progress.last_attempt_at = taken_at or datetime.utcnow()
+
+    # Read helpers
+    @staticmethod
+    def average_score(progress):
+        """Mean score across all attempts"""
+        if not progress or not progress.attempts:
+            return 0
+        return progress.score_sum / progress.attempts
+
+    @staticmethod
+    def overall_progress(progress):
+        """Score total against marks total, as shown on topic cards"""
+        if not progress or not progress.total_marks_sum:
+            return 0
+        return round((progress.score_sum / progress.total_marks_sum) * 100, 1)
+
+    @staticmethod
+    def recent_scores(progress):
+        """Ring buffer contents ordered oldest to newest"""
+        recent = list(progress.recent_scores or []) if progress else []
+        if len(recent) < TopicProgressService.RECENT_WINDOW:
+            return recent
+        return recent[progress.recent_head:] + recent[:progress.recent_head]
+
+    @staticmethod
+    def get_student_progress(student_id, subject_id=None):
+        """All progress rows for a student keyed by topic_id, in a single query"""
+        query = StudentTopicProgress.query.options(
+            joinedload(StudentTopicProgress.topic)
+        ).filter_by(student_id=student_id)
+        if subject_id:
+            query = query.join(Topic, StudentTopicProgress.topic_id == Topic.topic_id)\
+                         .filter(Topic.subject_id == subject_id)
+        return {progress.topic_id: progress for progress in query.all()}
+
+    @staticmethod
+    def get_subject_averages(student_id):
+        """Average score per subject name, weighted by attempts"""
+        rows = db.session.query(
+            Subject.name,
+            (func.sum(StudentTopicProgress.score_sum) /
+             func.sum(StudentTopicProgress.attempts)).label('avg_score')
+        ).join(Topic, StudentTopicProgress.topic_id == Topic.topic_id)\
+         .join(Subject, Topic.subject_id == Subject.subject_id)\
+         .filter(StudentTopicProgress.student_id == student_id)\
+         .filter(StudentTopicProgress.attempts > 0)\
+         .group_by(Subject.name)\
+         .order_by(desc('avg_score')).all()
+        return rows
+
+    @staticmethod
+    def rebuild(student_id=None, batch_size=1000):
+        """
+        Recompute progress rows from quiz history. Returns the number of rows written.
+        Only submitted quizzes are replayed (those with responses or a submission
+        receipt), as on the live path; quiz rows created at generation time and
+        never answered would otherwise count as zero scores.
+        """
+        delete_query = StudentTopicProgress.query
+        quiz_query = Quiz.query.filter(or_(
+            exists().where(QuizResponse.quiz_id == Quiz.quiz_id),
+            exists().where(SubmissionReceipt.quiz_id == Quiz.quiz_id)
+        ))
+        if student_id:
+            delete_query = delete_query.filter_by(student_id=student_id)
+            quiz_query = quiz_query.filter_by(student_id=student_id)
+
+        delete_query.delete(synchronize_session=False)
+        db.session.expunge_all()
+
+        # Replay history in the order it happened so the ring buffer matches
+        progress_rows = {}
+        quizzes = quiz_query.order_by(Quiz.date_taken, Quiz.id).yield_per(batch_size)
+        for quiz in quizzes:
+            key = (quiz.student_id, quiz.topic_id)
+            progress = progress_rows.get(key)
+            if progress is None:
+                progress = TopicProgressService._new_progress(quiz.student_id, quiz.topic_id)
+                progress_rows[key] = progress
+            TopicProgressService._apply_attempt(
+                progress, quiz.score, quiz.total_marks, quiz.time_taken, quiz.date_taken
+            )
+
+        db.session.add_all(progress_rows.values())
+        db.session.commit()
+
+        return len(progress_rows)
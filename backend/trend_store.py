@@ -0,0 +1,211 @@
+"""
+Append-only performance trend store with a packed rolling window per topic
+"""
+
+import json
+import struct
+from datetime import datetime
+from sqlalchemy import update
+from app import db
+from .models import PerformanceTrend, PerformanceTrendEvent
+from .proficiency import get_proficiency_model, elapsed_days_between
+
+
+class TrendStore:
+    """
+    Records every score as a narrow PerformanceTrendEvent row and keeps a
+    fixed-size ring of recent scores packed into PerformanceTrend.window_scores.
+    Proficiency is then updated in O(1) by the configured proficiency model.
+    """
+
+    WINDOW = 10  # Scores kept in the rolling window
+    SLOT = struct.Struct('<d')  # One little-endian double per ring slot
+
+    @staticmethod
+    def record_score(student_id, topic_id, score, recorded_at=None):
+        """Append a score event and roll it into the trend row. The caller owns the commit."""
+        recorded_at = recorded_at or datetime.utcnow()
+
+        db.session.add(PerformanceTrendEvent(
+            student_id=student_id,
+            topic_id=topic_id,
+            score=score,
+            recorded_at=recorded_at
+        ))
+
+        trend = PerformanceTrend.query.filter_by(
+            student_id=student_id,
+            topic_id=topic_id
+        ).with_for_update().first()
+
+        if not trend:
+            trend = PerformanceTrend(student_id=student_id, topic_id=topic_id)
+            TrendStore._reset_window(trend)
+            db.session.add(trend)
+        elif not trend.window_scores:
+            # First write since the JSON history was retired: seed the ring from it
+            TrendStore._reset_window(trend, TrendStore._legacy_scores(trend))
+
+        elapsed_days = elapsed_days_between(trend.last_updated, recorded_at) if trend.event_count else 0.0
+        TrendStore._push(trend, score)
+        trend.proficiency_score = get_proficiency_model().update(trend, score, elapsed_days)
+        trend.event_count = (trend.event_count or 0) + 1
+        trend.last_updated = recorded_at
+
+        return trend
+
+    @staticmethod
+    def recent_scores(trend):
+        """Scores in the rolling window ordered oldest to newest"""
+        if not trend.window_scores:
+            return TrendStore._legacy_scores(trend)
+
+        slots = [
+            TrendStore.SLOT.unpack_from(trend.window_scores, i * TrendStore.SLOT.size)[0]
+            for i in range(TrendStore.WINDOW)
+        ]
+        if trend.window_count < TrendStore.WINDOW:
+            return slots[:trend.window_count]
+        return slots[trend.window_head:] + slots[:trend.window_head]
+
+    @staticmethod
+    def get_proficiency_map(student_id):
+        """Current proficiency per topic_id for a learner, in a single query"""
+        rows = PerformanceTrend.query.with_entities(
+            PerformanceTrend.topic_id,
+            PerformanceTrend.proficiency_score
+        ).filter_by(student_id=student_id).all()
+        return {row.topic_id: row.proficiency_score or 0 for row in rows}
+
+    @staticmethod
+    def get_history(student_id, topic_id=None, limit=100, since=None):
+        """Score events for charts, oldest first. Reads the event table only."""
+        query = PerformanceTrendEvent.query.filter_by(student_id=student_id)
+        if topic_id:
+            query = query.filter_by(topic_id=topic_id)
+        if since:
+            query = query.filter(PerformanceTrendEvent.recorded_at >= since)
+
+        events = query.order_by(PerformanceTrendEvent.recorded_at.desc()).limit(limit).all()
+        return [
+            {
+                'topic_id': event.topic_id,
+                'score': event.score,
+                'date': event.recorded_at.strftime('%Y-%m-%d %H:%M')
+            }
+            for event in reversed(events)
+        ]
+
+    @staticmethod
+    def recalibrate(model=None, batch_size=5000):
+        """
+        Recompute every proficiency_score from the full event history with the
+        model's vectorized fit. Returns the number of trend rows updated.
+
+        Scores carried over from the legacy trend_graph_data list have no
+        events; they are fitted ahead of the events, without time gaps.
+        Trends whose older events were purged by retention (fewer events left
+        than event_count minus the legacy scores) are skipped: a fit over the
+        surviving tail would forget the learner's earlier results, so they
+        keep the incrementally maintained score.
+
+        The event cursor is read to the end before anything is written, since
+        a streaming cursor cannot share its session with UPDATEs on PostgreSQL.
+        """
+        model = model or get_proficiency_model()
+        trends = {
+            (row.student_id, row.topic_id): row
+            for row in PerformanceTrend.query.with_entities(
+                PerformanceTrend.id, PerformanceTrend.student_id, PerformanceTrend.topic_id,
+                PerformanceTrend.event_count, PerformanceTrend.window_scores.is_not(None).label('seeded'),
+                PerformanceTrend.trend_graph_data
+            ).all()
+        }
+
+        events = db.session.query(
+            PerformanceTrendEvent.student_id,
+            PerformanceTrendEvent.topic_id,
+            PerformanceTrendEvent.score,
+            PerformanceTrendEvent.recorded_at
+        ).order_by(
+            PerformanceTrendEvent.student_id,
+            PerformanceTrendEvent.topic_id,
+            PerformanceTrendEvent.recorded_at
+        ).yield_per(batch_size)
+
+        updates = []
+
+        def flush_group(key, scores, timestamps):
+            trend = trends.get(key)
+            if trend is None or not scores:
+                return
+            # The ring is seeded from the legacy list on the first event after it was retired
+            legacy = TrendStore._legacy_scores(trend) if trend.seeded else []
+            if len(scores) < (trend.event_count or 0) - len(legacy):
+                return
+            gaps = [0.0] * (len(legacy) + 1) + [
+                elapsed_days_between(earlier, later)
+                for earlier, later in zip(timestamps, timestamps[1:])
+            ]
+            updates.append({
+                'id': trend.id,
+                'proficiency_score': model.fit(legacy + scores, gaps),
+                'event_count': len(legacy) + len(scores)
+            })
+
+        current_key, scores, timestamps = None, [], []
+        for event in events:
+            key = (event.student_id, event.topic_id)
+            if key != current_key:
+                flush_group(current_key, scores, timestamps)
+                current_key, scores, timestamps = key, [], []
+            scores.append(event.score)
+            timestamps.append(event.recorded_at)
+        flush_group(current_key, scores, timestamps)
+
+        for start in range(0, len(updates), batch_size):
+            db.session.execute(update(PerformanceTrend), updates[start:start + batch_size])
+            db.session.commit()
+
+        return len(updates)
+
+    # Ring buffer helpers
+    @staticmethod
+    def _reset_window(trend, scores=()):
+        """Initialise an empty ring, optionally pre-filled with the newest scores"""
+        trend.window_scores = bytes(TrendStore.SLOT.size * TrendStore.WINDOW)
+        trend.window_head = 0
+        trend.window_count = 0
+        trend.window_sum = 0.0
+        scores = list(scores)
+        for score in scores[-TrendStore.WINDOW:]:
+            TrendStore._push(trend, score)
+        trend.event_count = max(trend.event_count or 0, len(scores))
+
+    @staticmethod
+    def _push(trend, score):
+        """Overwrite the oldest slot with the new score and adjust the rolling sum"""
+        buffer = bytearray(trend.window_scores)
+        offset = trend.window_head * TrendStore.SLOT.size
+
+        if trend.window_count == TrendStore.WINDOW:
+            evicted = TrendStore.SLOT.unpack_from(buffer, offset)[0]
+            trend.window_sum -= evicted
+        else:
+            trend.window_count += 1
+
+        TrendStore.SLOT.pack_into(buffer, offset, float(score))
+        trend.window_sum += score
+        trend.window_head = (trend.window_head + 1) % TrendStore.WINDOW
+        trend.window_scores = bytes(buffer)
+
+    @staticmethod
+    def _legacy_scores(trend):
+        """Decode the retired trend_graph_data column, which may be double-encoded"""
+        data = trend.trend_graph_data
+        if isinstance(data, str):
+            try:
+                data = json.loads(data)
+            except ValueError:
+                return []
+        return [float(score) for score in data] if isinstance(data, list) else []
@@ -3,16 +3,28 @@ Unified Quiz Engine - Consolidates both regular and adaptive quiz functionality
 with optimized performance and caching.
 """
 
-import json
+import logging
 import random
+import uuid
 from datetime import datetime, timedelta
 from functools import lru_cache
+from sqlalchemy import func, case
 from app import db
 from .models import (
     Quiz, QuizResponse, Question, QuestionSet, Topic, Student, 
-    PerformanceTrend, AdaptiveQuizSession
+    PerformanceTrend, AdaptiveQuizSession, AdaptiveSetResult
 )
 from .ai_service import NuraAI
+from .performance_cache import cache
+from .topic_progress import TopicProgressService
+from .trend_store import TrendStore
+from .adaptive_testing import ItemBank, AbilityEstimator, difficulty_label, ability_to_proficiency
+from .irt_calibration import difficulty_prior
+from .idempotency import IdempotencyStore, CONFLICT_ERRORS
+from .adaptive_prefetch import AdaptivePrefetcher
+from .attempt_store import attempt_store
+
+logger = logging.getLogger(__name__)
 
 class UnifiedQuizEngine:
     """
@@ -28,14 +40,21 @@ class UnifiedQuizEngine:
         'Hard': {'up': 'Very Hard', 'down': 'Medium'},
         'Very Hard': {'up': None, 'down': 'Hard'}
     }
+    ADAPTIVE_MODES = ['sets', 'cat']
+    CAT_TARGET_SE = 0.3  # End a CAT session early once the ability estimate is this precise
     
     def __init__(self):
         self.nura_ai = NuraAI()
         self._question_cache = {}
+        self.prefetcher = AdaptivePrefetcher(self)
+        attempt_store.start_sweeper()
     
     # Regular Quiz Methods
     def generate_quiz(self, student_id, topic_id, difficulty_level=None):
-        """Generate a regular quiz with optional difficulty specification"""
+        """
+        Generate a regular quiz with optional difficulty specification. Nothing is
+        written here: the attempt is held in the attempt store until submission.
+        """
         try:
             student = Student.query.filter_by(student_id=student_id).first()
             topic = Topic.query.filter_by(topic_id=topic_id).first()
@@ -60,28 +79,28 @@ class UnifiedQuizEngine:
             # Select questions based on constraints
             selected_questions = self._select_questions(questions, question_set)
             
-            # Create quiz record
-            quiz = Quiz(
-                student_id=student_id,
-                topic_id=topic_id,
-                question_set_id=question_set.question_set_id,
-                total_marks=sum(q.marks_worth for q in selected_questions)
+            quiz_data = self._prepare_quiz_data(
+                str(uuid.uuid4()), topic, difficulty_level, selected_questions, question_set
             )
-            db.session.add(quiz)
-            db.session.commit()
+            attempt_store.open(student_id, quiz_data)
             
-            return self._prepare_quiz_data(quiz, topic, difficulty_level, selected_questions, question_set)
+            return quiz_data
             
         except Exception as e:
-            print(f"Error generating quiz: {e}")
+            logger.exception("Error generating quiz")
             return None
     
     # Adaptive Quiz Methods
-    def start_adaptive_session(self, student_id, topic_id, initial_difficulty, total_sets=5):
-        """Start a new adaptive quiz session"""
+    def start_adaptive_session(self, student_id, topic_id, initial_difficulty, total_sets=5, mode='sets'):
+        """
+        Start a new adaptive quiz session. In 'cat' mode each set is a single
+        item chosen for the learner's ability and total_sets is the item limit.
+        """
         try:
             if initial_difficulty not in self.DIFFICULTY_LEVELS:
                 raise ValueError(f"Invalid difficulty level: {initial_difficulty}")
+            if mode not in self.ADAPTIVE_MODES:
+                raise ValueError(f"Invalid adaptive mode: {mode}")
             
             student = Student.query.filter_by(student_id=student_id).first()
             topic = Topic.query.filter_by(topic_id=topic_id).first()
@@ -97,23 +116,28 @@ class UnifiedQuizEngine:
                 current_difficulty=initial_difficulty,
                 total_sets=total_sets,
                 current_set=1,
-                session_data=json.dumps({
-                    'sets_completed': [],
-                    'performance_history': [],
-                    'difficulty_adjustments': []
-                })
+                mode=mode
             )
             
+            if mode == 'cat':
+                bank = ItemBank.for_topic(topic_id)
+                if not len(bank):
+                    return None
+                session.ability_estimate = difficulty_prior(initial_difficulty)
+                session.ability_se = 1.0
+            
             db.session.add(session)
             db.session.commit()
             
             # Generate first question set
-            first_set = self._generate_adaptive_set(
-                session.session_id, topic_id, initial_difficulty, 1
-            )
+            if mode == 'cat':
+                first_set = self._generate_cat_item(session, bank, administered=set())
+            else:
+                first_set = self._generate_adaptive_set(session, initial_difficulty)
             
             if not first_set:
                 return None
+            db.session.commit()
             
             return {
                 'success': True,
@@ -127,7 +151,7 @@ class UnifiedQuizEngine:
             }
             
         except Exception as e:
-            print(f"Error starting adaptive session: {e}")
+            logger.exception("Error starting adaptive session")
             return None
     
     def process_adaptive_submission(self, session_id, quiz_data, answers, completion_time):
@@ -137,12 +161,30 @@ class UnifiedQuizEngine:
             if not session:
                 return None
             
-            # Process the quiz using unified submission logic
+            # Sets are keyed by number, so a retry is answered before any grading
+            set_number = quiz_data.get('set_number')
+            idempotency_key = IdempotencyStore.adaptive_key(session_id, set_number)
+            student_id = session.student_id
+            replay = IdempotencyStore.lookup(idempotency_key, student_id) if set_number else None
+            if replay is not None:
+                return replay
+            if set_number is None:
+                set_number = session.current_set
+                idempotency_key = IdempotencyStore.adaptive_key(session_id, set_number)
+            elif set_number != session.current_set:
+                # Stale or out-of-order retry for a set that has no receipt
+                return None
+            
+            if session.mode == 'cat':
+                return self._process_cat_answer(session, quiz_data, answers, completion_time, idempotency_key)
+            
+            # Process the quiz using unified submission logic, in this transaction
             quiz_result = self.process_quiz_submission(
-                session.student_id, quiz_data, answers, completion_time
+                session.student_id, quiz_data, answers, completion_time, commit=False
             )
             
             if not quiz_result:
+                db.session.rollback()
                 return None
             
             # Calculate adaptive metrics
@@ -150,93 +192,98 @@ class UnifiedQuizEngine:
             average_time_per_question = completion_time / quiz_result['total_questions']
             is_fast_completion = average_time_per_question < 20
             
-            # Update session data
-            session_data = json.loads(session.session_data)
-            
-            set_result = {
-                'set_number': session.current_set,
-                'difficulty_level': session.current_difficulty,
-                'quiz_id': quiz_result['quiz_id'],
-                'score': quiz_result['score'],
-                'correctness_percentage': correctness_percentage,
-                'completion_time': completion_time,
-                'average_time_per_question': average_time_per_question,
-                'is_fast_completion': is_fast_completion,
-                'total_questions': quiz_result['total_questions'],
-                'correct_answers': quiz_result['correct_answers']
-            }
-            
-            session_data['sets_completed'].append(set_result)
-            session_data['performance_history'].append({
-                'set_number': session.current_set,
-                'score': quiz_result['score'],
-                'time': completion_time
-            })
-            
             # Determine next difficulty
             next_difficulty = self._calculate_next_difficulty(
                 session.current_difficulty, correctness_percentage, is_fast_completion
             )
             
-            # Record difficulty adjustment
+            # Append-only per-set row; the session row only moves its cursor
+            set_row = AdaptiveSetResult(
+                session_id=session.session_id,
+                set_number=session.current_set,
+                difficulty_level=session.current_difficulty,
+                next_difficulty=next_difficulty,
+                quiz_id=quiz_result['quiz_id'],
+                score=quiz_result['score'],
+                correctness_percentage=correctness_percentage,
+                completion_time=completion_time,
+                average_time_per_question=average_time_per_question,
+                is_fast_completion=is_fast_completion,
+                total_questions=quiz_result['total_questions'],
+                correct_answers=quiz_result['correct_answers']
+            )
             if next_difficulty != session.current_difficulty:
-                session_data['difficulty_adjustments'].append({
-                    'from_set': session.current_set,
-                    'from_difficulty': session.current_difficulty,
-                    'to_difficulty': next_difficulty,
-                    'reason': f"Performance: {correctness_percentage:.1f}%, Fast: {is_fast_completion}"
-                })
+                set_row.adjustment_reason = f"Performance: {correctness_percentage:.1f}%, Fast: {is_fast_completion}"
+            db.session.add(set_row)
             
             session.current_difficulty = next_difficulty
             session.current_set += 1
-            session.session_data = json.dumps(session_data)
-            
-            db.session.commit()
             
             # Check if session is complete
             is_complete = session.current_set > session.total_sets
             
             result = {
-                'set_results': set_result,
+                'set_results': self._set_result_dict(set_row),
                 'session_progress': {
                     'current_set': session.current_set - 1,
                     'total_sets': session.total_sets,
                     'is_complete': is_complete,
                     'next_difficulty': next_difficulty
                 },
-                'performance_summary': self._calculate_session_summary(session_data)
+                'performance_summary': self._calculate_session_summary(session.session_id)
             }
             
             if not is_complete:
                 # Generate next set
-                next_set = self._generate_adaptive_set(
-                    session_id, session.topic_id, next_difficulty, session.current_set
-                )
+                next_set = self._generate_adaptive_set(session, next_difficulty)
                 result['next_set'] = next_set
             
+            # Session version check, set row and receipt commit together
+            IdempotencyStore.record(idempotency_key, session.student_id, result, quiz_result['quiz_id'])
+            db.session.commit()
+            attempt_store.close(quiz_result['quiz_id'])
+            
             return result
             
+        except CONFLICT_ERRORS:
+            return IdempotencyStore.resolve_conflict(idempotency_key, student_id)
         except Exception as e:
-            print(f"Error processing adaptive submission: {e}")
+            logger.exception("Error processing adaptive submission")
+            db.session.rollback()
             return None
     
-    def process_quiz_submission(self, student_id, quiz_data, answers, completion_time=None):
-        """Unified quiz submission processing for both regular and adaptive quizzes"""
+    def process_quiz_submission(self, student_id, quiz_data, answers, completion_time=None, commit=True):
+        """
+        Unified quiz submission processing for both regular and adaptive quizzes.
+        With commit=False the caller owns the transaction and its idempotency receipt.
+        """
+        idempotency_key = IdempotencyStore.quiz_key(quiz_data['quiz_id'])
         try:
-            quiz = Quiz.query.filter_by(quiz_id=quiz_data['quiz_id']).first()
-            if not quiz:
+            if commit:
+                replay = IdempotencyStore.lookup(idempotency_key, student_id)
+                if replay is not None:
+                    return replay
+            
+            # Rows committed before attempts were lazy still exist; everything else is created here
+            quiz = Quiz.query.filter_by(quiz_id=quiz_data['quiz_id']).first() \
+                or self._create_quiz_for_attempt(student_id, quiz_data)
+            if not quiz or quiz.student_id != student_id:
+                return None
+            
+            questions = self._questions_for_submission(quiz, quiz_data)
+            if questions is None:
+                logger.warning("Rejected submission whose questions differ from the issued quiz",
+                               extra={'fields': {'quiz_id': quiz.quiz_id, 'student_id': student_id}})
                 return None
             
             total_score = 0
             correct_answers = 0
-            total_questions = len(quiz_data['questions'])
+            total_questions = len(questions)
             
             # Batch process answers for better performance
             responses = []
-            for question_data in quiz_data['questions']:
-                question_id = question_data['question_id']
-                question = Question.query.filter_by(question_id=question_id).first()
-                
+            for question in questions:
+                question_id = question.question_id
                 selected_option = answers.get(f'question_{question_id}', '')
                 is_correct = selected_option == question.correct_option
                 
@@ -261,12 +308,14 @@ class UnifiedQuizEngine:
             if completion_time:
                 quiz.time_taken = completion_time
             
-            db.session.commit()
-            
-            # Update performance trends asynchronously
+            # Progress read model and trends are written in the same transaction
+            TopicProgressService.record_attempt(
+                student_id, quiz.topic_id, quiz.score, quiz.total_marks,
+                quiz.time_taken, quiz.date_taken
+            )
             self._update_performance_trends(student_id, quiz.topic_id, quiz.score)
             
-            return {
+            result = {
                 'quiz_id': quiz.quiz_id,
                 'score': quiz.score,
                 'total_marks': quiz.total_marks,
@@ -277,8 +326,21 @@ class UnifiedQuizEngine:
                 'success_threshold': quiz_data.get('success_threshold', 60)
             }
             
+            if commit:
+                IdempotencyStore.record(idempotency_key, student_id, result, quiz.quiz_id)
+                db.session.commit()
+                attempt_store.close(quiz.quiz_id)
+            
+            return result
+            
+        except CONFLICT_ERRORS:
+            if not commit:
+                raise
+            return IdempotencyStore.resolve_conflict(idempotency_key, student_id)
         except Exception as e:
-            print(f"Error processing quiz submission: {e}")
+            logger.exception("Error processing quiz submission")
+            if commit:
+                db.session.rollback()
             return None
     
     # Private helper methods with caching and optimization
@@ -311,10 +373,59 @@ class UnifiedQuizEngine:
         
         return random.sample(questions, min(num_questions, len(questions)))
     
-    def _prepare_quiz_data(self, quiz, topic, difficulty_level, selected_questions, question_set):
+    def _create_quiz_for_attempt(self, student_id, quiz_data):
+        """Add the Quiz row for an attempt at submission time; the caller commits"""
+        attempt = attempt_store.get(quiz_data['quiz_id'])
+        if attempt and attempt['student_id'] != student_id:
+            return None
+        
+        # Issued by another worker or already swept: fall back on the payload itself
+        source = attempt or quiz_data
+        if not source.get('question_set_id'):
+            return None
+        
+        quiz = Quiz(
+            quiz_id=quiz_data['quiz_id'],
+            student_id=student_id,
+            topic_id=source['topic_id'],
+            question_set_id=source['question_set_id'],
+            total_marks=source['total_marks']
+        )
+        db.session.add(quiz)
+        return quiz
+    
+    def _questions_for_submission(self, quiz, quiz_data):
+        """
+        Questions to grade, in the posted order, or None when the posted set is
+        not the one issued. The open attempt holds the exact list; without it
+        (another worker, or swept) every question must belong to the quiz's
+        question set and their marks must add up to the quiz total.
+        """
+        question_ids = [q.get('question_id') for q in quiz_data.get('questions') or []]
+        if not question_ids or len(set(question_ids)) != len(question_ids):
+            return None
+        
+        attempt = attempt_store.get(quiz.quiz_id)
+        if attempt and set(attempt['question_ids']) != set(question_ids):
+            return None
+        
+        query = Question.query.filter(Question.question_id.in_(question_ids))
+        if not attempt:
+            query = query.filter(Question.set_id == quiz.question_set_id)
+        questions = {question.question_id: question for question in query.all()}
+        if len(questions) != len(question_ids):
+            return None
+        if sum(question.marks_worth for question in questions.values()) != quiz.total_marks:
+            return None
+        
+        return [questions[question_id] for question_id in question_ids]
+    
+    def _prepare_quiz_data(self, quiz_id, topic, difficulty_level, selected_questions, question_set):
         """Prepare quiz data structure"""
         return {
-            'quiz_id': quiz.quiz_id,
+            'quiz_id': quiz_id,
+            'topic_id': topic.topic_id,
+            'question_set_id': question_set.question_set_id,
             'topic_name': topic.name,
             'difficulty_level': difficulty_level,
             'questions': [
@@ -326,53 +437,236 @@ class UnifiedQuizEngine:
                 }
                 for q in selected_questions
             ],
-            'total_marks': quiz.total_marks,
+            'total_marks': sum(q.marks_worth for q in selected_questions),
             'success_threshold': question_set.success_threshold,
             'time_limit': 30 * len(selected_questions)
         }
     
-    def _generate_adaptive_set(self, session_id, topic_id, difficulty_level, set_number):
-        """Generate question set for adaptive quiz"""
-        session = AdaptiveQuizSession.query.filter_by(session_id=session_id).first()
-        if not session:
+    def _generate_adaptive_set(self, session, difficulty_level):
+        """Serve the session's current set from the prefetch slot, building it inline on a miss"""
+        set_number = session.current_set
+        quiz_data = self.prefetcher.take(session.session_id, set_number, difficulty_level)
+        if not quiz_data:
+            quiz_data = self._build_set_payload(session.topic_id, difficulty_level)
+            if not quiz_data:
+                return None
+            
+            # Add adaptive-specific metadata
+            quiz_data['set_number'] = set_number
+            quiz_data['session_id'] = session.session_id
+        attempt_store.open(session.student_id, quiz_data)
+        
+        # Build the candidates for the following set while the learner answers this one
+        if set_number < session.total_sets:
+            self.prefetcher.schedule(session.session_id, session.topic_id, difficulty_level, set_number + 1)
+        
+        return quiz_data
+    
+    def _build_set_payload(self, topic_id, difficulty_level):
+        """Select questions for a set without writing; the Quiz row is created on submission"""
+        topic = Topic.query.filter_by(topic_id=topic_id).first()
+        question_set = QuestionSet.query.filter_by(
+            topic_id=topic_id,
+            difficulty_level=difficulty_level
+        ).first() or QuestionSet.query.filter_by(topic_id=topic_id).first()
+        if not topic or not question_set:
             return None
         
-        # Use the regular quiz generation logic
-        quiz_data = self.generate_quiz(session.student_id, topic_id, difficulty_level)
-        if not quiz_data:
+        questions = Question.query.filter_by(set_id=question_set.question_set_id).all()
+        selected_questions = self._select_questions(questions, question_set)
+        if not selected_questions:
             return None
         
-        # Add adaptive-specific metadata
-        quiz_data['set_number'] = set_number
-        quiz_data['session_id'] = session_id
+        return self._prepare_quiz_data(
+            str(uuid.uuid4()), topic, difficulty_level, selected_questions, question_set
+        )
+    
+    # Computerized adaptive testing helpers
+    def _generate_cat_item(self, session, bank, administered):
+        """Pick the most informative unused item for the current ability estimate; the caller commits"""
+        item = bank.select_next(session.ability_estimate, administered)
+        session.current_item_id = item['question_id'] if item else None
+        if not item:
+            return None
         
-        return quiz_data
+        return {
+            'session_id': session.session_id,
+            'set_number': session.current_set,
+            'mode': 'cat',
+            'difficulty_level': difficulty_label(session.ability_estimate),
+            'questions': [
+                {
+                    'question_id': item['question_id'],
+                    'description': item['description'],
+                    'options': item['options'],
+                    'marks_worth': item['marks_worth'],
+                    'image_url': item['image_url']
+                }
+            ],
+            'total_marks': item['marks_worth'],
+            'time_limit': 30
+        }
+    
+    def _process_cat_answer(self, session, quiz_data, answers, completion_time, idempotency_key):
+        """Grade one CAT item, re-estimate ability and select the next item"""
+        if len(quiz_data.get('questions') or []) != 1:
+            return None
+        question_id = quiz_data['questions'][0]['question_id']
+        if not session.current_item_id or question_id != session.current_item_id:
+            return None  # Only the item this session served may be answered
+        bank = ItemBank.for_topic(session.topic_id)
+        item = bank.get(question_id)
+        if not item:
+            return None
+        
+        # Earlier rows carry their own item parameters so recalibration doesn't shift past answers
+        previous_rows = AdaptiveSetResult.query.filter_by(
+            session_id=session.session_id
+        ).order_by(AdaptiveSetResult.set_number).all()
+        
+        selected_option = answers.get(f'question_{question_id}', '')
+        is_correct = selected_option == item['correct_option']
+        responses = [
+            (row.discrimination, row.difficulty, row.correct_answers > 0)
+            for row in previous_rows
+        ] + [(item['discrimination'], item['difficulty'], is_correct)]
+        theta, standard_error = AbilityEstimator.estimate(
+            responses, prior_mean=difficulty_prior(session.initial_difficulty)
+        )
+        next_difficulty = difficulty_label(theta)
+        
+        set_row = AdaptiveSetResult(
+            session_id=session.session_id,
+            set_number=session.current_set,
+            difficulty_level=session.current_difficulty,
+            next_difficulty=next_difficulty,
+            score=100.0 if is_correct else 0.0,
+            correctness_percentage=100.0 if is_correct else 0.0,
+            completion_time=completion_time,
+            average_time_per_question=completion_time,
+            is_fast_completion=bool(completion_time) and completion_time < 20,
+            total_questions=1,
+            correct_answers=1 if is_correct else 0,
+            question_id=question_id,
+            question_set_id=item['question_set_id'],
+            selected_option=selected_option,
+            marks_worth=item['marks_worth'],
+            discrimination=item['discrimination'],
+            difficulty=item['difficulty'],
+            ability_estimate=theta,
+            ability_se=standard_error
+        )
+        if next_difficulty != session.current_difficulty:
+            set_row.adjustment_reason = f"Ability estimate {theta:.2f} (SE {standard_error:.2f})"
+        db.session.add(set_row)
+        
+        session.ability_estimate = theta
+        session.ability_se = standard_error
+        session.current_difficulty = next_difficulty
+        session.current_set += 1
+        
+        administered = {row.question_id for row in previous_rows}
+        administered.add(question_id)
+        next_set = None
+        session.current_item_id = None
+        if session.current_set <= session.total_sets and standard_error > self.CAT_TARGET_SE:
+            next_set = self._generate_cat_item(session, bank, administered)
+        is_complete = next_set is None
+        
+        quiz_id = None
+        if is_complete:
+            quiz_id = self._finalize_cat_session(session, previous_rows + [set_row])
+        
+        result = {
+            'set_results': self._set_result_dict(set_row),
+            'session_progress': {
+                'current_set': session.current_set - 1,
+                'total_sets': session.total_sets,
+                'is_complete': is_complete,
+                'next_difficulty': next_difficulty,
+                'ability_estimate': round(theta, 3),
+                'ability_se': round(standard_error, 3)
+            },
+            'performance_summary': self._calculate_session_summary(session.session_id)
+        }
+        if is_complete:
+            result['quiz_id'] = quiz_id
+            result['final_proficiency_score'] = session.final_proficiency_score
+        else:
+            result['next_set'] = next_set
+        
+        IdempotencyStore.record(idempotency_key, session.student_id, result, quiz_id)
+        db.session.commit()
+        
+        return result
+    
+    def _finalize_cat_session(self, session, item_rows):
+        """Write the CAT session as one Quiz with its responses; committed by the caller"""
+        total_marks = sum(row.marks_worth for row in item_rows)
+        earned = sum(row.marks_worth for row in item_rows if row.correct_answers)
+        total_time = sum(row.completion_time or 0 for row in item_rows)
+        
+        quiz = Quiz(
+            student_id=session.student_id,
+            topic_id=session.topic_id,
+            question_set_id=item_rows[0].question_set_id,
+            total_marks=total_marks,
+            score=(earned / total_marks) * 100 if total_marks > 0 else 0,
+            date_taken=datetime.utcnow(),
+            time_taken=total_time
+        )
+        db.session.add(quiz)
+        db.session.flush()
+        
+        db.session.add_all([
+            QuizResponse(
+                quiz_id=quiz.quiz_id,
+                question_id=row.question_id,
+                selected_option=row.selected_option,
+                is_correct=bool(row.correct_answers),
+                time_taken=row.completion_time
+            )
+            for row in item_rows
+        ])
+        for row in item_rows:
+            row.quiz_id = quiz.quiz_id
+        
+        TopicProgressService.record_attempt(
+            session.student_id, session.topic_id, quiz.score, quiz.total_marks,
+            quiz.time_taken, quiz.date_taken
+        )
+        self._update_performance_trends(session.student_id, session.topic_id, quiz.score)
+        
+        session.final_proficiency_score = ability_to_proficiency(session.ability_estimate)
+        session.is_completed = True
+        session.end_time = datetime.utcnow()
+        
+        return quiz.quiz_id
     
     def _get_adaptive_difficulty(self, student_id, topic_id):
         """Determine appropriate difficulty level based on performance"""
         try:
-            # Get recent performance with optimized query
-            recent_quizzes = Quiz.query.filter_by(
+            # Proficiency is maintained incrementally by the trend store
+            trend = PerformanceTrend.query.filter_by(
                 student_id=student_id,
                 topic_id=topic_id
-            ).order_by(Quiz.date_taken.desc()).limit(3).all()
+            ).first()
             
-            if not recent_quizzes:
+            if not trend:
                 return "Easy"  # Start with easy for new students
             
-            # Calculate average performance
-            avg_score = sum(quiz.score for quiz in recent_quizzes) / len(recent_quizzes)
+            proficiency = trend.proficiency_score or 0
             
             # Simple difficulty mapping
-            if avg_score >= 80:
+            if proficiency >= 80:
                 return "Hard"
-            elif avg_score >= 60:
+            elif proficiency >= 60:
                 return "Medium"
             else:
                 return "Easy"
                 
         except Exception as e:
-            print(f"Error determining difficulty: {e}")
+            logger.warning(f"Error determining difficulty: {e}")
             return "Medium"
     
     def _calculate_next_difficulty(self, current_difficulty, correctness_percentage, is_fast_completion):
@@ -388,59 +682,63 @@ class UnifiedQuizEngine:
             return current_difficulty
     
     def _update_performance_trends(self, student_id, topic_id, score):
-        """Optimized performance trend updates"""
+        """Append the score to the trend store; committed with the submission"""
         try:
-            trend = PerformanceTrend.query.filter_by(
-                student_id=student_id,
-                topic_id=topic_id
-            ).first()
-            
-            if not trend:
-                trend = PerformanceTrend(
-                    student_id=student_id,
-                    topic_id=topic_id,
-                    proficiency_score=score,
-                    trend_graph_data=json.dumps([score])
-                )
-                db.session.add(trend)
-            else:
-                # Update existing trend with optimized calculation
-                trend_data = json.loads(trend.trend_graph_data) if trend.trend_graph_data else []
-                trend_data.append(score)
-                trend_data = trend_data[-10:]  # Keep only last 10 scores
-                
-                # Simple weighted average
-                trend.proficiency_score = sum(trend_data) / len(trend_data)
-                trend.trend_graph_data = json.dumps(trend_data)
-                trend.last_updated = datetime.utcnow()
-            
-            db.session.commit()
-            
+            TrendStore.record_score(student_id, topic_id, score)
         except Exception as e:
-            print(f"Error updating performance trends: {e}")
+            logger.warning(f"Error updating performance trends: {e}")
     
-    def _calculate_session_summary(self, session_data):
-        """Calculate session performance summary"""
-        sets_completed = session_data.get('sets_completed', [])
-        if not sets_completed:
-            return {}
-        
-        total_score = sum(s['score'] for s in sets_completed)
-        avg_score = total_score / len(sets_completed)
+    def _calculate_session_summary(self, session_id):
+        """Calculate session performance summary with a single aggregate query"""
+        summary = db.session.query(
+            func.count(AdaptiveSetResult.id).label('sets_completed'),
+            func.avg(AdaptiveSetResult.score).label('avg_score'),
+            func.sum(AdaptiveSetResult.completion_time).label('total_time'),
+            func.avg(AdaptiveSetResult.completion_time).label('avg_time'),
+            func.sum(case(
+                (AdaptiveSetResult.next_difficulty != AdaptiveSetResult.difficulty_level, 1),
+                else_=0
+            )).label('difficulty_changes')
+        ).filter(AdaptiveSetResult.session_id == session_id).one()
         
-        total_time = sum(s['completion_time'] for s in sets_completed)
-        avg_time_per_set = total_time / len(sets_completed)
+        if not summary.sets_completed:
+            return {}
         
         return {
-            'total_sets_completed': len(sets_completed),
-            'average_score': round(avg_score, 2),
-            'total_time_spent': total_time,
-            'average_time_per_set': round(avg_time_per_set, 2),
-            'difficulty_changes': len(session_data.get('difficulty_adjustments', []))
+            'total_sets_completed': summary.sets_completed,
+            'average_score': round(summary.avg_score or 0, 2),
+            'total_time_spent': summary.total_time or 0,
+            'average_time_per_set': round(summary.avg_time or 0, 2),
+            'difficulty_changes': summary.difficulty_changes or 0
         }
     
+    def _set_result_dict(self, row):
+        """Per-set result payload returned to callers"""
+        result = {
+            'set_number': row.set_number,
+            'difficulty_level': row.difficulty_level,
+            'quiz_id': row.quiz_id,
+            'score': row.score,
+            'correctness_percentage': row.correctness_percentage,
+            'completion_time': row.completion_time,
+            'average_time_per_question': row.average_time_per_question,
+            'is_fast_completion': row.is_fast_completion,
+            'total_questions': row.total_questions,
+            'correct_answers': row.correct_answers
+        }
+        if row.question_id:
+            result.update({
+                'question_id': row.question_id,
+                'selected_option': row.selected_option,
+                'is_correct': bool(row.correct_answers),
+                'ability_estimate': row.ability_estimate,
+                'ability_se': row.ability_se
+            })
+        return result
+    
     def clear_cache(self):
         """Clear the internal caches"""
         self._get_question_set.cache_clear()
         self._get_questions_for_set.cache_clear()
-        self._question_cache.clear()
\ No newline at end of file
+        self._question_cache.clear()
+        cache.clear_prefix("item_bank:")
\ No newline at end of file
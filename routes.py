@@ -11,6 +11,16 @@ from backend.unified_quiz_engine import UnifiedQuizEngine
 from backend.database_optimizations import DatabaseOptimizer
 from backend.performance_cache import cache
 from backend.topic_prediction_service import topic_prediction_service
+from backend.topic_progress import TopicProgressService
+from backend.trend_store import TrendStore
+from backend.idempotency import IdempotencyStore, CONFLICT_ERRORS
+from backend.db_pool import pool_stats
+from backend.read_routing import read_replica
+from backend.identity import Identity
+from backend.query_budget import QueryBudget
+from backend.metrics import scrape_allowed, metrics_response
+from backend.request_profiler import RequestProfiler
+from backend.content_jobs import BulkContentService, ContentPackageError, parse_package
 import json
 import uuid
 import os
@@ -132,6 +142,7 @@ def signup():
 @login_required
 def logout():
     """Logout user"""
+    Identity.invalidate(current_user.id)
     logout_user()
     flash('You have been logged out successfully', 'info')
     return redirect(url_for('landing'))
@@ -231,6 +242,57 @@ def admin_dashboard():
                            analytics=analytics_data)
 
 
+@app.route('/admin/pool_stats')
+@login_required
+def admin_pool_stats():
+    """Connection pool usage per engine: checked out, overflow and checkout wait times"""
+    if current_user.role != 'admin':
+        return jsonify({'error': 'Access denied'}), 403
+
+    return jsonify(pool_stats(db.engines))
+
+
+@app.route('/admin/profiles')
+@app.route('/admin/profiles/<int:trace_id>')
+@login_required
+def admin_profiles(trace_id=None):
+    """Recent sampled and slow request traces, newest first"""
+    if current_user.role != 'admin':
+        flash('Access denied', 'error')
+        return redirect(url_for('landing'))
+
+    selected = RequestProfiler.get_trace(trace_id) if trace_id else None
+    if trace_id and not selected:
+        flash('Trace is no longer in the buffer', 'error')
+
+    return render_template('admin_profiles.html',
+                           traces=list(reversed(RequestProfiler.traces)),
+                           selected=selected,
+                           settings=RequestProfiler.settings)
+
+
+@app.route('/metrics')
+def metrics():
+    """Prometheus text exposition of this process's request, DB, cache and AI metrics"""
+    if not scrape_allowed():
+        return jsonify({'error': 'Access denied'}), 403
+
+    return metrics_response()
+
+
+@app.route('/admin/query_stats')
+@login_required
+def admin_query_stats():
+    """Per-route SQL statement counts, DB time and N+1 suspects since startup"""
+    if current_user.role != 'admin':
+        flash('Access denied', 'error')
+        return redirect(url_for('landing'))
+
+    return render_template('admin_query_stats.html',
+                           routes=QueryBudget.route_stats(),
+                           settings=QueryBudget.settings)
+
+
 @app.route('/quiz/start/<topic_id>')
 @app.route('/quiz/start/<topic_id>/<difficulty>')
 @login_required
@@ -240,7 +302,6 @@ def start_quiz(topic_id, difficulty=None):
         flash('Access denied', 'error')
         return redirect(url_for('landing'))
 
-    learner = current_user.student_profile
     topic = Topic.query.filter_by(topic_id=topic_id).first()
 
     if not topic:
@@ -335,29 +396,43 @@ def submit_quiz():
 
     quiz_data = session.get('current_quiz')
     if not quiz_data:
+        # A retried POST arriving after the first one cleared the session
+        submission_key = request.form.get('submission_key')
+        replay = IdempotencyStore.lookup(
+            IdempotencyStore.quiz_key(submission_key),
+            current_user.student_id) if submission_key else None
+        if replay:
+            return render_template('quiz_result.html',
+                                   results=replay,
+                                   ai_feedback=replay.get('ai_feedback'))
         flash('No active quiz found', 'error')
         return redirect(url_for('learner_dashboard'))
 
     # Process quiz submission
     answers = request.form.to_dict()
-    learner = current_user.student_profile
-
-    print(f"Form data received: {answers}")
+    app.logger.debug("Quiz form received",
+                     extra={'fields': {'quiz_id': quiz_data['quiz_id'],
+                                       'answers': answers}})
 
     # Calculate results and store in database
-    results = process_quiz_submission_direct(learner.student_id, quiz_data,
-                                             answers)
-
-    # Generate AI feedback (only if submission was successful)
-    ai_feedback = None
-    if results and not results.get('error'):
-        ai_feedback = nura_ai.generate_quiz_feedback(learner.student_id,
-                                                     results)
-    else:
-        ai_feedback = {
-            "feedback": "Unable to generate feedback due to submission error.",
-            "recommendations": []
-        }
+    results = process_quiz_submission_direct(current_user.student_id,
+                                             quiz_data, answers)
+
+    # Generate AI feedback (only if submission was successful); replays reuse the stored copy
+    ai_feedback = results.get('ai_feedback') if results else None
+    if not ai_feedback:
+        if results and not results.get('error'):
+            ai_feedback = nura_ai.generate_quiz_feedback(
+                current_user.student_id, results)
+            IdempotencyStore.amend(
+                IdempotencyStore.quiz_key(quiz_data['quiz_id']),
+                ai_feedback=ai_feedback)
+        else:
+            ai_feedback = {
+                "feedback":
+                "Unable to generate feedback due to submission error.",
+                "recommendations": []
+            }
 
     # Clear session
     session.pop('current_quiz', None)
@@ -371,7 +446,7 @@ def submit_quiz():
 @login_required
 def get_performance_api(student_id):
     """API endpoint to get learner performance data"""
-    if current_user.role != 'teacher' and current_user.student_profile.student_id != student_id:
+    if current_user.role != 'teacher' and current_user.student_id != student_id:
         return jsonify({'error': 'Access denied'}), 403
 
     performance_data = get_learner_performance_data(student_id)
@@ -380,9 +455,15 @@ def get_performance_api(student_id):
 
 def process_quiz_submission_direct(student_id, quiz_data, answers):
     """Process quiz submission directly without relying on quiz_engine"""
+    idempotency_key = IdempotencyStore.quiz_key(quiz_data['quiz_id'])
+    replay = IdempotencyStore.lookup(idempotency_key, student_id)
+    if replay is not None:
+        return replay
+
     try:
-        # Create quiz record first
-        quiz = Quiz(student_id=student_id,
+        # Create quiz record first, keyed by the id issued with the quiz page
+        quiz = Quiz(quiz_id=quiz_data['quiz_id'],
+                    student_id=student_id,
                     topic_id=quiz_data['topic_id'],
                     question_set_id=quiz_data['question_set_id'],
                     total_marks=quiz_data['total_marks'])
@@ -402,9 +483,10 @@ def process_quiz_submission_direct(student_id, quiz_data, answers):
             selected_option = answers.get(f'question_{question_id}', '')
             is_correct = selected_option == question.correct_option
 
-            print(
-                f"Question {question_id}: Selected='{selected_option}', Correct='{question.correct_option}', Match={is_correct}"
-            )
+            app.logger.debug("Answer graded",
+                             extra={'fields': {'question_id': question_id,
+                                               'selected_option': selected_option,
+                                               'is_correct': is_correct}})
 
             if is_correct:
                 total_score += question.marks_worth
@@ -425,9 +507,10 @@ def process_quiz_submission_direct(student_id, quiz_data, answers):
                       quiz.total_marks) * 100 if quiz.total_marks > 0 else 0
         quiz.date_taken = datetime.utcnow()
 
-        db.session.commit()
-
-        # Update performance trends
+        # Progress read model and trends are written in the same transaction
+        TopicProgressService.record_attempt(student_id, quiz.topic_id,
+                                            quiz.score, quiz.total_marks,
+                                            quiz.time_taken, quiz.date_taken)
         quiz_engine._update_performance_trends(student_id, quiz.topic_id,
                                                quiz.score)
 
@@ -443,12 +526,20 @@ def process_quiz_submission_direct(student_id, quiz_data, answers):
             'success_threshold': 70
         }
 
+        IdempotencyStore.record(idempotency_key, student_id, results,
+                                quiz.quiz_id)
+        db.session.commit()
+
         return results
 
     except Exception as e:
-        print(f"Error processing quiz submission: {e}")
-        import traceback
-        traceback.print_exc()
+        if isinstance(e, CONFLICT_ERRORS):
+            # A concurrent duplicate of this submission won the race
+            replay = IdempotencyStore.resolve_conflict(idempotency_key, student_id)
+            if replay is not None:
+                return replay
+        app.logger.exception("Error processing quiz submission",
+                             extra={'fields': {'quiz_id': quiz_data.get('quiz_id')}})
         db.session.rollback()
 
         # Return basic error result structure to prevent template errors
@@ -501,7 +592,7 @@ def get_learner_performance_data(student_id):
         'trends': [{
             'topic': t.topic.name,
             'score': t.proficiency_score,
-            'data': t.trend_graph_data
+            'data': TrendStore.recent_scores(t)
         } for t in trends]
     }
 
@@ -576,6 +667,7 @@ def get_learners_traffic_light_data():
     return traffic_light_data
 
 
+@read_replica
 def get_admin_analytics():
     """Get comprehensive analytics data for admin dashboard"""
     from datetime import datetime, timedelta
@@ -623,7 +715,7 @@ def get_admin_analytics():
         func.avg(Quiz.score).label('avg_score'),
         func.count(Quiz.id).label('quiz_count')
     ).join(User, Student.user_id == User.id)\
-     .join(Quiz, Student.student_id == Quiz.student_id)\
+     .join(Quiz, Student.id == Quiz.student_ref)\
      .group_by(Student.student_id, User.full_name)\
      .order_by(desc('avg_score'))\
      .limit(10).all()
@@ -635,7 +727,7 @@ def get_admin_analytics():
         func.avg(Quiz.score).label('avg_score'),
         func.count(Quiz.id).label('quiz_count')
     ).join(User, Student.user_id == User.id)\
-     .join(Quiz, Student.student_id == Quiz.student_id)\
+     .join(Quiz, Student.id == Quiz.student_ref)\
      .group_by(Student.student_id, User.full_name)\
      .having(func.avg(Quiz.score) < 60)\
      .order_by('avg_score')\
@@ -646,8 +738,8 @@ def get_admin_analytics():
         Subject.name,
         func.avg(Quiz.score).label('avg_score'),
         func.count(Quiz.id).label('quiz_count')
-    ).join(Topic, Subject.subject_id == Topic.subject_id)\
-     .join(Quiz, Topic.topic_id == Quiz.topic_id)\
+    ).join(Topic, Subject.id == Topic.subject_ref)\
+     .join(Quiz, Topic.id == Quiz.topic_ref)\
      .group_by(Subject.name)\
      .order_by(desc('avg_score')).all()
 
@@ -656,8 +748,8 @@ def get_admin_analytics():
         Topic.name,
         Subject.name.label('subject_name'),
         func.count(Quiz.id).label('quiz_count')
-    ).join(Subject, Topic.subject_id == Subject.subject_id)\
-     .join(Quiz, Topic.topic_id == Quiz.topic_id)\
+    ).join(Subject, Topic.subject_ref == Subject.id)\
+     .join(Quiz, Topic.id == Quiz.topic_ref)\
      .group_by(Topic.name, Subject.name)\
      .order_by(desc('quiz_count'))\
      .limit(10).all()
@@ -753,8 +845,7 @@ def api_predict_topics(student_id):
     try:
         # Ensure user can only access their own data or is a educator/admin
         if current_user.role == 'student':
-            learner = Student.query.filter_by(user_id=current_user.id).first()
-            if not learner or learner.student_id != student_id:
+            if current_user.student_id != student_id:
                 return jsonify({'error': 'Unauthorized'}), 403
         elif current_user.role not in ['educator', 'admin']:
             return jsonify({'error': 'Unauthorized'}), 403
@@ -774,8 +865,7 @@ def api_performance_analysis(student_id):
     try:
         # Ensure user can only access their own data or is a educator/admin
         if current_user.role == 'student':
-            learner = Student.query.filter_by(user_id=current_user.id).first()
-            if not learner or learner.student_id != student_id:
+            if current_user.student_id != student_id:
                 return jsonify({'error': 'Unauthorized'}), 403
         elif current_user.role not in ['educator', 'admin']:
             return jsonify({'error': 'Unauthorized'}), 403
@@ -797,23 +887,22 @@ def topic_predictions():
 
     try:
         # Get learner data
-        learner = Student.query.filter_by(user_id=current_user.id).first()
-        if not learner:
+        student_id = current_user.student_id
+        if not student_id:
             flash('Student profile not found', 'error')
             return redirect(url_for('learner_dashboard'))
 
         # Get instant topic predictions using fast service
         predictions = fast_prediction_service.get_topic_predictions(
-            learner.student_id)
+            student_id)
 
         # Get instant performance analysis using fast service
         analysis = fast_prediction_service.get_performance_analysis(
-            learner.student_id)
+            student_id)
 
         return render_template('topic_predictions.html',
                                predictions=predictions,
-                               analysis=analysis,
-                               learner=learner)
+                               analysis=analysis)
 
     except Exception as e:
         flash('Unable to load topic predictions', 'error')
@@ -852,8 +941,8 @@ def subject_selection():
 
     try:
         # Get learner data
-        learner = Student.query.filter_by(user_id=current_user.id).first()
-        if not learner:
+        student_id = current_user.student_id
+        if not student_id:
             flash('Student profile not found', 'error')
             return redirect(url_for('learner_dashboard'))
 
@@ -862,7 +951,9 @@ def subject_selection():
         subjects = Subject.query.filter(
             ~Subject.name.in_(hidden_subjects)).all()
 
-        # Calculate subject progress
+        # Calculate subject progress from the progress read model
+        progress_by_topic = TopicProgressService.get_student_progress(
+            student_id)
         subject_progress = {}
         for subject in subjects:
             if subject.topics:
@@ -870,16 +961,9 @@ def subject_selection():
                 completed_topics = 0
 
                 for topic in subject.topics:
-                    # Check if learner has completed quizzes for this topic
-                    quizzes = Quiz.query.filter_by(
-                        student_id=learner.student_id,
-                        topic_id=topic.topic_id).all()
-
-                    if quizzes:
-                        avg_score = sum(quiz.score
-                                        for quiz in quizzes) / len(quizzes)
-                        if avg_score >= 80:  # Consider 80% as completed
-                            completed_topics += 1
+                    progress = progress_by_topic.get(topic.topic_id)
+                    if progress and progress.is_mastered:
+                        completed_topics += 1
 
                 subject_progress[subject.subject_id] = round(
                     (completed_topics / total_topics) *
@@ -903,8 +987,8 @@ def topic_selection(subject_id):
 
     try:
         # Get learner data
-        learner = Student.query.filter_by(user_id=current_user.id).first()
-        if not learner:
+        student_id = current_user.student_id
+        if not student_id:
             flash('Student profile not found', 'error')
             return redirect(url_for('learner_dashboard'))
 
@@ -917,27 +1001,20 @@ def topic_selection(subject_id):
         topics = Topic.query.filter_by(subject_id=subject_id).all()
 
         # Calculate topic progress (simplified - no level tracking)
+        progress_by_topic = TopicProgressService.get_student_progress(
+            student_id, subject_id=subject_id)
         topic_progress = {}
         for topic in topics:
-            # Get all quizzes for this topic
-            quizzes = Quiz.query.filter_by(student_id=learner.student_id,
-                                           topic_id=topic.topic_id).all()
-
-            if quizzes:
-                # Calculate overall progress
-                total_score = sum(quiz.score for quiz in quizzes)
-                total_possible = sum(quiz.total_marks for quiz in quizzes)
-                overall_progress = round((total_score / total_possible) *
-                                         100, 1) if total_possible > 0 else 0
+            progress = progress_by_topic.get(topic.topic_id)
 
+            if progress and progress.attempts:
                 topic_progress[topic.topic_id] = {
                     'overall':
-                    overall_progress,
+                    TopicProgressService.overall_progress(progress),
                     'attempts':
-                    len(quizzes),
+                    progress.attempts,
                     'best_score':
-                    round(max(quiz.score
-                              for quiz in quizzes), 1) if quizzes else 0
+                    round(progress.best_score, 1)
                 }
 
         return render_template('topic_selection.html',
@@ -947,9 +1024,8 @@ def topic_selection(subject_id):
 
     except Exception as e:
         # Log the specific error for debugging
-        print(f"Error in topic_selection: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        app.logger.exception("Error in topic_selection",
+                             extra={'fields': {'subject_id': subject_id}})
         flash('Unable to load topics', 'error')
         return redirect(url_for('subject_selection'))
 
@@ -963,8 +1039,8 @@ def learning_roadmap():
 
     try:
         # Get learner data
-        learner = Student.query.filter_by(user_id=current_user.id).first()
-        if not learner:
+        student_id = current_user.student_id
+        if not student_id:
             flash('Student profile not found', 'error')
             return redirect(url_for('learner_dashboard'))
 
@@ -974,6 +1050,11 @@ def learning_roadmap():
             ~Subject.name.in_(hidden_subjects)).all()
         roadmap_data = []
 
+        progress_by_topic = TopicProgressService.get_student_progress(
+            student_id)
+        proficiency_by_topic = TrendStore.get_proficiency_map(
+            student_id)
+
         total_progress = 0
         completed_topics = 0
         total_topics = 0
@@ -988,28 +1069,22 @@ def learning_roadmap():
             for topic in subject.topics:
                 total_topics += 1
 
-                # Get quizzes for this topic
-                quizzes = Quiz.query.filter_by(student_id=learner.student_id,
-                                               topic_id=topic.topic_id).all()
-
-                # Determine topic status
-                if quizzes:
-                    avg_score = sum(quiz.score
-                                    for quiz in quizzes) / len(quizzes)
-                    total_possible = sum(quiz.total_marks for quiz in quizzes)
-                    if total_possible > 0:
-                        progress = round(
-                            (sum(quiz.score
-                                 for quiz in quizzes) / total_possible) * 100,
-                            1)
-                    else:
-                        progress = 0
+                topic_record = progress_by_topic.get(topic.topic_id)
+
+                # Mastery comes from the progress read model, as on the dashboard and
+                # subject pages; the proficiency model only ranks unmastered topics
+                if topic_record and topic_record.attempts:
+                    proficiency = proficiency_by_topic.get(
+                        topic.topic_id,
+                        TopicProgressService.average_score(topic_record))
+                    progress = TopicProgressService.overall_progress(
+                        topic_record)
 
-                    if avg_score >= 80:
+                    if topic_record.is_mastered:
                         status = 'completed'
                         subject_completed += 1
                         completed_topics += 1
-                    elif avg_score >= 60:
+                    elif proficiency >= 60:
                         status = 'current'
                     else:
                         status = 'unlocked'
@@ -1118,34 +1193,37 @@ def ai_support():
 
     try:
         # Get learner data
-        learner = Student.query.filter_by(user_id=current_user.id).first()
-        if not learner:
+        student_id = current_user.student_id
+        if not student_id:
             flash('Student profile not found', 'error')
             return redirect(url_for('learner_dashboard'))
 
         # Get AI feedback using fast service
-        ai_report = fast_ai.generate_learner_feedback(learner.student_id)
+        ai_report = fast_ai.generate_learner_feedback(student_id)
 
-        # Get statistics
-        quizzes = Quiz.query.filter_by(student_id=learner.student_id).all()
+        # Get statistics from the progress read model
+        progress_rows = list(
+            TopicProgressService.get_student_progress(
+                student_id).values())
 
         statistics = None
-        if quizzes:
+        if progress_rows:
             # Calculate basic statistics
-            total_score = sum(quiz.score for quiz in quizzes)
-            total_possible = sum(quiz.total_marks for quiz in quizzes)
+            total_score = sum(p.score_sum for p in progress_rows)
+            total_possible = sum(p.total_marks_sum for p in progress_rows)
             overall_accuracy = round((total_score / total_possible) *
                                      100, 1) if total_possible > 0 else 0
 
             # Calculate average time per question
-            total_time = sum(quiz.time_taken for quiz in quizzes
-                             if quiz.time_taken)
-            total_questions = len(quizzes)
+            total_time = sum(p.time_sum for p in progress_rows)
+            total_questions = sum(p.attempts for p in progress_rows)
             avg_time_per_question = round(total_time / total_questions,
                                           1) if total_questions > 0 else 0
 
             # Performance timeline (last 10 quizzes)
-            recent_quizzes = sorted(quizzes, key=lambda x: x.date_taken)[-10:]
+            recent_quizzes = Quiz.query.filter_by(
+                student_id=student_id).order_by(
+                    Quiz.date_taken.desc()).limit(10).all()[::-1]
             timeline_labels = [
                 f"Quiz {i+1}" for i in range(len(recent_quizzes))
             ]
@@ -1156,12 +1234,12 @@ def ai_support():
 
             # Topic accuracy
             topic_accuracy = {}
-            for quiz in quizzes:
-                topic_name = quiz.topic.name
+            for p in progress_rows:
+                topic_name = p.topic.name
                 if topic_name not in topic_accuracy:
                     topic_accuracy[topic_name] = {'score': 0, 'total': 0}
-                topic_accuracy[topic_name]['score'] += quiz.score
-                topic_accuracy[topic_name]['total'] += quiz.total_marks
+                topic_accuracy[topic_name]['score'] += p.score_sum
+                topic_accuracy[topic_name]['total'] += p.total_marks_sum
 
             topic_labels = list(topic_accuracy.keys())
             topic_data = [
@@ -1200,6 +1278,7 @@ def ai_support():
 
 @app.route('/quiz_history')
 @login_required
+@read_replica
 def quiz_history():
     """Quiz history page"""
     if current_user.role != 'student':
@@ -1207,13 +1286,13 @@ def quiz_history():
 
     try:
         # Get learner data
-        learner = Student.query.filter_by(user_id=current_user.id).first()
-        if not learner:
+        student_id = current_user.student_id
+        if not student_id:
             flash('Student profile not found', 'error')
             return redirect(url_for('learner_dashboard'))
 
         # Get quiz history
-        quizzes = Quiz.query.filter_by(student_id=learner.student_id).order_by(
+        quizzes = Quiz.query.filter_by(student_id=student_id).order_by(
             Quiz.date_taken.desc()).all()
 
         return render_template('quiz_history.html', quizzes=quizzes)
@@ -1229,8 +1308,8 @@ def api_quiz_details(quiz_id):
     """API endpoint to get detailed quiz information"""
     try:
         # Get learner data
-        learner = Student.query.filter_by(user_id=current_user.id).first()
-        if not learner:
+        student_id = current_user.student_id
+        if not student_id:
             return jsonify({
                 'success': False,
                 'error': 'Student not found'
@@ -1238,7 +1317,7 @@ def api_quiz_details(quiz_id):
 
         # Get quiz
         quiz = Quiz.query.filter_by(quiz_id=quiz_id,
-                                    student_id=learner.student_id).first()
+                                    student_id=student_id).first()
         if not quiz:
             return jsonify({'success': False, 'error': 'Quiz not found'}), 404
 
@@ -1432,8 +1511,68 @@ def create_content():
         }), 500
 
 
+bulk_content = BulkContentService(UPLOAD_FOLDER, '/static/images/quiz/educator_uploads')
+
+
+@app.route('/api/bulk-content', methods=['POST'])
+@login_required
+def bulk_create_content():
+    """
+    Create a subject's topics and questions from one package: a JSON body, or
+    multipart with the JSON in 'package' and images referenced by imageKey.
+    Returns a job id; images are attached in the background.
+    """
+    if current_user.role != 'teacher':
+        return jsonify({'success': False, 'message': 'Access denied'}), 403
+
+    if request.is_json:
+        # get_json() would raise BadRequest and answer with an HTML error page
+        payload = request.get_json(silent=True)
+    else:
+        try:
+            payload = json.loads(request.form.get('package') or 'null')
+        except ValueError:
+            payload = None
+    if payload is None:
+        return jsonify({'success': False, 'message': 'Package is not valid JSON'}), 400
+
+    try:
+        package = parse_package(
+            payload, request.files, ALLOWED_EXTENSIONS, MAX_FILE_SIZE, bulk_content.max_questions
+        )
+    except ContentPackageError as e:
+        return jsonify({'success': False, 'message': 'Package failed validation', 'errors': e.errors}), 400
+
+    try:
+        job = bulk_content.submit(package, request.files, current_user.user_id)
+    except Exception as e:
+        db.session.rollback()
+        app.logger.exception("Error creating bulk content")
+        return jsonify({'success': False, 'message': f'Error creating content: {str(e)}'}), 500
+
+    return jsonify({
+        'success': True,
+        'job': job,
+        'status_url': url_for('content_job_status', job_id=job['job_id'])
+    }), 202
+
+
+@app.route('/api/content-jobs/<job_id>')
+@login_required
+def content_job_status(job_id):
+    """Progress of a bulk content job started by the current teacher"""
+    if current_user.role != 'teacher':
+        return jsonify({'success': False, 'message': 'Access denied'}), 403
+
+    job = bulk_content.jobs.get(job_id)
+    if not job or job['created_by'] != current_user.user_id:
+        return jsonify({'success': False, 'message': 'Job not found'}), 404
+    return jsonify({'success': True, 'job': job})
+
+
 @app.route('/api/content-library')
 @login_required
+@read_replica
 def content_library():
     """API endpoint to get educator's content library"""
     if current_user.role != 'teacher':
@@ -0,0 +1,54 @@
+"""
+Fill the integer *_ref foreign key columns on existing rows
+
+Usage: python -m scripts.backfill_surrogate_keys [--batch-size N] [--check]
+"""
+
+import argparse
+from app import app, db
+from backend.surrogate_keys import backfill, missing_counts
+
+
+def backfill_surrogate_keys(batch_size=5000, pause_seconds=0.0):
+    """Backfill every surrogate column in primary key ranges"""
+    with app.app_context():
+        try:
+            print("🔄 Backfilling integer surrogate keys...")
+
+            updated = backfill(
+                batch_size=batch_size,
+                pause_seconds=pause_seconds,
+                progress=lambda column, rows: print(f"   {column}: {rows} rows")
+            )
+
+            remaining = {column: count for column, count in missing_counts().items() if count}
+            if remaining:
+                # Orphans whose parent UUID no longer exists stay NULL
+                print(f"⚠️ Still NULL: {remaining}")
+            print(f"✅ Backfilled {sum(updated.values())} values")
+            return updated
+
+        except Exception as e:
+            db.session.rollback()
+            print(f"❌ Error backfilling surrogate keys: {str(e)}")
+            return None
+
+
+def check_surrogate_keys():
+    """Report rows still waiting for a surrogate"""
+    with app.app_context():
+        for column, count in missing_counts().items():
+            print(f"   {column}: {count} NULL")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backfill quizzes/quiz_responses/questions/topics *_ref columns")
+    parser.add_argument('--batch-size', type=int, default=5000, help="Primary key range per UPDATE")
+    parser.add_argument('--pause-seconds', type=float, default=0.0, help="Sleep between batches")
+    parser.add_argument('--check', action='store_true', help="Only report NULL counts")
+    args = parser.parse_args()
+
+    if args.check:
+        check_surrogate_keys()
+    else:
+        backfill_surrogate_keys(batch_size=args.batch_size, pause_seconds=args.pause_seconds)
@@ -0,0 +1,88 @@
+"""
+Benchmark join-heavy analytics on UUID string keys against the integer
+*_ref surrogate keys, on whatever data the configured database holds
+
+Usage: python -m scripts.benchmark_fk_joins [--repeat 20]
+"""
+
+import argparse
+import statistics
+import time
+from sqlalchemy import func, desc
+from app import app, db
+from backend.models import Student, Subject, Topic, Quiz, QuizResponse
+
+
+def _learner_averages(integer_keys):
+    join = Student.id == Quiz.student_ref if integer_keys else Student.student_id == Quiz.student_id
+    return db.session.query(
+        Student.student_id,
+        func.avg(Quiz.score).label('avg_score'),
+        func.count(Quiz.id).label('quiz_count')
+    ).join(Quiz, join).group_by(Student.student_id).order_by(desc('avg_score')).limit(10)
+
+
+def _subject_performance(integer_keys):
+    query = db.session.query(Subject.name, func.avg(Quiz.score).label('avg_score'))
+    if integer_keys:
+        query = query.join(Topic, Subject.id == Topic.subject_ref).join(Quiz, Topic.id == Quiz.topic_ref)
+    else:
+        query = query.join(Topic, Subject.subject_id == Topic.subject_id).join(Quiz, Topic.topic_id == Quiz.topic_id)
+    return query.group_by(Subject.name)
+
+
+def _topic_correctness(integer_keys):
+    query = db.session.query(Topic.name, func.avg(QuizResponse.is_correct).label('correct_rate'))
+    if integer_keys:
+        query = query.join(Quiz, QuizResponse.quiz_ref == Quiz.id).join(Topic, Quiz.topic_ref == Topic.id)
+    else:
+        query = query.join(Quiz, QuizResponse.quiz_id == Quiz.quiz_id).join(Topic, Quiz.topic_id == Topic.topic_id)
+    return query.group_by(Topic.name)
+
+
+BENCHMARKS = {
+    'learner averages (students x quizzes)': _learner_averages,
+    'subject performance (subjects x topics x quizzes)': _subject_performance,
+    'topic correctness (responses x quizzes x topics)': _topic_correctness
+}
+
+
+def _median_ms(build_query, integer_keys, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        build_query(integer_keys).all()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def benchmark_fk_joins(repeat=20):
+    """Print median latency of each analytics query with both key types"""
+    with app.app_context():
+        quizzes = Quiz.query.count()
+        responses = QuizResponse.query.count()
+        print(f"🔍 Benchmarking on {quizzes} quizzes and {responses} responses ({repeat} runs each)")
+        if quizzes < 10000:
+            print("⚠️ Small dataset: seed more data for meaningful numbers")
+
+        results = {}
+        for name, build_query in BENCHMARKS.items():
+            # Warm both plans and caches before timing
+            build_query(False).all()
+            build_query(True).all()
+            uuid_ms = _median_ms(build_query, False, repeat)
+            integer_ms = _median_ms(build_query, True, repeat)
+            results[name] = (uuid_ms, integer_ms)
+            speedup = uuid_ms / integer_ms if integer_ms else float('inf')
+            print(f"   {name}: UUID {uuid_ms:.2f} ms, integer {integer_ms:.2f} ms ({speedup:.2f}x)")
+
+        print("✅ Benchmark complete")
+        return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare UUID and integer foreign key joins")
+    parser.add_argument('--repeat', type=int, default=20, help="Timed runs per query and key type")
+    args = parser.parse_args()
+
+    benchmark_fk_joins(repeat=args.repeat)
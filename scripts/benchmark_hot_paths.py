@@ -0,0 +1,315 @@
+"""
+Micro-benchmarks for backend hot paths, compared against stored baselines
+
+By default every run builds the same fixture: a fresh SQLite database,
+migrated and filled by scripts.generate_synthetic_data with a fixed seed and
+anchor date. The suite runs --runs times, interleaving the benchmarks, and
+each run times every benchmark for a number of rounds after warm-up. The
+fastest run's median is compared with scripts/benchmark_baselines.json:
+other load on the machine only ever slows a run down, so the best run is the
+most repeatable figure. A benchmark fails when it is slower by more than
+--threshold percent, or by more than NOISE_FACTOR times the run-to-run spread
+either the baseline or this run showed, whichever is larger. Writes made by
+a round are rolled back, so rounds stay independent.
+
+Baselines are machine-specific: refresh them with --save-baseline on the
+machine that runs the comparison, preferably with more runs (--runs 5).
+
+Usage: python -m scripts.benchmark_hot_paths [--filter cache] [--rounds 30] [--runs 3]
+                                             [--threshold 20] [--save-baseline]
+                                             [--scale small] [--use-configured-db]
+"""
+
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmark_baselines.json')
+FIXTURE_SEED = 7
+FIXTURE_ANCHOR = datetime(2025, 1, 1)
+CACHE_THREADS = 8
+CACHE_OPS_PER_THREAD = 2000
+KEY_BUILDS_PER_ROUND = 1000
+NOISE_FACTOR = 2.0  # Slowdowns within this multiple of the observed run-to-run spread are noise
+
+
+class Benchmark:
+    """One timed operation; setup and teardown run around each round but are not timed"""
+
+    def __init__(self, name, run, setup=None, teardown=None, rounds=None):
+        self.name = name
+        self.run = run
+        self.setup = setup
+        self.teardown = teardown
+        self.rounds = rounds
+
+    def measure(self, rounds, warmup):
+        timings = []
+        for index in range(warmup + (self.rounds or rounds)):
+            state = self.setup() if self.setup else None
+            started = time.perf_counter()
+            self.run(state)
+            elapsed = time.perf_counter() - started
+            if self.teardown:
+                self.teardown(state)
+            if index >= warmup:
+                timings.append(elapsed * 1000)
+        return timings
+
+
+class Fixture:
+    """Learner, topic and services shared by the benchmarks"""
+
+    def __init__(self, db):
+        from sqlalchemy import func
+        from backend.models import Quiz
+        from backend.unified_quiz_engine import UnifiedQuizEngine
+        from backend.topic_prediction_service import TopicPredictionService
+
+        self.db = db
+        # The learner with the median number of quizzes, and their most-used topic
+        learners = db.session.query(Quiz.student_id, func.count(Quiz.id).label('quizzes'))\
+            .group_by(Quiz.student_id).order_by('quizzes', Quiz.student_id).all()
+        if not learners:
+            raise RuntimeError("Fixture database has no quizzes")
+        self.student_id = learners[len(learners) // 2].student_id
+        self.topic_id = db.session.query(Quiz.topic_id).filter_by(student_id=self.student_id)\
+            .group_by(Quiz.topic_id).order_by(func.count(Quiz.id).desc(), Quiz.topic_id).first().topic_id
+        self.quiz_count = learners[len(learners) // 2].quizzes
+
+        self.engine = UnifiedQuizEngine()
+        self.predictor = TopicPredictionService()
+        if not self.predictor.is_trained:
+            _train_fixture_model(self.predictor)
+        self.random = random.Random(FIXTURE_SEED)
+
+    def rollback(self, state=None):
+        self.db.session.rollback()
+
+
+def _train_fixture_model(predictor):
+    """Stand-in model when score_data.csv is absent, so prediction is benchmarked end to end"""
+    import pandas as pd
+    from sklearn.linear_model import LogisticRegression
+
+    rng = random.Random(FIXTURE_SEED)
+    rows, labels = [], []
+    for _ in range(300):
+        counts = [rng.randint(0, 40) for _ in range(3)]
+        right = [rng.randint(0, count) for count in counts]
+        rows.append([sum(counts)] + counts + right)
+        rates = [r / c if c else 0.0 for r, c in zip(right, counts)]
+        labels.append(['addition', 'subtraction', 'multiplication'][rates.index(min(rates))])
+    predictor.model = LogisticRegression(max_iter=500, random_state=42)
+    predictor.model.fit(pd.DataFrame(rows, columns=predictor.feature_columns), labels)
+    predictor.is_trained = True
+
+
+def build_benchmarks(fx):
+    from backend.database_optimizations import DatabaseOptimizer
+    from backend.performance_cache import SimpleCache, make_cache_key
+
+    def new_submission():
+        quiz_data = fx.engine.generate_quiz(fx.student_id, fx.topic_id, 'Medium')
+        answers = {
+            f"question_{question['question_id']}": fx.random.choice('ABCD')
+            for question in quiz_data['questions']
+        }
+        return quiz_data, answers
+
+    def submit(state):
+        quiz_data, answers = state
+        if fx.engine.process_quiz_submission(fx.student_id, quiz_data, answers, 300, commit=False) is None:
+            raise RuntimeError("process_quiz_submission failed")
+
+    def start_cache_workers():
+        """Threads are created and started untimed, then wait for the round to release them"""
+        shared = SimpleCache()
+        keys = [f"student_dashboard:{n}" for n in range(256)]
+        go = threading.Event()
+
+        def worker(seed):
+            rng = random.Random(seed)
+            go.wait()
+            for _ in range(CACHE_OPS_PER_THREAD):
+                key = rng.choice(keys)
+                # Read-mostly, like the dashboard caches
+                if shared.get(key) is None or rng.random() < 0.1:
+                    shared.set(key, {'value': key}, ttl=60)
+
+        threads = [threading.Thread(target=worker, args=(seed,)) for seed in range(CACHE_THREADS)]
+        for thread in threads:
+            thread.start()
+        return go, threads
+
+    def cache_contention(state):
+        go, threads = state
+        go.set()
+        for thread in threads:
+            thread.join()
+
+    key_args = (fx.student_id, fx.topic_id, 'Medium')
+    key_kwargs = {'limit': 10, 'include_trends': True}
+
+    def build_keys(_):
+        for _ in range(KEY_BUILDS_PER_ROUND):
+            make_cache_key('get_student_dashboard', key_args, key_kwargs)
+
+    return [
+        Benchmark('quiz_engine.process_quiz_submission', submit, setup=new_submission, teardown=fx.rollback),
+        Benchmark('quiz_engine._update_performance_trends',
+                  lambda _: fx.engine._update_performance_trends(fx.student_id, fx.topic_id, fx.random.uniform(0, 100)),
+                  teardown=fx.rollback),
+        Benchmark('topic_prediction.get_student_performance_metrics',
+                  lambda _: fx.predictor.get_student_performance_metrics(fx.student_id), rounds=10),
+        Benchmark('topic_prediction.predict_recommended_topic',
+                  lambda _: fx.predictor.predict_recommended_topic(fx.student_id), rounds=10),
+        Benchmark('database_optimizer.get_student_performance_optimized',
+                  lambda _: DatabaseOptimizer.get_student_performance_optimized(fx.student_id)),
+        Benchmark(f'cache.get_set_contention[{CACHE_THREADS}x{CACHE_OPS_PER_THREAD}]', cache_contention,
+                  setup=start_cache_workers),
+        Benchmark(f'cache.make_cache_key[x{KEY_BUILDS_PER_ROUND}]', build_keys)
+    ]
+
+
+def summarise(runs):
+    """Summary of one benchmark over several runs: the best and middle run medians, and how far they spread"""
+    medians = [statistics.median(timings) for timings in runs]
+    median = statistics.median(medians)
+    ordered = sorted(timing for timings in runs for timing in timings)
+    return {
+        'runs': len(runs),
+        'rounds': len(runs[0]),
+        'best_run_ms': round(min(medians), 3),
+        'median_ms': round(median, 3),
+        'p95_ms': round(ordered[max(0, math.ceil(0.95 * len(ordered)) - 1)], 3),
+        'mean_ms': round(statistics.fmean(ordered), 3),
+        'min_ms': round(ordered[0], 3),
+        'spread_pct': round((max(medians) - min(medians)) / median * 100, 1) if median else 0.0
+    }
+
+
+def allowed_slowdown(threshold, baseline, summary):
+    """Percent slowdown tolerated: the threshold, widened for benchmarks whose runs disagree"""
+    noise = max(baseline.get('spread_pct', 0.0), summary['spread_pct'])
+    return max(threshold, NOISE_FACTOR * noise)
+
+
+def load_baselines(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f).get('benchmarks', {})
+
+
+def _prepare_fixture_database(scale):
+    """Point DATABASE_URL at a fresh SQLite file; returns its path"""
+    handle, path = tempfile.mkstemp(prefix='nura-bench-', suffix='.db')
+    os.close(handle)
+    os.environ['DATABASE_URL'] = f"sqlite:///{path}"
+    return path
+
+
+def run_benchmarks(name_filter=None, rounds=30, warmup=3, runs=3, threshold=20.0, save_baseline=False,
+                   scale='small', use_configured_db=False, baseline_path=BASELINE_PATH):
+    """Run the suite; returns (results, regressions)"""
+    fixture_path = None if use_configured_db else _prepare_fixture_database(scale)
+    # GEMINI_API_KEY is never needed here and would make the engine call the real API
+    os.environ.pop('GEMINI_API_KEY', None)
+
+    from app import app, db
+    from backend.migrations import upgrade
+    from scripts.generate_synthetic_data import generate
+
+    try:
+        with app.app_context():
+            if fixture_path:
+                print(f"🔄 Building {scale} fixture (seed {FIXTURE_SEED}) in {fixture_path}...")
+                upgrade()
+                generate(db, scale=scale, seed=FIXTURE_SEED, anchor=FIXTURE_ANCHOR)
+
+            fx = Fixture(db)
+            print(f"🔍 Learner {fx.student_id} ({fx.quiz_count} quizzes), "
+                  f"{runs} runs of {rounds} rounds, {warmup} warm-up")
+
+            benchmarks = [benchmark for benchmark in build_benchmarks(fx)
+                          if not name_filter or name_filter in benchmark.name]
+            # Interleaved, so a burst of machine load hits one run of everything rather than all runs of one
+            timings = {benchmark.name: [] for benchmark in benchmarks}
+            for _ in range(runs):
+                for benchmark in benchmarks:
+                    timings[benchmark.name].append(benchmark.measure(rounds, warmup))
+
+            baselines = load_baselines(baseline_path)
+            results, regressions = {}, []
+            for benchmark in benchmarks:
+                summary = summarise(timings[benchmark.name])
+                results[benchmark.name] = summary
+
+                baseline = baselines.get(benchmark.name)
+                if baseline:
+                    reference = baseline.get('best_run_ms', baseline['median_ms'])
+                    change = (summary['best_run_ms'] / reference - 1) * 100
+                    allowed = allowed_slowdown(threshold, baseline, summary)
+                    regressed = change > allowed
+                    marker = '❌' if regressed else '✅'
+                    versus = f" ({change:+.1f}% vs {reference} ms, allowed +{allowed:.0f}%)"
+                    if regressed:
+                        regressions.append(benchmark.name)
+                else:
+                    marker, versus = '🆕', " (no baseline)"
+                print(f"   {marker} {benchmark.name}: best run {summary['best_run_ms']} ms, "
+                      f"median {summary['median_ms']} ms, spread {summary['spread_pct']}%{versus}")
+
+        if save_baseline:
+            stored = load_baselines(baseline_path)
+            stored.update(results)
+            with open(baseline_path, 'w') as f:
+                json.dump({
+                    'recorded_at': datetime.utcnow().isoformat(timespec='seconds'),
+                    'python': platform.python_version(),
+                    'machine': platform.machine(),
+                    'fixture': 'configured database' if use_configured_db else f"{scale}, seed {FIXTURE_SEED}",
+                    'benchmarks': dict(sorted(stored.items()))
+                }, f, indent=2)
+                f.write('\n')
+            print(f"📝 Baselines written to {baseline_path}")
+
+        if regressions:
+            print(f"❌ {len(regressions)} benchmark(s) regressed beyond their allowance: {', '.join(regressions)}")
+        else:
+            print("✅ No regressions")
+        return results, regressions
+
+    finally:
+        if fixture_path and os.path.exists(fixture_path):
+            os.remove(fixture_path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark backend hot paths against stored baselines")
+    parser.add_argument('--filter', dest='name_filter', help="Only run benchmarks whose name contains this")
+    parser.add_argument('--rounds', type=int, default=30, help="Timed rounds per benchmark (slow ones use fewer)")
+    parser.add_argument('--warmup', type=int, default=3, help="Untimed rounds before measuring")
+    parser.add_argument('--runs', type=int, default=3, help="Interleaved repetitions of the whole suite")
+    parser.add_argument('--threshold', type=float, default=20.0,
+                        help="Allowed slowdown in percent (widened for noisy benchmarks)")
+    parser.add_argument('--save-baseline', action='store_true', help="Store these results as the new baselines")
+    parser.add_argument('--scale', default='small', help="Synthetic fixture scale")
+    parser.add_argument('--use-configured-db', action='store_true',
+                        help="Benchmark against DATABASE_URL instead of a fresh fixture")
+    args = parser.parse_args()
+
+    _, regressions = run_benchmarks(name_filter=args.name_filter, rounds=args.rounds, warmup=args.warmup,
+                                    runs=args.runs, threshold=args.threshold, save_baseline=args.save_baseline,
+                                    scale=args.scale, use_configured_db=args.use_configured_db)
+    sys.exit(1 if regressions else 0)
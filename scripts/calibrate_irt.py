@@ -0,0 +1,50 @@
+"""
+Calibrate per-question IRT difficulty and discrimination from quiz responses
+
+Usage: python -m scripts.calibrate_irt [--dry-run] [--chunk-size 10000] [--min-responses 20]
+"""
+
+import argparse
+from app import app, db
+from backend.irt_calibration import IRTCalibrator
+
+
+def calibrate_questions(dry_run=False, chunk_size=10000, min_responses=20, max_iterations=100):
+    """Run the 2PL calibration job and store the parameters on each question"""
+    with app.app_context():
+        try:
+            print("📊 Streaming quiz responses for IRT calibration...")
+            calibrator = IRTCalibrator(
+                chunk_size=chunk_size,
+                max_iterations=max_iterations,
+                min_responses=min_responses
+            )
+            summary = calibrator.calibrate(dry_run=dry_run)
+
+            print(f"   Responses: {summary['responses']}")
+            print(f"   Learners: {summary['learners']}")
+            print(f"   Questions calibrated: {summary['items_calibrated']}")
+            print(f"   Questions skipped (fewer than {min_responses} responses): {summary['items_skipped']}")
+            print("✅ Dry run complete, nothing written" if dry_run else "✅ Question parameters updated")
+            return summary
+
+        except Exception as e:
+            db.session.rollback()
+            print(f"❌ Error calibrating questions: {str(e)}")
+            return None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline 2PL IRT calibration for question difficulty")
+    parser.add_argument('--dry-run', action='store_true', help="Fit the model without writing parameters")
+    parser.add_argument('--chunk-size', type=int, default=10000, help="Responses fetched per round trip")
+    parser.add_argument('--min-responses', type=int, default=20, help="Minimum responses before a question is calibrated")
+    parser.add_argument('--max-iterations', type=int, default=100)
+    args = parser.parse_args()
+
+    calibrate_questions(
+        dry_run=args.dry_run,
+        chunk_size=args.chunk_size,
+        min_responses=args.min_responses,
+        max_iterations=args.max_iterations
+    )
@@ -9,8 +9,9 @@ import json
 def init_database():
     """Initialize database with sample data"""
     with app.app_context():
-        # Create all tables
-        db.create_all()
+        # Create or upgrade the schema
+        from backend.migrations import upgrade
+        upgrade()
         
         # Create sample subjects
         subjects_data = [
@@ -0,0 +1,367 @@
+"""
+Generate deterministic synthetic data at scale: users, learners, teachers,
+subjects, topics, question sets, questions, quizzes, responses, trend events,
+trends, topic progress and adaptive sessions
+
+The same seed, scale and anchor date always produce the same rows on the
+same starting database. Learners
+have a latent ability and questions a difficulty, so scores, correctness and
+difficulty choices follow a plausible item-response pattern instead of
+uniform noise. Rows go in through executemany in streaming chunks with
+explicit ids (parents before children), appended after whatever the
+database already holds. Learners use the load-test credentials, so
+scripts/load_test.py can log them in.
+
+Usage: python -m scripts.generate_synthetic_data [--scale small|medium|large]
+                                                 [--learners N] [--seed 7]
+                                                 [--anchor 2025-01-01] [--chunk-size 5000]
+"""
+
+import argparse
+import math
+import random
+import time
+import uuid
+from datetime import datetime, timedelta
+from sqlalchemy import func, select, text
+from werkzeug.security import generate_password_hash
+from backend.trend_store import TrendStore
+from backend.topic_progress import TopicProgressService
+from backend.models import (
+    question_content_hash, User, Student, Teacher, Admin, Subject, Topic, QuestionSet, Question, Quiz,
+    QuizResponse, PerformanceTrend, PerformanceTrendEvent, AdaptiveQuizSession, AdaptiveSetResult
+)
+from scripts.load_test import LEARNER_EMAIL, LEARNER_PASSWORD
+
+SCALES = {
+    # learners, subjects, topics per subject, questions per set, mean quizzes per learner
+    'small': dict(learners=200, subjects=4, topics_per_subject=5, questions_per_set=8, quizzes_per_learner=8),
+    'medium': dict(learners=10000, subjects=8, topics_per_subject=8, questions_per_set=10, quizzes_per_learner=12),
+    'large': dict(learners=100000, subjects=10, topics_per_subject=10, questions_per_set=12, quizzes_per_learner=15)
+}
+LEVELS = ['Very Easy', 'Easy', 'Medium', 'Hard', 'Very Hard']
+LEVEL_DIFFICULTY = {level: index - 2.0 for index, level in enumerate(LEVELS)}  # Centre of each level on the ability scale
+SUBJECT_NAMES = ['Algebra', 'Geometry', 'Statistics', 'Physics', 'Chemistry', 'Biology',
+                 'Reading', 'Writing', 'Economics', 'Computing', 'Astronomy', 'Ecology']
+OPTIONS = 'ABCD'
+HISTORY_DAYS = 180
+
+# Insert order: every table's parents come first
+TABLES = [User, Student, Teacher, Admin, Subject, Topic, QuestionSet, Question, Quiz, QuizResponse,
+          PerformanceTrendEvent, PerformanceTrend, AdaptiveQuizSession, AdaptiveSetResult]
+
+
+class ChunkedLoader:
+    """Buffers rows per table and flushes every table, in dependency order, once any buffer fills"""
+
+    def __init__(self, db, chunk_size):
+        self.db = db
+        self.chunk_size = chunk_size
+        self.buffers = {model: [] for model in TABLES}
+        self.counts = {model.__tablename__: 0 for model in TABLES}
+        self.next_ids = {
+            model: (db.session.execute(select(func.max(model.id))).scalar() or 0) + 1
+            for model in TABLES
+        }
+
+    def new_id(self, model):
+        value = self.next_ids[model]
+        self.next_ids[model] += 1
+        return value
+
+    def add(self, model, row):
+        self.buffers[model].append(row)
+        if len(self.buffers[model]) >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        for model in TABLES:
+            rows = self.buffers[model]
+            if rows:
+                self.db.session.execute(model.__table__.insert(), rows)
+                self.counts[model.__tablename__] += len(rows)
+                self.buffers[model] = []
+        self.db.session.commit()
+
+    def reset_sequences(self):
+        """Explicit ids leave Postgres sequences behind; move them past the new rows"""
+        if self.db.engine.dialect.name != 'postgresql':
+            return
+        for model in TABLES:
+            table = model.__tablename__
+            self.db.session.execute(text(
+                f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), COALESCE(MAX(id), 1)) FROM {table}"
+            ))
+        self.db.session.commit()
+
+
+class SyntheticDataGenerator:
+    def __init__(self, db, seed=7, anchor=None, chunk_size=5000, learners=200, subjects=4,
+                 topics_per_subject=5, questions_per_set=8, quizzes_per_learner=8, adaptive_rate=0.2):
+        self.db = db
+        self.loader = ChunkedLoader(db, chunk_size)
+        # Keyed on where the ids start too, so a second run on top of the first gets fresh UUIDs
+        self.random = random.Random(f"{seed}:{self.loader.next_ids[User]}")
+        self.anchor = anchor or datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+        self.learners = learners
+        self.subjects = subjects
+        self.topics_per_subject = topics_per_subject
+        self.questions_per_set = questions_per_set
+        self.quizzes_per_learner = quizzes_per_learner
+        self.adaptive_rate = adaptive_rate
+        self.topics = []  # (topic row, {level: (set row, [question rows])})
+
+    def _uuid(self):
+        return str(uuid.UUID(int=self.random.getrandbits(128), version=4))
+
+    def _date(self, days_back_max, not_before=None):
+        moment = self.anchor - timedelta(seconds=self.random.uniform(0, days_back_max * 86400))
+        return max(moment, not_before) if not_before else moment
+
+    @staticmethod
+    def _p_correct(ability, difficulty):
+        """2PL with a 1-in-4 guessing floor"""
+        return 0.25 + 0.75 / (1 + math.exp(-1.2 * (ability - difficulty)))
+
+    def generate_content(self):
+        load = self.loader
+        for s in range(self.subjects):
+            name = SUBJECT_NAMES[s % len(SUBJECT_NAMES)] + (f" {s // len(SUBJECT_NAMES) + 1}" if s >= len(SUBJECT_NAMES) else '')
+            subject = {'id': load.new_id(Subject), 'subject_id': self._uuid(), 'name': name,
+                       'description': f"Synthetic {name} curriculum"}
+            load.add(Subject, subject)
+
+            for t in range(self.topics_per_subject):
+                topic = {'id': load.new_id(Topic), 'topic_id': self._uuid(), 'subject_id': subject['subject_id'],
+                         'subject_ref': subject['id'], 'name': f"{name} Topic {t + 1}",
+                         'difficulty_level': LEVELS[min(4, t * 5 // self.topics_per_subject)]}
+                load.add(Topic, topic)
+                sets = {}
+                for level in LEVELS:
+                    set_row = {'id': load.new_id(QuestionSet), 'question_set_id': self._uuid(),
+                               'topic_id': topic['topic_id'], 'subject_id': subject['subject_id'],
+                               'difficulty_level': level, 'min_questions': min(5, self.questions_per_set),
+                               'max_questions': self.questions_per_set, 'success_threshold': 80.0,
+                               'created_at': self._date(HISTORY_DAYS * 2)}
+                    questions = []
+                    for q in range(self.questions_per_set):
+                        marks = self.random.choice((1, 1, 1, 2))
+                        questions.append({
+                            'id': load.new_id(Question), 'question_id': self._uuid(),
+                            'set_id': set_row['question_set_id'], 'set_ref': set_row['id'],
+                            'description': f"{topic['name']} ({level}) question {q + 1}",
+                            'options': [f"Option {letter}" for letter in OPTIONS],
+                            'correct_option': self.random.choice(OPTIONS), 'marks_worth': marks,
+                            'explanation': None, 'irt_response_count': 0,
+                            # Latent difficulty used to simulate answers; not stored
+                            '_difficulty': LEVEL_DIFFICULTY[level] + self.random.gauss(0, 0.35)
+                        })
+                    set_row['question_ids'] = [question['question_id'] for question in questions]
+                    set_row['total_marks'] = sum(question['marks_worth'] for question in questions)
+                    load.add(QuestionSet, set_row)
+                    for question in questions:
+                        row = {k: v for k, v in question.items() if not k.startswith('_')}
+                        row['content_hash'] = question_content_hash(row['description'], row['options'],
+                                                                    row['correct_option'])
+                        load.add(Question, row)
+                    sets[level] = (set_row, questions)
+                self.topics.append((topic, sets))
+
+    def generate_staff(self, password_hash):
+        load = self.loader
+        for n in range(max(1, self.learners // 200)):
+            user_id = load.new_id(User)
+            load.add(User, {'id': user_id, 'user_id': self._uuid(), 'email': f"teacher{user_id}@synthetic.nura.test",
+                            'password_hash': password_hash, 'full_name': f"Teacher {n + 1}", 'role': 'teacher',
+                            'created_at': self._date(HISTORY_DAYS * 2)})
+            load.add(Teacher, {'id': load.new_id(Teacher), 'teacher_id': self._uuid(), 'user_id': user_id,
+                               'school_name': f"Synthetic School {n % 20 + 1}",
+                               'subjects_taught': [topic['subject_id'] for topic, _ in self.topics[:2]]})
+        user_id = load.new_id(User)
+        load.add(User, {'id': user_id, 'user_id': self._uuid(), 'email': f"admin{user_id}@synthetic.nura.test",
+                        'password_hash': password_hash, 'full_name': "Synthetic Admin", 'role': 'admin',
+                        'created_at': self._date(HISTORY_DAYS * 2)})
+        load.add(Admin, {'id': load.new_id(Admin), 'admin_id': self._uuid(), 'user_id': user_id,
+                         'department': 'Operations', 'permissions': ['all']})
+
+    def generate_learner(self, number, password_hash):
+        load = self.loader
+        ability = self.random.gauss(0, 1)
+        joined = self._date(HISTORY_DAYS)
+        user_id = load.new_id(User)
+        load.add(User, {'id': user_id, 'user_id': self._uuid(), 'email': LEARNER_EMAIL.format(n=number),
+                        'password_hash': password_hash, 'full_name': f"Learner {number}", 'role': 'student',
+                        'created_at': joined})
+        student = {'id': load.new_id(Student), 'student_id': self._uuid(), 'user_id': user_id,
+                   'grade_level': str(self.random.randint(6, 12)), 'preferred_subjects': []}
+        load.add(Student, student)
+
+        # Learners concentrate on a few topics and drift upward over time
+        focus = self.random.sample(self.topics, min(len(self.topics), self.random.randint(2, 6)))
+        quiz_count = self.random.randint(0, 2 * self.quizzes_per_learner)
+        dates = sorted(self._date(HISTORY_DAYS, not_before=joined) for _ in range(quiz_count))
+        history = {}
+        for taken_at in dates:
+            topic, sets = self.random.choice(focus)
+            ability += 0.02
+            level = LEVELS[max(0, min(4, round(ability + 2 + self.random.gauss(0, 0.8))))]
+            set_row, questions = sets[level]
+            score = self._add_quiz(student, topic, set_row, questions, ability, taken_at)
+            history.setdefault(topic['topic_id'], []).append((taken_at, score))
+
+        for topic_id, scores in history.items():
+            self._add_trend(student['student_id'], topic_id, scores)
+
+        if focus and self.random.random() < self.adaptive_rate:
+            self._add_adaptive_session(student, self.random.choice(focus), ability)
+
+    def _add_quiz(self, student, topic, set_row, questions, ability, taken_at):
+        load = self.loader
+        quiz = {'id': load.new_id(Quiz), 'quiz_id': self._uuid(), 'student_id': student['student_id'],
+                'topic_id': topic['topic_id'], 'question_set_id': set_row['question_set_id'],
+                'student_ref': student['id'], 'topic_ref': topic['id'],
+                'total_marks': set_row['total_marks'], 'date_taken': taken_at}
+        earned, seconds = 0, 0
+        responses = []
+        for question in questions:
+            correct = self.random.random() < self._p_correct(ability, question['_difficulty'])
+            selected = question['correct_option'] if correct else self.random.choice(
+                [option for option in OPTIONS if option != question['correct_option']])
+            spent = max(5, int(self.random.gauss(45, 15)))
+            seconds += spent
+            earned += question['marks_worth'] if correct else 0
+            responses.append({'id': load.new_id(QuizResponse), 'response_id': self._uuid(),
+                              'quiz_id': quiz['quiz_id'], 'question_id': question['question_id'],
+                              'quiz_ref': quiz['id'], 'question_ref': question['id'],
+                              'selected_option': selected, 'is_correct': correct, 'time_taken': spent})
+        quiz['score'] = earned / set_row['total_marks'] * 100 if set_row['total_marks'] else 0.0
+        quiz['time_taken'] = seconds
+        load.add(Quiz, quiz)
+        for response in responses:
+            load.add(QuizResponse, response)
+        load.add(PerformanceTrendEvent, {'id': load.new_id(PerformanceTrendEvent), 'student_id': student['student_id'],
+                                         'topic_id': topic['topic_id'], 'score': quiz['score'],
+                                         'recorded_at': taken_at})
+        return quiz['score']
+
+    def _add_trend(self, student_id, topic_id, history):
+        """Trend row with the ring buffer filled the way TrendStore would have left it"""
+        trend = PerformanceTrend(event_count=0)
+        TrendStore._reset_window(trend, [score for _, score in history])
+        recent = [score for _, score in history[-TrendStore.WINDOW:]]
+        self.loader.add(PerformanceTrend, {
+            'id': self.loader.new_id(PerformanceTrend), 'trend_id': self._uuid(),
+            'student_id': student_id, 'topic_id': topic_id,
+            'proficiency_score': sum(recent) / len(recent),  # Replaced by recalibrate() after the load
+            'window_scores': trend.window_scores, 'window_head': trend.window_head,
+            'window_count': trend.window_count, 'window_sum': trend.window_sum,
+            'event_count': len(history), 'last_updated': history[-1][0]
+        })
+
+    def _add_adaptive_session(self, student, focus, ability):
+        load = self.loader
+        topic, sets = focus
+        started = self._date(HISTORY_DAYS // 2)
+        level = LEVELS[max(0, min(4, round(ability + 2)))]
+        session = {'id': load.new_id(AdaptiveQuizSession), 'session_id': self._uuid(),
+                   'student_id': student['student_id'], 'topic_id': topic['topic_id'],
+                   'initial_difficulty': level, 'total_sets': 5, 'mode': 'sets',
+                   'start_time': started, 'version': 1}
+        correct_sum = 0.0
+        elapsed = 0
+        results = []
+        for set_number in range(1, 6):
+            _, questions = sets[level]
+            correct = sum(self.random.random() < self._p_correct(ability, q['_difficulty']) for q in questions)
+            percentage = correct / len(questions) * 100
+            seconds = sum(max(5, int(self.random.gauss(40, 12))) for _ in questions)
+            fast = seconds / len(questions) < 35
+            index = LEVELS.index(level)
+            if percentage >= 80 and fast:
+                next_level = LEVELS[min(4, index + 1)]
+            elif percentage < 50:
+                next_level = LEVELS[max(0, index - 1)]
+            else:
+                next_level = level
+            results.append({
+                'id': load.new_id(AdaptiveSetResult), 'result_id': self._uuid(), 'session_id': session['session_id'],
+                'set_number': set_number, 'difficulty_level': level, 'next_difficulty': next_level,
+                'adjustment_reason': None if next_level == level else f"{percentage:.0f}% correct",
+                'score': percentage, 'correctness_percentage': percentage, 'completion_time': seconds,
+                'average_time_per_question': seconds / len(questions), 'is_fast_completion': fast,
+                'total_questions': len(questions), 'correct_answers': correct,
+                'created_at': started + timedelta(seconds=elapsed + seconds)
+            })
+            elapsed += seconds
+            correct_sum += percentage
+            level = next_level
+
+        session.update({'current_difficulty': level, 'current_set': 5, 'is_completed': True,
+                        'final_proficiency_score': correct_sum / 5,
+                        'end_time': started + timedelta(seconds=elapsed)})
+        # Complete before it is buffered (any add may flush), and ahead of its set results
+        load.add(AdaptiveQuizSession, session)
+        for result in results:
+            load.add(AdaptiveSetResult, result)
+
+    def run(self, progress=None):
+        password_hash = generate_password_hash(LEARNER_PASSWORD)
+        self.generate_content()
+        self.generate_staff(password_hash)
+        first = self.db.session.execute(
+            select(func.count()).select_from(User).where(User.email.like(LEARNER_EMAIL.format(n='%')))
+        ).scalar() + 1
+        for n in range(first, first + self.learners):
+            self.generate_learner(n, password_hash)
+            if progress and (n - first + 1) % 1000 == 0:
+                progress(n - first + 1)
+        self.loader.flush()
+        self.loader.reset_sequences()
+        return self.loader.counts
+
+
+def generate(db, scale='small', seed=7, anchor=None, chunk_size=5000, rebuild_read_models=True,
+             progress=None, **overrides):
+    """Load one scale's worth of synthetic data; returns rows inserted per table"""
+    settings = dict(SCALES[scale], **{k: v for k, v in overrides.items() if v is not None})
+    counts = SyntheticDataGenerator(db, seed=seed, anchor=anchor, chunk_size=chunk_size, **settings).run(progress)
+    if rebuild_read_models:
+        counts['student_topic_progress'] = TopicProgressService.rebuild(batch_size=chunk_size)
+        TrendStore.recalibrate(batch_size=chunk_size)
+    return counts
+
+
+def generate_synthetic_data(scale='small', seed=7, anchor=None, chunk_size=5000, **overrides):
+    """Generate, load and summarise synthetic data in the configured database"""
+    from app import app, db
+
+    with app.app_context():
+        try:
+            print(f"🔄 Generating {scale} synthetic dataset (seed {seed})...")
+            started = time.time()
+            counts = generate(db, scale=scale, seed=seed, anchor=anchor, chunk_size=chunk_size,
+                              progress=lambda n: print(f"   {n} learners generated"), **overrides)
+            for table, rows in counts.items():
+                print(f"   {table}: {rows} rows")
+            print(f"✅ Synthetic data loaded in {time.time() - started:.1f}s")
+            return counts
+
+        except Exception as e:
+            db.session.rollback()
+            print(f"❌ Error generating synthetic data: {str(e)}")
+            return None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk-load deterministic synthetic data")
+    parser.add_argument('--scale', choices=sorted(SCALES), default='small', help="Preset dataset size")
+    parser.add_argument('--learners', type=int, help="Override the preset learner count")
+    parser.add_argument('--quizzes-per-learner', type=int, help="Override the mean quizzes per learner")
+    parser.add_argument('--seed', type=int, default=7, help="Random seed; same seed, same data")
+    parser.add_argument('--anchor', type=datetime.fromisoformat,
+                        help="Date the history ends at (default: today), fixes dates across runs")
+    parser.add_argument('--chunk-size', type=int, default=5000, help="Rows per executemany batch")
+    args = parser.parse_args()
+
+    generate_synthetic_data(scale=args.scale, seed=args.seed, anchor=args.anchor, chunk_size=args.chunk_size,
+                            learners=args.learners, quizzes_per_learner=args.quizzes_per_learner)
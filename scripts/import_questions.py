@@ -0,0 +1,72 @@
+"""
+Stream a question bank from CSV or Excel into the database
+
+Rows are validated, deduplicated by content hash and inserted in batched
+transactions. Subject, topic and difficulty come from the file's columns
+(a workbook's sheet name stands in for a missing subject), falling back on
+--subject/--topic/--difficulty. An interrupted import continues with
+--resume from the checkpoint written next to the file.
+
+Usage: python -m scripts.import_questions bank.xlsx [--subject Maths] [--topic Fractions]
+                                                    [--batch-size 1000] [--resume] [--dry-run]
+"""
+
+import argparse
+import sys
+import time
+from app import app, db
+from backend.question_import import QuestionImporter
+
+
+def import_questions(path, subject=None, topic=None, difficulty=None, batch_size=1000, resume=False, dry_run=False):
+    """Import one file and print a summary; returns the importer stats"""
+    with app.app_context():
+        started = time.time()
+
+        def progress(stats):
+            rate = stats['rows'] / max(time.time() - started, 1e-6)
+            print(f"   {stats['rows']} rows: {stats['inserted']} new, {stats['duplicates']} duplicates, "
+                  f"{stats['invalid']} invalid ({rate:.0f} rows/s)")
+
+        try:
+            print(f"🔄 {'Validating' if dry_run else 'Importing'} {path}...")
+            importer = QuestionImporter(
+                batch_size=batch_size,
+                defaults={'subject': subject, 'topic': topic, 'difficulty': difficulty},
+                dry_run=dry_run,
+                progress=progress
+            )
+            stats = importer.run(path, resume=resume)
+
+            for error in stats['errors']:
+                print(f"   ⚠️ {error}")
+            if stats['invalid'] > len(stats['errors']):
+                print(f"   ⚠️ ...and {stats['invalid'] - len(stats['errors'])} more invalid rows")
+            print(f"✅ {stats['inserted']} questions {'would be ' if dry_run else ''}imported, "
+                  f"{stats['duplicates']} duplicates skipped, {stats['invalid']} invalid rows; created "
+                  f"{stats['subjects_created']} subjects, {stats['topics_created']} topics, "
+                  f"{stats['sets_created']} question sets in {time.time() - started:.1f}s")
+            return stats
+
+        except Exception as e:
+            db.session.rollback()
+            print(f"❌ Error importing questions: {str(e)}")
+            if not dry_run:
+                print("   Committed batches are kept; re-run with --resume to continue")
+            return None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Streaming question bank import from .csv or .xlsx")
+    parser.add_argument('path', help="CSV or Excel file with one question per row")
+    parser.add_argument('--subject', help="Subject for rows without a subject column")
+    parser.add_argument('--topic', help="Topic for rows without a topic column")
+    parser.add_argument('--difficulty', help="Difficulty for rows without one (default Medium)")
+    parser.add_argument('--batch-size', type=int, default=1000, help="Rows per transaction")
+    parser.add_argument('--resume', action='store_true', help="Continue from the last checkpoint")
+    parser.add_argument('--dry-run', action='store_true', help="Validate and check for duplicates already in the database, without writing")
+    args = parser.parse_args()
+
+    stats = import_questions(args.path, subject=args.subject, topic=args.topic, difficulty=args.difficulty,
+                             batch_size=args.batch_size, resume=args.resume, dry_run=args.dry_run)
+    sys.exit(0 if stats else 1)
@@ -0,0 +1,147 @@
+"""
+Index advisor: request every GET page as each role, capture the SELECTs it
+issues, EXPLAIN them against the configured (seeded) database and flag full
+table scans.
+
+Usage: python -m scripts.index_advisor [--route /learner/dashboard] [--verbose]
+"""
+
+import argparse
+import re
+from collections import defaultdict
+from sqlalchemy import event
+from app import app, db
+from backend.models import User, Subject, Topic, Student, Quiz
+
+
+def _placeholder_values():
+    """Real ids to substitute into parameterised routes"""
+    topic = Topic.query.first()
+    subject = Subject.query.first()
+    student = Student.query.first()
+    quiz = Quiz.query.first()
+    return {
+        'topic_id': topic.topic_id if topic else None,
+        'subject_id': subject.subject_id if subject else None,
+        'student_id': student.student_id if student else None,
+        'quiz_id': quiz.quiz_id if quiz else None,
+        'difficulty': 'Medium'
+    }
+
+
+def _get_routes(only=None):
+    """GET routes with their arguments filled in; routes we can't fill are skipped"""
+    values = _placeholder_values()
+    routes = []
+    for rule in app.url_map.iter_rules():
+        if 'GET' not in rule.methods or rule.endpoint in ('static', 'logout'):
+            continue
+        if any(values.get(argument) is None for argument in rule.arguments):
+            continue
+        path = rule.rule
+        for argument in rule.arguments:
+            path = path.replace(f'<{argument}>', values[argument])
+        if only and path != only:
+            continue
+        routes.append(path)
+    return sorted(set(routes))
+
+
+SUPPORTED_DIALECTS = ('sqlite', 'postgresql', 'mysql')
+# "Seq Scan on quizzes" or "Parallel Seq Scan on quizzes q"; index and bitmap scans are not matched
+SEQ_SCAN = re.compile(r'\bSeq Scan on (?:\w+\.)?"?(\w+)"?')
+
+
+def _explain(statement, parameters):
+    """Return the tables a statement reads with a full scan"""
+    connection = db.session.connection()
+    dialect = db.engine.dialect.name
+
+    if dialect == 'sqlite':
+        rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).fetchall()
+        # "SCAN quizzes" is a table scan; "SEARCH ..." and "SCAN ... USING INDEX" are not
+        return [row[3].split()[1] for row in rows if row[3].startswith('SCAN ') and ' USING ' not in row[3]]
+
+    if dialect == 'postgresql':
+        rows = connection.exec_driver_sql(f"EXPLAIN {statement}", parameters).fetchall()
+        return [match.group(1) for row in rows for match in [SEQ_SCAN.search(row[0])] if match]
+
+    if dialect == 'mysql':
+        rows = connection.exec_driver_sql(f"EXPLAIN {statement}", parameters).mappings().fetchall()
+        return [row['table'] for row in rows if row.get('type') == 'ALL']
+
+    raise RuntimeError(f"Index advisor cannot read {dialect} query plans; supported: {', '.join(SUPPORTED_DIALECTS)}")
+
+
+def run_index_advisor(only_route=None, verbose=False):
+    """Print every statement that scans a whole table, grouped by route"""
+    with app.app_context():
+        if db.engine.dialect.name not in SUPPORTED_DIALECTS:
+            # Checked up front: per-statement explain errors are only reported with --verbose
+            raise SystemExit(f"❌ Index advisor cannot read {db.engine.dialect.name} query plans; "
+                             f"supported: {', '.join(SUPPORTED_DIALECTS)}")
+
+        captured = []
+
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().upper().startswith('SELECT') and not executemany:
+                captured.append((statement, parameters))
+
+        users = {role: User.query.filter_by(role=role).first() for role in ('student', 'teacher', 'admin')}
+        routes = _get_routes(only_route)
+        print(f"🔍 Explaining queries from {len(routes)} routes as {', '.join(r for r, u in users.items() if u)}")
+
+        scans_by_table = defaultdict(int)
+        flagged_routes = 0
+
+        for role, user in users.items():
+            if not user:
+                continue
+            client = app.test_client()
+            with client.session_transaction() as session:
+                session['_user_id'] = str(user.id)
+                session['_fresh'] = True
+
+            for path in routes:
+                captured.clear()
+                event.listen(db.engine, 'before_cursor_execute', capture)
+                try:
+                    status = client.get(path).status_code
+                finally:
+                    event.remove(db.engine, 'before_cursor_execute', capture)
+
+                findings = []
+                for statement, parameters in {s: (s, p) for s, p in captured}.values():
+                    try:
+                        tables = _explain(statement, parameters)
+                    except Exception as e:
+                        if verbose:
+                            print(f"   ⚠️ Could not explain: {str(e)[:120]}")
+                        continue
+                    if tables:
+                        findings.append((tables, statement))
+                        for table in tables:
+                            scans_by_table[table] += 1
+
+                if findings:
+                    flagged_routes += 1
+                    print(f"\n❌ {role} GET {path} [{status}]: {len(findings)} of {len(captured)} queries scan")
+                    for tables, statement in findings:
+                        print(f"   full scan on {', '.join(tables)}: {' '.join(statement.split())[:160]}")
+                elif verbose:
+                    print(f"✅ {role} GET {path} [{status}]: {len(captured)} queries, no full scans")
+
+        print("\nFull scans by table:")
+        for table, count in sorted(scans_by_table.items(), key=lambda item: -item[1]):
+            print(f"   {table}: {count}")
+        print(f"\n{'✅' if not flagged_routes else '⚠️'} {flagged_routes} route/role combinations with full scans")
+        return dict(scans_by_table)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Flag full table scans in the queries each route issues")
+    parser.add_argument('--route', help="Only check this path, e.g. /learner/dashboard")
+    parser.add_argument('--verbose', action='store_true', help="Also list routes without full scans")
+    args = parser.parse_args()
+
+    run_index_advisor(only_route=args.route, verbose=args.verbose)
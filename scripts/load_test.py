@@ -0,0 +1,259 @@
+"""
+Load test the learner flow: log in seeded learners, then repeatedly start a
+quiz, submit it, and open the dashboard, roadmap and topic predictions.
+Reports throughput and p50/p95/p99 latency per step.
+
+Runs in-process against the configured database (DATABASE_URL, SQLite or
+Postgres) by default, or against a running server with --base-url; either
+way learners and topics come from the configured database. GEMINI_API_KEY is
+ignored unless --real-ai is passed, so AI feedback uses the local fallbacks.
+
+Usage: python -m scripts.load_test [--users 20] [--duration 60] [--think-time 500]
+                                   [--base-url http://localhost:5000] [--seed 42]
+                                   [--json results.json]
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import re
+import statistics
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from http.cookiejar import CookieJar
+
+LEARNER_EMAIL = 'loadtest{n}@nura.test'
+LEARNER_PASSWORD = 'loadtest-password'
+STEPS = ['login', 'start_quiz', 'submit_quiz', 'dashboard', 'roadmap', 'predictions']
+
+QUESTION_FIELD = re.compile(r'name="(question_[^"]+)"')
+SUBMISSION_KEY = re.compile(r'name="submission_key" value="([^"]+)"')
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+class HttpClient:
+    """Cookie-keeping client for a running server"""
+
+    def __init__(self, base_url):
+        self.base_url = base_url.rstrip('/')
+        self.opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(CookieJar()), _NoRedirect())
+
+    def request(self, method, path, data=None):
+        body = urllib.parse.urlencode(data).encode() if data is not None else None
+        try:
+            with self.opener.open(urllib.request.Request(self.base_url + path, data=body, method=method)) as response:
+                return response.status, response.read().decode('utf-8', 'replace')
+        except urllib.error.HTTPError as e:
+            return e.code, e.read().decode('utf-8', 'replace')
+
+
+class InProcessClient:
+    """Flask test client: exercises the app and database without a network hop"""
+
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def request(self, method, path, data=None):
+        response = self.client.open(path, method=method, data=data)
+        return response.status_code, response.get_data(as_text=True)
+
+
+class StepStats:
+    def __init__(self):
+        self.durations = []
+        self.errors = 0
+        self._lock = threading.Lock()
+
+    def record(self, seconds, ok):
+        with self._lock:
+            self.durations.append(seconds)
+            if not ok:
+                self.errors += 1
+
+    def summary(self, elapsed):
+        timings = sorted(self.durations)
+
+        def percentile(p):
+            # Nearest-rank percentile
+            return timings[max(0, math.ceil(p / 100 * len(timings)) - 1)] * 1000
+
+        if not timings:
+            return {'requests': 0, 'errors': 0}
+        return {
+            'requests': len(timings),
+            'errors': self.errors,
+            'throughput_rps': round(len(timings) / elapsed, 2),
+            'p50_ms': round(percentile(50), 1),
+            'p95_ms': round(percentile(95), 1),
+            'p99_ms': round(percentile(99), 1),
+            'mean_ms': round(statistics.fmean(timings) * 1000, 1),
+            'max_ms': round(timings[-1] * 1000, 1)
+        }
+
+
+def ensure_learners(count):
+    """Create loadtest learners 1..count that don't exist yet (shared password)"""
+    from werkzeug.security import generate_password_hash
+    from app import db
+    from backend.models import User, Student
+
+    emails = [LEARNER_EMAIL.format(n=n) for n in range(1, count + 1)]
+    existing = {row.email for row in User.query.filter(User.email.in_(emails)).with_entities(User.email)}
+    missing = [email for email in emails if email not in existing]
+    if not missing:
+        return 0
+
+    password_hash = generate_password_hash(LEARNER_PASSWORD)
+    for email in missing:
+        user = User(email=email, password_hash=password_hash, full_name=email.split('@')[0], role='student')
+        db.session.add(user)
+        db.session.flush()
+        db.session.add(Student(user_id=user.id, grade_level='Not specified', preferred_subjects=[]))
+    db.session.commit()
+    return len(missing)
+
+
+def quiz_topics():
+    """Topics that have at least one question set with questions"""
+    from app import db
+    from backend.models import QuestionSet, Question
+    rows = db.session.query(QuestionSet.topic_id).join(Question, Question.set_id == QuestionSet.question_set_id)\
+        .distinct().all()
+    return sorted(row.topic_id for row in rows)
+
+
+class VirtualLearner(threading.Thread):
+    def __init__(self, number, client, topics, stats, deadline, think_time, seed):
+        super().__init__(name=f'learner-{number}', daemon=True)
+        self.number = number
+        self.client = client
+        self.topics = topics
+        self.stats = stats
+        self.deadline = deadline
+        self.think_time = think_time
+        self.random = random.Random(seed + number)
+        self.iterations = 0
+
+    def _step(self, name, method, path, data=None, expect=(200,)):
+        started = time.perf_counter()
+        try:
+            status, body = self.client.request(method, path, data)
+            ok = status in expect
+        except Exception:
+            status, body, ok = None, '', False
+        self.stats[name].record(time.perf_counter() - started, ok)
+        return ok, body
+
+    def _think(self):
+        if self.think_time:
+            time.sleep(self.think_time * self.random.uniform(0.5, 1.5))
+
+    def run(self):
+        email = LEARNER_EMAIL.format(n=self.number)
+        ok, _ = self._step('login', 'POST', '/login', {'email': email, 'password': LEARNER_PASSWORD}, expect=(302,))
+        if not ok:
+            return
+
+        while time.time() < self.deadline:
+            topic_id = self.random.choice(self.topics)
+            ok, page = self._step('start_quiz', 'GET', f'/quiz/start/{topic_id}')
+            fields = sorted(set(QUESTION_FIELD.findall(page))) if ok else []
+            if fields:
+                self._think()
+                answers = {field: self.random.choice('ABCD') for field in fields}
+                key = SUBMISSION_KEY.search(page)
+                if key:
+                    answers['submission_key'] = key.group(1)
+                self._step('submit_quiz', 'POST', '/quiz/submit', answers)
+
+            self._think()
+            self._step('dashboard', 'GET', '/learner/dashboard')
+            self._think()
+            self._step('roadmap', 'GET', '/learning_roadmap')
+            self._think()
+            self._step('predictions', 'GET', '/topic_predictions')
+            self.iterations += 1
+
+
+def run_load_test(users=20, duration=60, think_time_ms=500, base_url=None, seed=42, json_path=None):
+    """Drive `users` concurrent learners for `duration` seconds and print per-step latency"""
+    from app import app
+
+    with app.app_context():
+        created = ensure_learners(users)
+        topics = quiz_topics()
+    if created:
+        print(f"👤 Created {created} load-test learners")
+    if not topics:
+        print("❌ No topics with questions; seed data first (python -m scripts.generate_synthetic_data)")
+        return None
+
+    target = base_url or 'in-process app'
+    print(f"🚀 {users} learners for {duration}s against {target}, think time {think_time_ms} ms, seed {seed}")
+
+    stats = {step: StepStats() for step in STEPS}
+    deadline = time.time() + duration
+    learners = [
+        VirtualLearner(n, HttpClient(base_url) if base_url else InProcessClient(app),
+                       topics, stats, deadline, think_time_ms / 1000, seed)
+        for n in range(1, users + 1)
+    ]
+    started = time.perf_counter()
+    for learner in learners:
+        learner.start()
+    for learner in learners:
+        learner.join()
+    elapsed = time.perf_counter() - started
+
+    report = {
+        'config': {'users': users, 'duration': duration, 'think_time_ms': think_time_ms,
+                   'target': target, 'seed': seed},
+        'elapsed_seconds': round(elapsed, 2),
+        'iterations': sum(learner.iterations for learner in learners),
+        'steps': {step: stats[step].summary(elapsed) for step in STEPS}
+    }
+
+    print(f"\n{'step':<14}{'reqs':>7}{'errors':>8}{'req/s':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}")
+    for step, summary in report['steps'].items():
+        if not summary['requests']:
+            continue
+        print(f"{step:<14}{summary['requests']:>7}{summary['errors']:>8}{summary['throughput_rps']:>9}"
+              f"{summary['p50_ms']:>9}{summary['p95_ms']:>9}{summary['p99_ms']:>9}{summary['max_ms']:>9}")
+    errors = sum(summary.get('errors', 0) for summary in report['steps'].values())
+    print(f"\n{'✅' if not errors else '⚠️'} {report['iterations']} learner iterations in {report['elapsed_seconds']}s, "
+          f"{errors} errors (latencies in ms)")
+
+    if json_path:
+        with open(json_path, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"📝 Results written to {json_path}")
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Concurrent learner-flow load test")
+    parser.add_argument('--users', type=int, default=20, help="Concurrent learners")
+    parser.add_argument('--duration', type=int, default=60, help="Seconds to run")
+    parser.add_argument('--think-time', type=int, default=500, help="Mean pause between steps in ms (0 for none)")
+    parser.add_argument('--base-url', help="Target a running server instead of the in-process app")
+    parser.add_argument('--seed', type=int, default=42, help="Seed for topic and answer choices")
+    parser.add_argument('--json', dest='json_path', help="Write the report to this file")
+    parser.add_argument('--real-ai', action='store_true', help="Keep GEMINI_API_KEY (calls the real API)")
+    args = parser.parse_args()
+
+    if not args.real_ai:
+        os.environ.pop('GEMINI_API_KEY', None)
+
+    report = run_load_test(users=args.users, duration=args.duration, think_time_ms=args.think_time,
+                           base_url=args.base_url, seed=args.seed, json_path=args.json_path)
+    sys.exit(0 if report else 1)
@@ -0,0 +1,54 @@
+"""
+Apply and inspect versioned schema migrations
+
+Usage: python -m scripts.migrate upgrade [--to VERSION]
+       python -m scripts.migrate status
+"""
+
+import argparse
+from app import app, db
+from backend.migrations import upgrade, current_version, latest_version, history, pending
+
+
+def run_upgrade(target=None):
+    """Apply pending migrations up to target (default: latest)"""
+    with app.app_context():
+        try:
+            print(f"🔄 Schema at version {current_version()}, upgrading to {target or latest_version()}...")
+
+            applied = upgrade(
+                target=target,
+                progress=lambda migration: print(f"   Applying {migration.VERSION}: {migration.DESCRIPTION}")
+            )
+
+            print(f"✅ Applied {len(applied)} migrations, schema at version {current_version()}")
+            return applied
+
+        except Exception as e:
+            db.session.rollback()
+            print(f"❌ Migration failed at version {current_version()}: {str(e)}")
+            return None
+
+
+def show_status():
+    """Print applied and pending migrations"""
+    with app.app_context():
+        for row in history():
+            print(f"   ✅ {row.version}: {row.description} ({row.applied_at:%Y-%m-%d %H:%M})")
+        for migration in pending():
+            print(f"   ⏳ {migration.VERSION}: {migration.DESCRIPTION}")
+        print(f"Schema version {current_version()} of {latest_version()}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Versioned schema migrations")
+    subcommands = parser.add_subparsers(dest='command', required=True)
+    upgrade_parser = subcommands.add_parser('upgrade', help="Apply pending migrations")
+    upgrade_parser.add_argument('--to', type=int, help="Stop after this version")
+    subcommands.add_parser('status', help="Show applied and pending migrations")
+    args = parser.parse_args()
+
+    if args.command == 'upgrade':
+        run_upgrade(target=args.to)
+    else:
+        show_status()
@@ -0,0 +1,36 @@
+"""
+Rebuild the student_topic_progress read model from quiz history
+
+Usage: python -m scripts.rebuild_topic_progress [--student-id STUDENT_ID]
+"""
+
+import argparse
+from app import app, db
+from backend.topic_progress import TopicProgressService
+
+
+def rebuild_topic_progress(student_id=None, batch_size=1000):
+    """Replay quiz history into student_topic_progress"""
+    with app.app_context():
+        try:
+            scope = f"learner {student_id}" if student_id else "all learners"
+            print(f"🔄 Rebuilding topic progress for {scope}...")
+
+            rows_written = TopicProgressService.rebuild(student_id=student_id, batch_size=batch_size)
+
+            print(f"✅ Rebuilt {rows_written} topic progress rows")
+            return rows_written
+
+        except Exception as e:
+            db.session.rollback()
+            print(f"❌ Error rebuilding topic progress: {str(e)}")
+            return None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Repair student_topic_progress from quiz history")
+    parser.add_argument('--student-id', help="Only rebuild rows for this learner")
+    parser.add_argument('--batch-size', type=int, default=1000, help="Quiz rows fetched per round trip")
+    args = parser.parse_args()
+
+    rebuild_topic_progress(student_id=args.student_id, batch_size=args.batch_size)
@@ -0,0 +1,47 @@
+"""
+Recompute every learner's topic proficiency from the full score history
+
+Usage: python -m scripts.recalibrate_proficiency [--model ewma|rolling_mean]
+                                                 [--alpha 0.3] [--half-life-days N]
+"""
+
+import argparse
+from app import app, db
+from backend.proficiency import get_proficiency_model, ExponentialDecayModel, RollingMeanModel
+from backend.trend_store import TrendStore
+
+
+def recalibrate_proficiency(model=None, batch_size=5000):
+    """Replay performance_trend_events through the proficiency model"""
+    with app.app_context():
+        try:
+            model = model or get_proficiency_model()
+            print(f"🔄 Recalibrating proficiency with the '{model.name}' model...")
+
+            updated = TrendStore.recalibrate(model=model, batch_size=batch_size)
+
+            print(f"✅ Updated {updated} performance trends")
+            return updated
+
+        except Exception as e:
+            db.session.rollback()
+            print(f"❌ Error recalibrating proficiency: {str(e)}")
+            return None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Recalibrate PerformanceTrend.proficiency_score from history")
+    parser.add_argument('--model', choices=[ExponentialDecayModel.name, RollingMeanModel.name],
+                        help="Override PROFICIENCY_MODEL for this run")
+    parser.add_argument('--alpha', type=float, default=0.3, help="EWMA smoothing factor")
+    parser.add_argument('--half-life-days', type=float, help="Decay the previous estimate over idle days")
+    parser.add_argument('--batch-size', type=int, default=5000, help="Events fetched per round trip")
+    args = parser.parse_args()
+
+    model = None
+    if args.model == ExponentialDecayModel.name:
+        model = ExponentialDecayModel(alpha=args.alpha, half_life_days=args.half_life_days)
+    elif args.model == RollingMeanModel.name:
+        model = RollingMeanModel()
+
+    recalibrate_proficiency(model=model, batch_size=args.batch_size)
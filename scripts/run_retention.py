@@ -0,0 +1,53 @@
+"""
+Purge expired adaptive sessions, orphan quizzes, old trend events and stale
+submission receipts according to the retention policy
+
+Usage: python -m scripts.run_retention [--dry-run] [--session-days N]
+                                       [--trend-event-days N] [--batch-size N]
+"""
+
+import argparse
+from app import app, db
+from backend.retention import RetentionJob, RetentionPolicy
+
+
+def run_retention(policy=None, dry_run=False):
+    """Run every purge once and print rows reclaimed per table"""
+    with app.app_context():
+        try:
+            mode = "Dry run: counting" if dry_run else "Purging"
+            print(f"🔄 {mode} rows past the retention windows...")
+
+            report = RetentionJob(policy).run(dry_run=dry_run)
+
+            for table, stats in report['tables'].items():
+                verb = "would delete" if dry_run else "deleted"
+                print(f"   {table}: {verb} {stats['rows']} rows in {stats['batches']} batches")
+            print(f"✅ Retention finished in {report['duration_seconds']}s")
+            return report
+
+        except Exception as e:
+            db.session.rollback()
+            print(f"❌ Error running retention: {str(e)}")
+            return None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Apply the data retention policy in bounded batches")
+    parser.add_argument('--dry-run', action='store_true', help="Report what would be deleted without deleting")
+    parser.add_argument('--session-days', type=int, help="Keep unfinished adaptive sessions this long")
+    parser.add_argument('--orphan-quiz-days', type=int, help="Keep unanswered quiz rows this long")
+    parser.add_argument('--trend-event-days', type=int, help="Keep raw trend events this long")
+    parser.add_argument('--receipt-days', type=int, help="Keep submission receipts this long")
+    parser.add_argument('--batch-size', type=int, help="Rows deleted per transaction")
+    parser.add_argument('--pause-seconds', type=float, help="Sleep between batches")
+    args = parser.parse_args()
+
+    policy = RetentionPolicy.from_environment()
+    for option in ('session_days', 'orphan_quiz_days', 'trend_event_days', 'receipt_days',
+                   'batch_size', 'pause_seconds'):
+        value = getattr(args, option)
+        if value is not None:
+            setattr(policy, option, value)
+
+    run_retention(policy=policy, dry_run=args.dry_run)
@@ -0,0 +1,51 @@
+"""
+Copy a local SQLite primary onto the SQLite replica so read routing can be
+exercised without real replication. Run it again to simulate the replica
+catching up; anything written in between is "replication lag".
+
+Usage: DATABASE_URL=sqlite:///primary.db DATABASE_REPLICA_URL=sqlite:///replica.db \\
+       python -m scripts.sync_sqlite_replica
+"""
+
+import sqlite3
+from sqlalchemy.engine import make_url
+from backend.environment_config import EnvironmentConfig
+
+
+def _sqlite_path(url):
+    parsed = make_url(url)
+    if not parsed.drivername.startswith('sqlite') or not parsed.database or parsed.database == ':memory:':
+        raise ValueError(f"Not a file-backed SQLite URL: {url}")
+    return parsed.database
+
+
+def sync_sqlite_replica():
+    """Snapshot the primary into the replica with SQLite's online backup API"""
+    try:
+        replica_url = EnvironmentConfig.get_replica_database_url()
+        if not replica_url:
+            print("❌ DATABASE_REPLICA_URL is not set")
+            return False
+
+        primary_path = _sqlite_path(EnvironmentConfig.get_database_url())
+        replica_path = _sqlite_path(replica_url)
+        print(f"🔄 Copying {primary_path} to {replica_path}...")
+
+        source = sqlite3.connect(primary_path)
+        target = sqlite3.connect(replica_path)
+        try:
+            source.backup(target)
+        finally:
+            target.close()
+            source.close()
+
+        print("✅ Replica is up to date with the primary")
+        return True
+
+    except Exception as e:
+        print(f"❌ Error syncing replica: {str(e)}")
+        return False
+
+
+if __name__ == "__main__":
+    sync_sqlite_replica()
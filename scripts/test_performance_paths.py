@@ -0,0 +1,120 @@
+"""
+Test script for the performance-critical paths: the learner dashboard's SQL
+budget, the trend store's packed ring buffer and the EWMA proficiency model
+
+Usage: python -m scripts.test_performance_paths
+
+The ring buffer and EWMA checks need no data; the dashboard check uses the
+first student in the configured database that has taken a quiz.
+"""
+
+import sys
+from datetime import datetime
+from app import app
+from backend.environment_config import EnvironmentConfig
+from backend.models import Student, Quiz, PerformanceTrend
+from backend.performance_cache import cache
+from backend.proficiency import ExponentialDecayModel
+from backend.query_budget import assert_max_queries
+from backend.trend_store import TrendStore
+
+
+def _close(actual, expected, tolerance=1e-9):
+    return abs(actual - expected) <= tolerance
+
+
+def test_ring_buffer():
+    """_push, _reset_window and recent_scores keep the newest WINDOW scores in order"""
+    window = TrendStore.WINDOW
+    trend = PerformanceTrend(event_count=0)
+    TrendStore._reset_window(trend)
+    assert TrendStore.recent_scores(trend) == [], "new ring is not empty"
+
+    for score in range(1, 4):
+        TrendStore._push(trend, score)
+    assert TrendStore.recent_scores(trend) == [1.0, 2.0, 3.0], "partial ring out of order"
+    assert _close(trend.window_sum, 6.0), "rolling sum wrong before wrap-around"
+
+    scores = [float(score) for score in range(1, window + 6)]
+    TrendStore._reset_window(trend)
+    for score in scores:
+        TrendStore._push(trend, score)
+    assert TrendStore.recent_scores(trend) == scores[-window:], "wrapped ring lost the newest scores"
+    assert trend.window_count == window, "window_count grew past WINDOW"
+    assert _close(trend.window_sum, sum(scores[-window:])), "rolling sum wrong after eviction"
+
+    seeded = PerformanceTrend(event_count=0)
+    TrendStore._reset_window(seeded, scores)
+    assert TrendStore.recent_scores(seeded) == scores[-window:], "seeded ring differs from pushed ring"
+    assert seeded.event_count == len(scores), "seeding did not count the legacy scores"
+
+    legacy = PerformanceTrend(trend_graph_data='[40, 50.5]')
+    assert TrendStore.recent_scores(legacy) == [40.0, 50.5], "double-encoded legacy list not decoded"
+
+
+def test_ewma():
+    """update applied one score at a time matches the vectorized fit"""
+    scores = [40, 55, 90, 70, 85, 60]
+    gaps = [0.0, 1.0, 14.0, 0.5, 30.0, 2.0]
+
+    for model in (ExponentialDecayModel(alpha=0.3), ExponentialDecayModel(alpha=0.3, half_life_days=7)):
+        trend = PerformanceTrend(event_count=0, proficiency_score=0.0)
+        for score, elapsed_days in zip(scores, gaps):
+            trend.proficiency_score = model.update(trend, score, elapsed_days)
+            trend.event_count += 1
+        fitted = model.fit(scores, gaps)
+        assert _close(trend.proficiency_score, fitted, 1e-6), \
+            f"half_life_days={model.half_life_days}: update gave {trend.proficiency_score}, fit gave {fitted}"
+
+    model = ExponentialDecayModel(alpha=1.0)
+    assert model.fit(scores) == scores[-1], "alpha=1 should keep only the newest score"
+    assert model.fit([]) == 0.0, "empty history should fit to 0"
+    try:
+        ExponentialDecayModel(alpha=0)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("alpha=0 was accepted")
+
+
+def test_dashboard_query_budget():
+    """A cold learner dashboard stays within the per-route SQL budget"""
+    budget = EnvironmentConfig.get_query_budget_settings()['budget']
+    with app.app_context():
+        student = Student.query.join(Quiz, Quiz.student_id == Student.student_id).first()
+        if not student:
+            print("   ⚠️  No student with quizzes found, skipped")
+            return
+        user_pk = student.user_id
+
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['_user_id'] = str(user_pk)
+        session['_fresh'] = True
+
+    cache.clear()
+    with assert_max_queries(budget) as statements:
+        response = client.get('/learner/dashboard')
+    assert response.status_code == 200, f"dashboard returned {response.status_code}"
+    print(f"   - {len(statements)} queries (budget {budget})")
+
+
+def run_all():
+    print("🧪 Testing performance paths...")
+    failures = 0
+    for number, test in enumerate((test_ring_buffer, test_ewma, test_dashboard_query_budget), 1):
+        try:
+            test()
+            print(f"{number}. {test.__doc__}: ✅")
+        except AssertionError as e:
+            failures += 1
+            print(f"{number}. {test.__doc__}: ❌ {e}")
+
+    if failures:
+        print(f"\n❌ {failures} check(s) failed")
+        sys.exit(1)
+    print("\n✅ All tests completed successfully!")
+
+
+if __name__ == "__main__":
+    run_all()